@@ -0,0 +1,6 @@
+# backend/app/api/deps.py
+# Shared FastAPI dependencies, so every router resolves sessions and users the same way
+from app.database import get_async_db, get_db
+from app.utils import get_current_admin_user, get_current_brand_user, get_current_user
+
+__all__ = ["get_async_db", "get_db", "get_current_admin_user", "get_current_brand_user", "get_current_user"]
@@ -5,10 +5,9 @@ from typing import List
 from datetime import datetime
 
 from app.api import deps
-from app.models.brand import Brand
-from app.models.ticket import Ticket
-from app.schemas.brand import BrandCreate, BrandUpdate, BrandDashboard
-from app.core.security import get_current_brand_user
+from app.models import Brand, Ticket, User
+from app.schemas import BrandCreate, BrandUpdate, BrandDashboard
+from app.api.deps import get_current_brand_user
 
 router = APIRouter()
 
@@ -29,47 +28,6 @@ async def brand_login(
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.get("/{brand_id}/dashboard")
-async def get_brand_dashboard(
-    brand_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(get_current_brand_user)
-):
-    """Get brand dashboard data"""
-    # Get complaint statistics
-    total_complaints = db.query(Ticket).filter(
-        Ticket.brand_id == brand_id,
-        Ticket.category == "complaint"
-    ).count()
-    
-    new_complaints = db.query(Ticket).filter(
-        Ticket.brand_id == brand_id,
-        Ticket.status == "new",
-        Ticket.category == "complaint"
-    ).count()
-    
-    # Calculate average rating
-    ratings = db.query(Ticket.rating).filter(
-        Ticket.brand_id == brand_id,
-        Ticket.rating.isnot(None)
-    ).all()
-    avg_rating = sum(r[0] for r in ratings) / len(ratings) if ratings else 0
-    
-    # Get urgent tickets (nearing 24h deadline)
-    urgent_tickets = db.query(Ticket).filter(
-        Ticket.brand_id == brand_id,
-        Ticket.status != "resolved",
-        Ticket.created_at < datetime.utcnow() - timedelta(hours=20)
-    ).limit(10).all()
-    
-    return {
-        "new_complaints": new_complaints,
-        "total_active": total_complaints,
-        "avg_rating": round(avg_rating, 1),
-        "avg_resolution_time": "18h",  # Calculate from data
-        "urgent_tickets": urgent_tickets
-    }
-
 @router.get("/{brand_id}/credits")
 async def get_brand_credits(
     brand_id: int,
@@ -159,55 +117,3 @@ async def generate_phone_number(
             }
     
     raise HTTPException(status_code=400, detail="Failed to generate phone number")
-
-@router.get("/{brand_id}/analytics")
-async def get_brand_analytics(
-    brand_id: int,
-    start_date: datetime = None,
-    end_date: datetime = None,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(get_current_brand_user)
-):
-    """Get brand analytics data"""
-    query = db.query(Ticket).filter(Ticket.brand_id == brand_id)
-    
-    if start_date:
-        query = query.filter(Ticket.created_at >= start_date)
-    if end_date:
-        query = query.filter(Ticket.created_at <= end_date)
-    
-    tickets = query.all()
-    
-    # Calculate analytics
-    total_tickets = len(tickets)
-    resolved_tickets = len([t for t in tickets if t.status == "resolved"])
-    
-    category_breakdown = {}
-    for ticket in tickets:
-        category_breakdown[ticket.category] = category_breakdown.get(ticket.category, 0) + 1
-    
-    channel_breakdown = {}
-    for ticket in tickets:
-        channel_breakdown[ticket.channel] = channel_breakdown.get(ticket.channel, 0) + 1
-    
-    # Calculate resolution times
-    resolution_times = []
-    for ticket in tickets:
-        if ticket.status == "resolved" and ticket.resolved_at:
-            time_diff = (ticket.resolved_at - ticket.created_at).total_seconds() / 3600
-            resolution_times.append(time_diff)
-    
-    avg_resolution_time = sum(resolution_times) / len(resolution_times) if resolution_times else 0
-    
-    return {
-        "total_tickets": total_tickets,
-        "resolved_tickets": resolved_tickets,
-        "resolution_rate": (resolved_tickets / total_tickets * 100) if total_tickets > 0 else 0,
-        "avg_resolution_time_hours": round(avg_resolution_time, 1),
-        "category_breakdown": category_breakdown,
-        "channel_breakdown": channel_breakdown,
-        "satisfaction_scores": {
-            "average": 4.2,  # Calculate from actual ratings
-            "total_ratings": 150
-        }
-    }
@@ -1,7 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
+from datetime import datetime, timedelta
 import json
+from itertools import chain
+
+from app.api import deps
+from app.core.ai import chatgpt
+from app.core.channels import registry as channels
+from app.core.conversation.manager import manager as conversations
+from app.models import Brand, Ticket, User
+from app.schemas import TicketOut, TicketSearchHit
+from app.services import bulk_import, duplicates, export, public_feed, rollups, search, ticket_jobs, view_counter, voice_pipeline
 
 router = APIRouter()
 
@@ -9,11 +22,11 @@ router = APIRouter()
 async def update_ticket_status(
     ticket_id: int,
     status: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Update ticket status"""
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await db.get(Ticket, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
@@ -22,67 +35,78 @@ async def update_ticket_status(
         raise HTTPException(status_code=403, detail="Not authorized")
     
     old_status = ticket.status
-    ticket.status = status
     
-    if status == "resolved":
-        ticket.resolved_at = datetime.utcnow()
-        # Trigger follow-up workflow
-        schedule_follow_up_call(ticket_id, delay_hours=24)
+    if status == "resolved" and old_status != "resolved":
+        await db.run_sync(_mark_resolved, ticket)
+    elif old_status == "resolved" and status != "resolved":
+        await db.run_sync(rollups.record_ticket_reopened, ticket, ticket.resolution_time_hours)
+        ticket.resolved_at = None
+        ticket.resolution_time_hours = None
+        ticket.follow_up_sent_at = None
+    ticket.status = status
     
-    db.commit()
+    await db.commit()
     
-    # Log status change
-    log_entry = TicketLog(
-        ticket_id=ticket_id,
-        user_id=current_user.id,
-        action="status_change",
-        details=f"Status changed from {old_status} to {status}"
-    )
-    db.add(log_entry)
-    db.commit()
+    if status == "resolved" and old_status != "resolved":
+        # Trigger follow-up workflow
+        await ticket_jobs.ticket_resolved(ticket, delay_hours=24)
     
     return {"success": True, "new_status": status}
 
+def _mark_resolved(db: Session, ticket: Ticket):
+    """Resolve a ticket and count it in the rollup (caller commits)"""
+    ticket.status = "resolved"
+    ticket.resolved_at = datetime.utcnow()
+    ticket.resolution_time_hours = (ticket.resolved_at - ticket.created_at).total_seconds() / 3600
+    rollups.record_ticket_resolved(db, ticket)
+
 @router.post("/{ticket_id}/responses")
 async def add_ticket_response(
     ticket_id: int,
     message: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    """Add response to ticket"""
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-    
-    response = TicketResponse(
-        ticket_id=ticket_id,
-        user_id=current_user.id,
-        message=message,
-        created_at=datetime.utcnow()
-    )
-    db.add(response)
-    db.commit()
-    
-    # Send notification to user
-    send_notification(
-        user_id=ticket.user_id,
-        type="ticket_response",
-        data={"ticket_id": ticket_id, "message": message[:100]}
-    )
-    
-    return {"success": True, "response_id": response.id}
+    """Reply to the customer on the channel the ticket came in on"""
+    ticket = await _get_visible_ticket(db, ticket_id, current_user)
+    if current_user.role == "user":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not ticket.contact or channels.for_ticket_channel(ticket.channel) is None:
+        raise HTTPException(status_code=400, detail=f"Can't reply on the {ticket.channel or 'web'} channel")
+
+    # Delivered by a job through the channel's pooled, rate-limited client
+    await ticket_jobs.send_reply.enqueue(ticket.id, message)
+    context = await conversations.get(ticket.brand_id, ticket.channel, ticket.contact)
+    conversations.record(context, "agent", message, ticket.id)
+    return {"success": True, "channel": ticket.channel}
+
+@router.get("/{ticket_id}/conversation")
+async def get_ticket_conversation(
+    ticket_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Recent turns of the messaging conversation the ticket belongs to"""
+    ticket = await _get_visible_ticket(db, ticket_id, current_user)
+    if not ticket.contact or ticket.brand_id is None:
+        return {"ticket_id": ticket_id, "turn_count": 0, "turns": []}
+    context = await conversations.get(ticket.brand_id, ticket.channel, ticket.contact)
+    return {
+        "ticket_id": ticket_id,
+        "turn_count": context.turn_count,
+        "turns": [turn.to_dict() for turn in context.recent()],
+    }
 
 @router.post("/{ticket_id}/rate")
 async def rate_ticket(
     ticket_id: int,
     rating: int,
     comment: Optional[str] = None,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Rate ticket resolution"""
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await db.get(Ticket, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
@@ -94,10 +118,12 @@ async def rate_ticket(
     if ticket.status != "resolved":
         raise HTTPException(status_code=400, detail="Can only rate resolved tickets")
     
+    previous_rating = ticket.rating
     ticket.rating = rating
     ticket.rating_comment = comment
     ticket.rated_at = datetime.utcnow()
-    db.commit()
+    await db.run_sync(rollups.record_ticket_rated, ticket, previous_rating)
+    await db.commit()
     
     return {"success": True, "rating": rating}
 
@@ -105,154 +131,260 @@ async def rate_ticket(
 async def upload_voice_complaint(
     audio: UploadFile = File(...),
     metadata: str = None,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    """Upload voice complaint"""
+    """Upload voice complaint; transcription and analysis finish in the background"""
     # Parse metadata
     meta = json.loads(metadata) if metadata else {}
     
-    # Save audio file
-    file_path = f"uploads/voice/{current_user.id}_{datetime.utcnow().timestamp()}.webm"
-    with open(file_path, "wb") as f:
-        content = await audio.read()
-        f.write(content)
+    # Stream audio file to disk
+    file_path = await voice_pipeline.save_upload(audio, current_user.id)
     
-    # Process with speech-to-text
-    transcript = await process_speech_to_text(file_path)
-    
-    # Analyze sentiment and category
-    analysis = await analyze_complaint_text(transcript)
-    
-    # Create ticket
+    # Create ticket now; the pipeline fills in transcript and analysis
     ticket = Ticket(
         user_id=current_user.id,
         brand_id=meta.get("brand_id"),
         channel="voice",
-        description=transcript,
-        category=analysis.get("category", "complaint"),
-        urgency=analysis.get("urgency", 1),
-        sentiment_score=analysis.get("sentiment", 0),
+        description="",
+        category="complaint",
+        urgency=1,
         audio_file_path=file_path,
         created_at=datetime.utcnow()
     )
     db.add(ticket)
-    db.commit()
+    await db.flush()
+    await db.run_sync(rollups.record_ticket_created, ticket)
+    await db.commit()
     
-    # Notify brand
-    send_brand_notification(ticket.brand_id, ticket.id)
+    # Transcription and analysis are queued; the brand is notified once they finish
+    await ticket_jobs.process_voice_ticket.enqueue(ticket.id, file_path)
     
     return {
         "success": True,
         "ticket_id": ticket.id,
-        "transcript": transcript,
+        "status": "processing",
         "category": ticket.category
     }
 
-@router.get("/public")
-async def get_public_complaints(
+@router.post("/bulk")
+async def bulk_import_tickets(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Import many tickets at once. The body is NDJSON (Content-Type
+    application/x-ndjson) or a JSON array of ticket objects; it is parsed
+    as it streams in and invalid rows are reported without stopping the
+    import.
+    """
+    # Brand users may only import into their own brand; admins into any
+    if current_user.role == "brand":
+        brand_id = current_user.brand_id
+    elif current_user.role == "admin":
+        brand_id = None
+    else:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    content_type = request.headers.get("content-type", "")
+    parse = bulk_import.iter_ndjson if "ndjson" in content_type else bulk_import.iter_json_array
+    return await bulk_import.import_tickets(db, parse(request.stream()), brand_id=brand_id)
+
+@router.get("/export")
+async def export_tickets(
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    channel: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    brand_id: Optional[int] = None,
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Stream every matching ticket as CSV or NDJSON, optionally gzipped"""
+    # Same scoping as search: brands get their brand, customers their own tickets
+    user_id = None
+    if current_user.role == "brand":
+        brand_id = current_user.brand_id
+    elif current_user.role == "user":
+        user_id = current_user.id
+
+    body = export.export_tickets(
+        format, gzip,
+        brand_id=brand_id,
+        user_id=user_id,
+        status=status,
+        category=category,
+        channel=channel,
+        start_date=start_date,
+        end_date=end_date
+    )
+    return StreamingResponse(
+        body,
+        media_type=export.media_type(format, gzip),
+        headers=export.headers("tickets", format, gzip)
+    )
+
+@router.get("/search", response_model=List[TicketSearchHit])
+async def search_tickets(
+    q: str,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    channel: Optional[str] = None,
+    brand_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
 ):
-    """Get public unresolved complaints"""
-    # Only show complaints that are unresolved for > 48 hours
-    cutoff_time = datetime.utcnow() - timedelta(hours=48)
+    """Full-text search over ticket descriptions, best matches first"""
+    # Brand users are scoped to their brand, customers to their own tickets;
+    # only admins may pick a brand (or search everything)
+    user_id = None
+    if current_user.role == "brand":
+        brand_id = current_user.brand_id
+    elif current_user.role == "user":
+        user_id = current_user.id
     
-    complaints = db.query(Ticket).filter(
-        Ticket.category == "complaint",
-        Ticket.status != "resolved",
-        Ticket.created_at < cutoff_time,
-        Ticket.is_public == True  # Brand can opt-out of public display
-    ).offset(skip).limit(limit).all()
+    hits = await search.search_tickets(
+        db, q,
+        brand_id=brand_id,
+        user_id=user_id,
+        status=status,
+        category=category,
+        channel=channel,
+        limit=max(1, min(limit, 100)),
+        offset=max(skip, 0)
+    )
+    return [
+        TicketSearchHit(**TicketOut.model_validate(ticket).model_dump(), rank=rank)
+        for ticket, rank in hits
+    ]
+
+@router.get("/incidents")
+async def list_incidents(
+    limit: int = 20,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_brand_user)
+):
+    """Clusters of near-duplicate open tickets for the brand, largest first"""
+    clusters = duplicates.index.clusters(current_user.brand_id)
+    open_tickets = await _open_tickets(db, current_user.brand_id, chain.from_iterable(clusters.values()))
     
-    # Anonymize user data
-    public_complaints = []
-    for complaint in complaints:
-        days_unresolved = (datetime.utcnow() - complaint.created_at).days
-        
-        public_complaints.append({
-            "id": complaint.id,
-            "brand_name": complaint.brand.name,
-            "description": complaint.description[:200] + "...",
-            "days_unresolved": days_unresolved,
-            "views": complaint.view_count,
-            "location": complaint.user.city if complaint.user.city else "India",
-            "created_at": complaint.created_at.isoformat()
+    incidents = []
+    for incident_id, members in clusters.items():
+        tickets = [open_tickets[tid] for tid in members if tid in open_tickets]
+        if len(tickets) < 2:
+            continue
+        incidents.append({
+            "incident_id": incident_id,
+            "open_tickets": len(tickets),
+            "ticket_ids": [ticket.id for ticket in tickets],
+            "description": (tickets[0].description or "")[:200],
+            "first_seen": tickets[0].created_at,
+            "last_seen": tickets[-1].created_at
         })
-    
-    return public_complaints
+    incidents.sort(key=lambda incident: incident["open_tickets"], reverse=True)
+    return incidents[:max(1, min(limit, 100))]
 
-# Helper functions
-async def process_speech_to_text(file_path: str) -> str:
-    """Process audio file to text using Deepgram"""
-    # Deepgram integration
-    from deepgram import Deepgram
-    dg_client = Deepgram(settings.DEEPGRAM_API_KEY)
+@router.post("/incidents/{incident_id}/resolve")
+async def resolve_incident(
+    incident_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_brand_user)
+):
+    """Resolve every open ticket in a duplicate cluster at once"""
+    members = duplicates.index.incident_of(current_user.brand_id, incident_id)
+    if not members:
+        raise HTTPException(status_code=404, detail="Incident not found")
     
-    with open(file_path, 'rb') as audio:
-        source = {'buffer': audio, 'mimetype': 'audio/webm'}
-        response = await dg_client.transcription.prerecorded(
-            source,
-            {
-                'punctuate': True,
-                'language': 'en-IN',
-                'model': 'general',
-                'sentiment': True
-            }
-        )
+    tickets = list((await _open_tickets(db, current_user.brand_id, members)).values())
+    await db.run_sync(lambda session: [_mark_resolved(session, ticket) for ticket in tickets])
+    await db.commit()
     
-    return response['results']['channels'][0]['alternatives'][0]['transcript']
-
-async def analyze_complaint_text(text: str) -> dict:
-    """Analyze complaint text for category and urgency"""
-    # Use Google Cloud Natural Language API
-    from google.cloud import language_v1
-    client = language_v1.LanguageServiceClient()
+    for ticket in tickets:
+        await ticket_jobs.ticket_resolved(ticket, delay_hours=24)
     
-    document = language_v1.Document(
-        content=text,
-        type_=language_v1.Document.Type.PLAIN_TEXT,
+    return {"success": True, "incident_id": incident_id, "resolved_ticket_ids": [ticket.id for ticket in tickets]}
+
+async def _open_tickets(db: AsyncSession, brand_id: int, ticket_ids) -> Dict[int, Ticket]:
+    ids = list(ticket_ids)
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(Ticket).where(
+            Ticket.id.in_(ids),
+            Ticket.brand_id == brand_id,
+            Ticket.status != "resolved"
+        ).order_by(Ticket.created_at, Ticket.id)
     )
+    return {ticket.id: ticket for ticket in result.scalars()}
+
+@router.get("/{ticket_id}/summary")
+async def get_ticket_summary(
+    ticket_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """LLM summary of the ticket, batched with other concurrent summaries"""
+    ticket = await _get_visible_ticket(db, ticket_id, current_user)
+    summary = await chatgpt.summarize_ticket(ticket.description or "")
+    return {"ticket_id": ticket_id, "summary": summary}
+
+@router.post("/{ticket_id}/reply-draft")
+async def draft_ticket_reply(
+    ticket_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Stream an LLM-drafted reply to the ticket as plain text"""
+    ticket = await _get_visible_ticket(db, ticket_id, current_user)
+    brand = await db.get(Brand, ticket.brand_id) if ticket.brand_id else None
+    deltas = chatgpt.stream_reply_draft(ticket.description or "", brand.name if brand else "our company")
+    return StreamingResponse(deltas, media_type="text/plain; charset=utf-8")
+
+async def _get_visible_ticket(db: AsyncSession, ticket_id: int, current_user: User) -> Ticket:
+    ticket = await db.get(Ticket, ticket_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    # Brand users only see their brand's tickets, customers only their own
+    if current_user.role == "brand" and ticket.brand_id != current_user.brand_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if current_user.role == "user" and ticket.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return ticket
+
+@router.get("/public")
+async def get_public_complaints(
+    request: Request,
+    skip: int = 0,
+    limit: int = 20,
+    db: AsyncSession = Depends(deps.get_async_db)
+):
+    """Get public unresolved complaints"""
+    # Only complaints unresolved for > 48 hours, served from the precomputed feed
+    skip = max(skip, 0)
+    limit = max(1, min(limit, 100))
+    snapshot = await public_feed.get_snapshot()
     
-    # Analyze sentiment
-    sentiment = client.analyze_sentiment(
-        request={'document': document}
-    ).document_sentiment
-    
-    # Classify content
-    categories = client.classify_text(
-        request={'document': document}
-    ).categories
-    
-    # Determine urgency based on sentiment and keywords
-    urgency = 1  # Default medium
-    if sentiment.score < -0.5:
-        urgency = 2  # High
-    if any(word in text.lower() for word in ['urgent', 'emergency', 'immediately']):
-        urgency = 3  # Critical
+    if not snapshot.covers(skip, limit):
+        # Deep page past the snapshot: read it directly, without caching
+        items = await public_feed.query_page(db, skip, limit)
+        await view_counter.record_views(item["id"] for item in items)
+        return items
     
-    # Determine category
-    category = "complaint"  # Default
-    if any(word in text.lower() for word in ['suggest', 'recommendation', 'idea']):
-        category = "suggestion"
-    elif any(word in text.lower() for word in ['feedback', 'review']):
-        category = "feedback"
-    elif any(word in text.lower() for word in ['help', 'support', 'how to']):
-        category = "support"
+    items = snapshot.items[skip:skip + limit]
+    # Each complaint shown counts as a view; coalesced and flushed in batches
+    await view_counter.record_views(item["id"] for item in items)
     
-    return {
-        "category": category,
-        "urgency": urgency,
-        "sentiment": sentiment.score
+    etag = snapshot.etag(skip, limit)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={int(public_feed.PUBLIC_FEED_REFRESH_SECONDS)}"
     }
-
-def send_brand_notification(brand_id: int, ticket_id: int):
-    """Send notification to brand about new complaint"""
-    # Implementation for email/webhook notification
-    pass
-
-def schedule_follow_up_call(ticket_id: int, delay_hours: int):
-    """Schedule follow-up call after resolution"""
-    # Implementation for scheduling follow-up
-    pass
\ No newline at end of file
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return JSONResponse(content=items, headers=headers)
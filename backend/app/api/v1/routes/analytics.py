@@ -1,7 +1,36 @@
-from fastapi import APIRouter
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api import deps
+from app.models import User
+from app.services import export
 
 router = APIRouter()
 
 @router.get("/")
 def analytics_dashboard():
     return {"stats": "Analytics data here"}
+
+@router.get("/export")
+async def export_daily_stats(
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    brand_id: Optional[int] = None,
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Stream daily per channel/category ticket counters as CSV or NDJSON"""
+    if current_user.role == "brand":
+        brand_id = current_user.brand_id
+    elif current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return StreamingResponse(
+        export.export_daily_stats(format, gzip, brand_id=brand_id, start_date=start_date, end_date=end_date),
+        media_type=export.media_type(format, gzip),
+        headers=export.headers("daily_stats", format, gzip)
+    )
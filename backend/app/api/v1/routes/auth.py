@@ -1,14 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 import logging
 
 from app import crud, schemas
-from app.database import get_db
+from app.database import get_async_db
 from app.utils import (
-    get_password_hash,
-    verify_password,
+    verify_password_async,
     create_access_token,
     get_current_user
 )
@@ -22,7 +21,7 @@ router = APIRouter(tags=["auth"])
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
 @router.post("/signup", response_model=schemas.UserRead, status_code=201)
-def signup(data: schemas.UserCreate, db: Session = Depends(get_db)):
+async def signup(data: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"=== SIGNUP REQUEST ===")
     logger.info(f"Received signup data: name={data.name}, email={data.email}, phone={data.phone}")
     
@@ -30,18 +29,18 @@ def signup(data: schemas.UserCreate, db: Session = Depends(get_db)):
     logger.info(f"Database connection: {db.bind.url}")
     
     # Check if user already exists
-    existing = crud.get_user_by_email(db, data.email)
+    existing = await crud.get_user_by_email(db, data.email)
     if existing:
         logger.warning(f"User already exists: {data.email}")
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
     logger.info(f"Creating new user: {data.email}")
-    user = crud.create_user(db, data)
+    user = await crud.create_user(db, data)
     logger.info(f"User created successfully with ID: {user.id}, Email: {user.email}")
     
     # Verify user was saved
-    verification = crud.get_user_by_email(db, user.email)
+    verification = await crud.get_user_by_email(db, user.email)
     if verification:
         logger.info(f"✓ User verified in database: {verification.email}")
     else:
@@ -53,16 +52,24 @@ def signup(data: schemas.UserCreate, db: Session = Depends(get_db)):
     return user
 
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     logger.info(f"Login attempt for user: {form_data.username}")
     
-    user = crud.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await crud.get_user_by_email(db, form_data.username)
+    valid, new_hash = (
+        await verify_password_async(form_data.password, user.hashed_password)
+        if user else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Cost factor changed since this hash was made; upgrade it transparently
+        user.hashed_password = new_hash
+        await db.commit()
     expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     token = create_access_token(
         {"sub": user.email}, expires_delta=expires
@@ -70,5 +77,5 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     return {"access_token": token, "token_type": "bearer"}
 
 @router.get("/me", response_model=schemas.UserRead)
-def read_me(current_user = Depends(get_current_user)):
+async def read_me(current_user = Depends(get_current_user)):
     return current_user
\ No newline at end of file
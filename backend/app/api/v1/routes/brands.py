@@ -1,44 +1,50 @@
 # backend/app/api/v1/routes/brands.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import Optional
 import logging
 
 from app import crud, schemas
-from app.database import get_db
+from app.database import get_async_db
 from app.utils import (
-    get_password_hash,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
-    get_current_user
+    get_current_brand_user
 )
 from app import models
+from app.services import analytics, dashboard
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["brands"])
 
 @router.post("/signup", response_model=schemas.BrandRead, status_code=201)
-def brand_signup(data: schemas.BrandCreate, db: Session = Depends(get_db)):
+async def brand_signup(data: schemas.BrandCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new brand"""
     logger.info(f"Brand signup request: {data.email}")
     
     # Check if email already exists in users table
-    existing_user = crud.get_user_by_email(db, data.email)
+    existing_user = await crud.get_user_by_email(db, data.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Check if brand name already exists
-    existing_brand = db.query(models.Brand).filter(
-        models.Brand.name == data.brand_name
-    ).first()
+    result = await db.execute(
+        select(models.Brand).where(models.Brand.name == data.brand_name)
+    )
+    existing_brand = result.scalars().first()
     if existing_brand:
         raise HTTPException(status_code=400, detail="Brand name already exists")
     
+    # Hashed on the bounded pool; raises 503 when it is saturated
+    hashed_password = await hash_password_async(data.password)
+    
     try:
         # Create user account for brand
-        hashed_password = get_password_hash(data.password)
         db_user = models.User(
             name=data.contact_person,
             email=data.email,
@@ -49,7 +55,7 @@ def brand_signup(data: schemas.BrandCreate, db: Session = Depends(get_db)):
             is_admin=False
         )
         db.add(db_user)
-        db.flush()  # Get the user ID
+        await db.flush()  # Get the user ID
         
         # Create brand record
         db_brand = models.Brand(
@@ -61,11 +67,11 @@ def brand_signup(data: schemas.BrandCreate, db: Session = Depends(get_db)):
             auto_routing_enabled=False
         )
         db.add(db_brand)
-        db.commit()
+        await db.commit()
         
         # Refresh to get the complete objects
-        db.refresh(db_user)
-        db.refresh(db_brand)
+        await db.refresh(db_user)
+        await db.refresh(db_brand)
         
         logger.info(f"Brand created successfully: {db_brand.name}")
         
@@ -83,30 +89,39 @@ def brand_signup(data: schemas.BrandCreate, db: Session = Depends(get_db)):
         
     except Exception as e:
         logger.error(f"Error creating brand: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to create brand")
 
 @router.post("/login", response_model=schemas.Token)
-def brand_login(
+async def brand_login(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Brand login endpoint"""
     logger.info(f"Brand login attempt: {form_data.username}")
     
     # Find user by email
-    user = crud.get_user_by_email(db, form_data.username)
+    user = await crud.get_user_by_email(db, form_data.username)
     
     # Verify user exists, is a brand, and password is correct
-    if not user or not user.is_brand or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = (
+        await verify_password_async(form_data.password, user.hashed_password)
+        if user and user.is_brand else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials or not a brand account",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Cost factor changed since this hash was made; upgrade it transparently
+        user.hashed_password = new_hash
+        await db.commit()
     
     # Find associated brand
-    brand = db.query(models.Brand).filter(models.Brand.email == user.email).first()
+    result = await db.execute(select(models.Brand).where(models.Brand.email == user.email))
+    brand = result.scalars().first()
     if not brand:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -128,13 +143,53 @@ def brand_login(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/profile", response_model=schemas.BrandRead)
-def get_brand_profile(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_brand_profile(current_user: schemas.Principal = Depends(get_current_brand_user), db: AsyncSession = Depends(get_async_db)):
     """Get current brand's profile"""
-    if not current_user.is_brand:
-        raise HTTPException(status_code=403, detail="Not a brand account")
-    
-    brand = db.query(models.Brand).filter(models.Brand.email == current_user.email).first()
+    brand = await db.get(models.Brand, current_user.brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    return brand
\ No newline at end of file
+    return brand
+
+@router.patch("/profile", response_model=schemas.BrandRead)
+async def update_brand_profile(
+    update: schemas.BrandUpdate,
+    current_user: schemas.Principal = Depends(get_current_brand_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update the current brand's settings; only the fields sent are changed"""
+    brand = await db.get(models.Brand, current_user.brand_id)
+    if not brand:
+        raise HTTPException(status_code=404, detail="Brand not found")
+
+    for field, value in update.model_dump(exclude_unset=True).items():
+        setattr(brand, field, value)
+    await db.commit()
+    await db.refresh(brand)
+    return brand
+
+def _check_own_brand(current_user: schemas.Principal, brand_id: int):
+    if current_user.brand_id != brand_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this brand")
+
+@router.get("/{brand_id}/dashboard")
+async def get_brand_dashboard(
+    brand_id: int,
+    current_user: schemas.Principal = Depends(get_current_brand_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get brand dashboard data"""
+    _check_own_brand(current_user, brand_id)
+    return await db.run_sync(dashboard.get_brand_dashboard, brand_id)
+
+@router.get("/{brand_id}/analytics")
+async def get_brand_analytics(
+    brand_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: schemas.Principal = Depends(get_current_brand_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get brand analytics data"""
+    _check_own_brand(current_user, brand_id)
+    return await db.run_sync(analytics.get_brand_analytics, brand_id, start_date, end_date)
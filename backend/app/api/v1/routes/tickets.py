@@ -1,29 +1,55 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app import crud, schemas
-from typing import List
+from app.services import ticket_jobs
+from typing import List, Optional
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=schemas.TicketOut)
-def create_ticket(ticket: schemas.TicketCreate, db: Session = Depends(get_db)):
-    return crud.create_ticket(db, ticket)
+async def create_ticket(ticket: schemas.TicketCreate, db: AsyncSession = Depends(get_async_db)):
+    db_ticket = await crud.create_ticket(db, ticket)
+    await ticket_jobs.ticket_created(db_ticket)
+    return db_ticket
+
+@router.get("/page", response_model=schemas.TicketPage)
+async def list_tickets_page(
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    brand_id: Optional[int] = None,
+    status: Optional[str] = None,
+    channel: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cursor-paginated ticket listing; pass back next_cursor to get the following page"""
+    limit = max(1, min(limit, 100))
+    try:
+        items, next_cursor = await crud.list_tickets_keyset(
+            db, limit=limit, cursor=cursor,
+            brand_id=brand_id, status=status, channel=channel
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/{ticket_id}", response_model=schemas.TicketOut)
-def get_ticket(ticket_id: int, db: Session = Depends(get_db)):
-    ticket = crud.get_ticket(db, ticket_id)
+async def get_ticket(ticket_id: int, db: AsyncSession = Depends(get_async_db)):
+    ticket = await crud.get_ticket(db, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     return ticket
 
 @router.get("/", response_model=List[schemas.TicketOut])
-def list_tickets(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
-    return crud.list_tickets(db, skip=skip, limit=limit)
+async def list_tickets(
+    skip: int = 0,
+    limit: int = 20,
+    brand_id: Optional[int] = None,
+    status: Optional[str] = None,
+    channel: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await crud.list_tickets(
+        db, skip=skip, limit=limit,
+        brand_id=brand_id, status=status, channel=channel
+    )
@@ -1,11 +1,93 @@
-from fastapi import APIRouter
+import logging
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket
+from fastapi.responses import PlainTextResponse
+
+from app.core.channels import registry, twilio
+from app.core.channels.base import InvalidSignature
+from app.services import ticket_jobs, voice_pipeline, webhooks
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+async def _accept(parse, request: Request):
+    try:
+        messages = await parse(request)
+    except InvalidSignature as exc:
+        raise HTTPException(status_code=403, detail=str(exc))
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Malformed payload")
+    try:
+        await webhooks.accept(messages)
+    except webhooks.Overloaded:
+        raise HTTPException(status_code=503, detail="Busy, retry later", headers={"Retry-After": "5"})
+
 @router.post("/voice/{provider}")
-def handle_voice_webhook(provider: str):
-    return {"message": f"Received voice webhook from {provider}"}
+async def handle_voice_webhook(provider: str, request: Request):
+    """Recording callbacks from the telephony provider; each becomes (or extends) a voice ticket"""
+    if provider != "twilio":
+        raise HTTPException(status_code=404, detail="Unknown voice provider")
+    adapter = registry.get_adapter("twilio")
+    await _accept(adapter.parse_voice_request, request)
+    return adapter.ack()
+
+@router.websocket("/voice/twilio/stream")
+async def twilio_media_stream(websocket: WebSocket):
+    """
+    Live call audio (Twilio Media Streams). The call gets a voice ticket when
+    it starts and its transcript builds up on the ticket while the caller
+    talks; analysis and the brand notification follow when the call ends
+    with a transcript. Silent calls and failed transcriptions keep their
+    (empty) ticket but aren't analyzed.
+    """
+    adapter = registry.get_adapter("twilio")
+    try:
+        adapter.verify_stream(websocket)
+    except InvalidSignature:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    try:
+        caller, audio = await adapter.read_media_stream(websocket)
+    except (ValueError, KeyError):
+        await websocket.close(code=1003)
+        return
+    created = await webhooks.process_batch([caller])
+    if not created:
+        # Unknown brand number
+        await websocket.close(code=1008)
+        return
+    ticket_id = created[0].id
+    try:
+        transcript = await voice_pipeline.transcribe_call(
+            ticket_id, audio, twilio.MEDIA_STREAM_ENCODING, twilio.MEDIA_STREAM_SAMPLE_RATE
+        )
+    except Exception:
+        logger.exception("Live transcription failed for voice ticket %s", ticket_id)
+        return
+    if transcript:
+        await ticket_jobs.process_voice_ticket.enqueue(ticket_id, None)
+
+@router.get("/chat/whatsapp")
+async def verify_whatsapp_subscription(request: Request):
+    """WhatsApp Cloud API webhook verification handshake"""
+    challenge = registry.get_adapter("whatsapp").subscription_challenge(request.query_params)
+    if challenge is None:
+        raise HTTPException(status_code=403, detail="Verification failed")
+    return PlainTextResponse(challenge)
 
 @router.post("/chat/{channel}")
-def handle_chat_webhook(channel: str):
-    return {"message": f"Received chat webhook from {channel}"}
+async def handle_chat_webhook(channel: str, request: Request):
+    """
+    Inbound chat messages (twilio for SMS/WhatsApp through Twilio, whatsapp,
+    telegram with ?brand_id=, webchat). Verified, deduplicated and queued
+    here; tickets are created or extended in the background so providers
+    get a fast ack.
+    """
+    try:
+        adapter = registry.get_adapter(channel)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown chat channel")
+    await _accept(adapter.parse_request, request)
+    return adapter.ack()
@@ -0,0 +1,162 @@
+# backend/app/core/ai/cache.py
+"""
+Content-addressed cache for AI results.
+
+Copy-pasted and forwarded complaints repeat the same text (and often the
+same recording), so STT and analysis results are cached by content hash:
+
+* text_key: SHA-256 of the normalized text (Unicode NFKC, case-folded,
+  punctuation dropped, whitespace collapsed), so "Forwarded" copies that
+  differ only in spacing or punctuation share an entry.
+* audio_key: SHA-256 of the audio file's bytes, read in chunks.
+
+Entries live in an in-process LRU (AI_CACHE_MAX_ENTRIES). With
+AI_CACHE_BACKEND=redis they are also written to Redis for
+AI_CACHE_PERSIST_TTL_SECONDS, which survives restarts and is shared by all
+workers; a Redis hit is copied into the LRU. Hit and miss counters are
+served at /internal/ai/cache.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+AI_CACHE_BACKEND = os.getenv("AI_CACHE_BACKEND", "memory")
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "10000"))
+AI_CACHE_PERSIST_TTL_SECONDS = int(os.getenv("AI_CACHE_PERSIST_TTL_SECONDS", str(30 * 24 * 3600)))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_KEY_PREFIX = "complainthub:ai:"
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text)).strip()
+
+
+def text_key(kind: str, text: Optional[str]) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{kind}:text:{digest}"
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def audio_key(kind: str, path: str) -> str:
+    digest = await asyncio.to_thread(_file_digest, path)
+    return f"{kind}:audio:{digest}"
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def record(self, outcome: str):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.persistent_hits + self.misses
+            hits = self.memory_hits + self.persistent_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+
+class RedisTier:
+    """Persistent tier: JSON values in Redis with a TTL."""
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(REDIS_KEY_PREFIX + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any):
+        await self._redis.set(REDIS_KEY_PREFIX + key, json.dumps(value), ex=self.ttl_seconds)
+
+
+class AIResultCache:
+    def __init__(self, max_entries: int, persistent: Optional[RedisTier] = None):
+        self.memory = LRUCache(max_entries)
+        self.persistent = persistent
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.record("memory_hits")
+            return value
+        if self.persistent is not None:
+            try:
+                value = await self.persistent.get(key)
+            except Exception:
+                logger.warning("AI cache persistent read failed", exc_info=True)
+            if value is not None:
+                self.stats.record("persistent_hits")
+                self.memory.set(key, value)
+                return value
+        self.stats.record("misses")
+        return None
+
+    async def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            try:
+                await self.persistent.set(key, value)
+            except Exception:
+                logger.warning("AI cache persistent write failed", exc_info=True)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self.get(key)
+        if value is None:
+            value = await compute()
+            if value is not None:
+                await self.set(key, value)
+        return value
+
+    def status(self) -> dict:
+        return {
+            "backend": AI_CACHE_BACKEND,
+            "entries": len(self.memory),
+            "max_entries": self.memory.max_entries,
+            **self.stats.snapshot(),
+        }
+
+
+def _make_cache() -> AIResultCache:
+    persistent = None
+    if AI_CACHE_BACKEND == "redis":
+        persistent = RedisTier(REDIS_URL, AI_CACHE_PERSIST_TTL_SECONDS)
+    return AIResultCache(AI_CACHE_MAX_ENTRIES, persistent)
+
+
+results = _make_cache()
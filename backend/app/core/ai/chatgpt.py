@@ -0,0 +1,234 @@
+# backend/app/core/ai/chatgpt.py
+"""
+Client for OpenAI-compatible chat completions, shaped for ticket spikes.
+
+* Micro-batching: batch() requests for the same instruction that arrive
+  within LLM_BATCH_WINDOW_MS are sent as one call (up to LLM_BATCH_MAX_SIZE
+  items) whose prompt carries all the items and asks for a JSON array of
+  answers. Identical items in a window share one answer. If the reply can't
+  be matched back to the items, each item is retried on its own.
+* Rate limits: token buckets for requests and (estimated) tokens per
+  minute keep us under the account limits instead of running into 429s;
+  429/5xx responses that still happen are retried after Retry-After.
+* Concurrency: at most LLM_MAX_CONCURRENCY calls are in flight.
+* Streaming: stream() yields content deltas as they arrive.
+
+All calls go through one pooled httpx.AsyncClient against LLM_BASE_URL, so
+tests and local runs can point it at app.core.ai.fake_llm.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from app.config.settings import settings
+from app.core.ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "25"))
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "16"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+
+CHARS_PER_TOKEN = 4
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+BATCH_FORMAT = (
+    "You will receive a JSON object {\"items\": [...]}. Apply the instruction to "
+    "each item independently and reply with only a JSON array holding exactly "
+    "one answer string per item, in the same order."
+)
+
+
+def estimate_tokens(messages: List[dict], max_tokens: int) -> int:
+    """Rough prompt + completion size, for the token bucket."""
+    return sum(len(message.get("content") or "") for message in messages) // CHARS_PER_TOKEN + max_tokens
+
+
+class ChatClient:
+    def __init__(self, base_url: str = LLM_BASE_URL, api_key: str = "", model: str = LLM_MODEL,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = LLM_TOKENS_PER_MINUTE):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.model = model
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._requests = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60))
+        self._tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute / 60)
+        self._http: Optional[httpx.AsyncClient] = None
+        # (instruction, max_tokens) -> (item, future) pairs in the open batch window
+        self._pending: Dict[Tuple[str, int], List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, int], asyncio.TimerHandle] = {}
+        self._batches: Set[asyncio.Task] = set()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._http = httpx.AsyncClient(base_url=self.base_url, headers=headers, timeout=LLM_TIMEOUT_SECONDS)
+        return self._http
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _admit(self, messages: List[dict], max_tokens: int):
+        await self._requests.acquire()
+        await self._tokens.acquire(estimate_tokens(messages, max_tokens))
+
+    def _payload(self, messages: List[dict], max_tokens: int, stream: bool = False) -> dict:
+        return {"model": self.model, "messages": messages, "max_tokens": max_tokens, "stream": stream}
+
+    async def complete(self, messages: List[dict], max_tokens: int = 256) -> str:
+        payload = self._payload(messages, max_tokens)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await self._admit(messages, max_tokens)
+            async with self._slots:
+                response = await self.http.post("/chat/completions", json=payload)
+            if response.status_code not in RETRY_STATUSES or attempt == LLM_MAX_RETRIES:
+                break
+            await self._backoff(response, attempt)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def stream(self, messages: List[dict], max_tokens: int = 512) -> AsyncIterator[str]:
+        """Yield content deltas as the server streams them."""
+        payload = self._payload(messages, max_tokens, stream=True)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await self._admit(messages, max_tokens)
+            async with self._slots:
+                async with self.http.stream("POST", "/chat/completions", json=payload) as response:
+                    if response.status_code in RETRY_STATUSES and attempt < LLM_MAX_RETRIES:
+                        await response.aread()
+                    else:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[len("data:"):].strip()
+                            if data == "[DONE]":
+                                return
+                            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                            if delta:
+                                yield delta
+                        return
+            await self._backoff(response, attempt)
+
+    async def _backoff(self, response: httpx.Response, attempt: int):
+        retry_after = response.headers.get("retry-after")
+        delay = float(retry_after) if retry_after else 2 ** attempt
+        logger.warning("LLM call got %s, retrying in %.1fs", response.status_code, delay)
+        await asyncio.sleep(delay)
+
+    async def batch(self, instruction: str, item: str, max_tokens: int = 256) -> str:
+        """Answer instruction for item, sharing a call with concurrent requests."""
+        key = (instruction, max_tokens)
+        window = self._pending.get(key)
+        if window is None:
+            window = self._pending[key] = []
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                LLM_BATCH_WINDOW_MS / 1000, self._flush_window, key
+            )
+        for pending_item, future in window:
+            if pending_item == item:
+                return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        window.append((item, future))
+        if len(window) >= LLM_BATCH_MAX_SIZE:
+            self._flush_window(key)
+        return await asyncio.shield(future)
+
+    def _flush_window(self, key: Tuple[str, int]):
+        # A window filled before its timer fired must not leave the timer to cut the next one short
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        window = self._pending.pop(key, None)
+        if window:
+            task = asyncio.get_running_loop().create_task(self._run_batch(key, window))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, key: Tuple[str, int], window: List[Tuple[str, asyncio.Future]]):
+        instruction, max_tokens = key
+        try:
+            if len(window) == 1:
+                answers = [await self.complete(self._single_messages(instruction, window[0][0]), max_tokens)]
+            else:
+                answers = await self._complete_batch(instruction, [item for item, _ in window], max_tokens)
+        except Exception as exc:
+            for _, future in window:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), answer in zip(window, answers):
+            if not future.done():
+                future.set_result(answer)
+
+    def _single_messages(self, instruction: str, item: str) -> List[dict]:
+        return [{"role": "system", "content": instruction}, {"role": "user", "content": item}]
+
+    async def _complete_batch(self, instruction: str, items: List[str], max_tokens: int) -> List[str]:
+        messages = [
+            {"role": "system", "content": f"{instruction}\n\n{BATCH_FORMAT}"},
+            {"role": "user", "content": json.dumps({"items": items})},
+        ]
+        reply = await self.complete(messages, max_tokens * len(items))
+        try:
+            answers = json.loads(reply)
+            if isinstance(answers, list) and len(answers) == len(items):
+                return [str(answer) for answer in answers]
+        except ValueError:
+            pass
+        logger.warning("Batched LLM reply didn't match %d items; answering one by one", len(items))
+        return await asyncio.gather(*[
+            self.complete(self._single_messages(instruction, item), max_tokens) for item in items
+        ])
+
+
+SUMMARY_INSTRUCTION = (
+    "Summarize this customer complaint for a support agent in one or two "
+    "sentences. Mention the product or service and what the customer wants."
+)
+REPLY_INSTRUCTION = (
+    "You are a support agent for {brand}. Draft a short, polite reply to the "
+    "customer's complaint below. Acknowledge the problem and state the next step."
+)
+
+_client: Optional[ChatClient] = None
+
+
+def get_client() -> ChatClient:
+    global _client
+    if _client is None:
+        _client = ChatClient(api_key=settings.OPENAI_API_KEY)
+    return _client
+
+
+async def close():
+    if _client is not None:
+        await _client.close()
+
+
+async def summarize_ticket(description: str) -> str:
+    return await get_client().batch(SUMMARY_INSTRUCTION, description, max_tokens=120)
+
+
+async def stream_reply_draft(description: str, brand_name: str) -> AsyncIterator[str]:
+    messages = [
+        {"role": "system", "content": REPLY_INSTRUCTION.format(brand=brand_name)},
+        {"role": "user", "content": description},
+    ]
+    async for delta in get_client().stream(messages, max_tokens=400):
+        yield delta
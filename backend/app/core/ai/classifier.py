@@ -0,0 +1,125 @@
+# backend/app/core/ai/classifier.py
+"""
+Rule-based complaint classifier.
+
+Keyword sets come from a JSON config (keywords.json next to this module, or
+CLASSIFIER_KEYWORDS_PATH). Every keyword of every set is compiled into one
+case-insensitive regex whose alternation is laid out as a trie, so a text
+is scanned once no matter how many keywords there are, and shared prefixes
+("support"/"suggest") are only tried once per position.
+
+Keywords match whole words only ("idea" doesn't match "ideal", nor "help"
+"helpful"), so inflections that should count are listed as keywords of
+their own. Categories are checked in config order:
+the first one with a match wins, otherwise default_category. Urgency is the
+highest level whose keywords matched, otherwise default_urgency.
+"""
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_KEYWORDS_PATH = os.path.join(os.path.dirname(__file__), "keywords.json")
+CLASSIFIER_KEYWORDS_PATH = os.getenv("CLASSIFIER_KEYWORDS_PATH", DEFAULT_KEYWORDS_PATH)
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex alternation for terms, factored by common prefix."""
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        ends_here = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            # Longer keywords are tried first; the shorter one is the fallback
+            return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class KeywordClassifier:
+    """Category and urgency from keyword matches, in one pass over the text."""
+
+    def __init__(self, categories: Dict[str, List[str]], urgency: Dict[int, List[str]],
+                 default_category: str = "complaint", default_urgency: int = 1):
+        self.default_category = default_category
+        self.default_urgency = default_urgency
+        self._category_names = list(categories)
+        self._category_rank = {name: rank for rank, name in enumerate(self._category_names)}
+        # term -> (categories, urgency levels) it counts towards
+        self._terms: Dict[str, tuple] = {}
+        for name, terms in categories.items():
+            for term in terms:
+                self._label(term)[0].append(name)
+        for level, terms in urgency.items():
+            for term in terms:
+                self._label(term)[1].append(int(level))
+        # (?!) never matches, for a config without keywords
+        alternation = _trie_pattern(self._terms) if self._terms else "(?!)"
+        # Word boundaries on both sides; a lookaround rather than \b so a
+        # keyword that starts or ends with punctuation still anchors
+        self._pattern = re.compile(r"(?<!\w)(?:" + alternation + r")(?!\w)", re.IGNORECASE)
+
+    def _label(self, term: str) -> tuple:
+        return self._terms.setdefault(term.lower(), ([], []))
+
+    @classmethod
+    def from_file(cls, path: str) -> "KeywordClassifier":
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(
+            categories=config.get("categories", {}),
+            urgency=config.get("urgency", {}),
+            default_category=config.get("default_category", "complaint"),
+            default_urgency=config.get("default_urgency", 1),
+        )
+
+    def classify(self, text: Optional[str]) -> dict:
+        category_rank = None
+        urgency = self.default_urgency
+        matched = []
+        for match in self._pattern.finditer(text or ""):
+            term = match.group().lower()
+            categories, levels = self._terms[term]
+            if term not in matched:
+                matched.append(term)
+            for name in categories:
+                rank = self._category_rank[name]
+                if category_rank is None or rank < category_rank:
+                    category_rank = rank
+            if levels:
+                urgency = max(urgency, *levels)
+
+        category = self.default_category if category_rank is None else self._category_names[category_rank]
+        return {"category": category, "urgency": urgency, "matched_terms": matched}
+
+    def classify_batch(self, texts: Iterable[Optional[str]]) -> List[dict]:
+        return [self.classify(text) for text in texts]
+
+
+_classifier: Optional[KeywordClassifier] = None
+
+
+def get_classifier() -> KeywordClassifier:
+    """The shared classifier, compiled from CLASSIFIER_KEYWORDS_PATH on first use."""
+    global _classifier
+    if _classifier is None:
+        _classifier = KeywordClassifier.from_file(CLASSIFIER_KEYWORDS_PATH)
+    return _classifier
+
+
+def classify(text: Optional[str]) -> dict:
+    return get_classifier().classify(text)
+
+
+def classify_batch(texts: Iterable[Optional[str]]) -> List[dict]:
+    return get_classifier().classify_batch(texts)
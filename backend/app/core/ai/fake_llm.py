@@ -0,0 +1,87 @@
+# backend/app/core/ai/fake_llm.py
+"""
+Fake OpenAI-compatible chat server for tests and local runs.
+
+    uvicorn app.core.ai.fake_llm:app --port 8001
+    LLM_BASE_URL=http://127.0.0.1:8001/v1
+
+Answers are deterministic: each item is echoed back as "summary: <first
+words>". Batched prompts (a user message of {"items": [...]}) get a JSON
+array with one answer per item, and stream=true responses are sent as SSE
+chunks word by word. FAKE_LLM_MAX_CONCURRENT makes it answer 429 when more
+calls than that are in flight, and /stats reports what it has seen.
+"""
+import asyncio
+import json
+import os
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.05"))
+FAKE_LLM_MAX_CONCURRENT = int(os.getenv("FAKE_LLM_MAX_CONCURRENT", "0"))  # 0 disables
+
+app = FastAPI(title="Fake LLM")
+
+stats = {"requests": 0, "batched_items": 0, "rejected": 0, "in_flight": 0, "max_in_flight": 0}
+
+
+def _answer(text: str) -> str:
+    return "summary: " + " ".join(text.split()[:8])
+
+
+def _completion(content: str) -> dict:
+    return {
+        "id": f"fake-{time.monotonic_ns()}",
+        "object": "chat.completion",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+def _chunk(delta: str) -> str:
+    body = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": delta}}]}
+    return f"data: {json.dumps(body)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    payload = await request.json()
+    if FAKE_LLM_MAX_CONCURRENT and stats["in_flight"] >= FAKE_LLM_MAX_CONCURRENT:
+        stats["rejected"] += 1
+        return JSONResponse({"error": {"message": "rate limited"}}, status_code=429, headers={"Retry-After": "0.1"})
+
+    stats["requests"] += 1
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+    try:
+        await asyncio.sleep(FAKE_LLM_LATENCY_SECONDS)
+    finally:
+        stats["in_flight"] -= 1
+
+    user = next((m["content"] for m in reversed(payload["messages"]) if m["role"] == "user"), "")
+    try:
+        items = json.loads(user)["items"]
+    except (ValueError, TypeError, KeyError):
+        items = None
+    if items is not None:
+        stats["batched_items"] += len(items)
+        content = json.dumps([_answer(item) for item in items])
+    else:
+        content = _answer(user)
+
+    if not payload.get("stream"):
+        return _completion(content)
+
+    async def events():
+        for word in content.split(" "):
+            yield _chunk(word + " ")
+            await asyncio.sleep(0)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
@@ -0,0 +1,143 @@
+# backend/app/core/ai/sentiment.py
+"""
+Sentiment scoring: a local lexicon scorer and the Google NL API.
+
+LexiconSentimentScorer sums word valences from sentiment_lexicon.json (or
+SENTIMENT_LEXICON_PATH), flipping words that follow a negation within
+NEGATION_WINDOW tokens and scaling words that follow a booster ("very",
+"barely"). The sum is squashed into [-1, 1] like Google's document score,
+so the two are interchangeable downstream. It needs no network and scores
+thousands of descriptions per second; score_batch tokenizes each distinct
+text once.
+
+score_sentiment() picks the scorer per brand (Brand.sentiment_scorer):
+"local" uses the lexicon only; "remote" asks Google first and falls back to
+the lexicon if the call fails or takes longer than
+SENTIMENT_REMOTE_TIMEOUT_SECONDS.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(__file__), "sentiment_lexicon.json")
+SENTIMENT_LEXICON_PATH = os.getenv("SENTIMENT_LEXICON_PATH", DEFAULT_LEXICON_PATH)
+SENTIMENT_DEFAULT_SCORER = os.getenv("SENTIMENT_DEFAULT_SCORER", "remote")
+SENTIMENT_REMOTE_TIMEOUT_SECONDS = float(os.getenv("SENTIMENT_REMOTE_TIMEOUT_SECONDS", "2"))
+
+SCORERS = ("remote", "local")
+NEGATION_WINDOW = 3
+NEGATION_SCALAR = -0.74
+# Normalization constant: a raw sum of +/-4 maps to about +/-0.7
+NORMALIZATION_ALPHA = 15
+
+_TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+class LexiconSentimentScorer:
+    """Offline sentiment in [-1, 1] from a word valence lexicon."""
+
+    def __init__(self, words: Dict[str, float], negations: Iterable[str] = (),
+                 boosters: Optional[Dict[str, float]] = None):
+        self.words = {word.lower(): float(valence) for word, valence in words.items()}
+        self.negations = frozenset(word.lower() for word in negations)
+        self.boosters = {word.lower(): float(scale) for word, scale in (boosters or {}).items()}
+
+    @classmethod
+    def from_file(cls, path: str) -> "LexiconSentimentScorer":
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config.get("words", {}), config.get("negations", ()), config.get("boosters"))
+
+    def raw_score(self, text: Optional[str]) -> float:
+        """Unnormalized sum of (negated/boosted) valences."""
+        total = 0.0
+        last_negation = -NEGATION_WINDOW - 1
+        booster = 0.0
+        for position, token in enumerate(_TOKEN.findall((text or "").lower())):
+            if token in self.negations:
+                last_negation = position
+                continue
+            valence = self.words.get(token)
+            if valence is None:
+                booster = self.boosters.get(token, 0.0)
+                continue
+            if booster:
+                valence += math.copysign(booster, valence)
+                booster = 0.0
+            if position - last_negation <= NEGATION_WINDOW:
+                valence *= NEGATION_SCALAR
+            total += valence
+        return total
+
+    def score(self, text: Optional[str]) -> float:
+        total = self.raw_score(text)
+        return total / math.sqrt(total * total + NORMALIZATION_ALPHA)
+
+    def score_batch(self, texts: Iterable[Optional[str]]) -> List[float]:
+        """Scores in input order; repeated texts are only scored once."""
+        texts = list(texts)
+        scores = {text: self.score(text) for text in set(texts)}
+        return [scores[text] for text in texts]
+
+
+_lexicon_scorer: Optional[LexiconSentimentScorer] = None
+
+
+def get_lexicon_scorer() -> LexiconSentimentScorer:
+    global _lexicon_scorer
+    if _lexicon_scorer is None:
+        _lexicon_scorer = LexiconSentimentScorer.from_file(SENTIMENT_LEXICON_PATH)
+    return _lexicon_scorer
+
+
+def local_score(text: Optional[str]) -> float:
+    return get_lexicon_scorer().score(text)
+
+
+def local_score_batch(texts: Iterable[Optional[str]]) -> List[float]:
+    return get_lexicon_scorer().score_batch(texts)
+
+
+_google_client = None
+
+
+def _google_score(text: str) -> float:
+    global _google_client
+    from google.cloud import language_v1
+    if _google_client is None:
+        _google_client = language_v1.LanguageServiceClient()
+
+    document = language_v1.Document(
+        content=text,
+        type_=language_v1.Document.Type.PLAIN_TEXT,
+    )
+    return _google_client.analyze_sentiment(request={'document': document}).document_sentiment.score
+
+
+async def remote_score(text: str) -> float:
+    """Google NL document sentiment; the client is blocking, so it runs in a thread."""
+    return await asyncio.wait_for(asyncio.to_thread(_google_score, text), SENTIMENT_REMOTE_TIMEOUT_SECONDS)
+
+
+async def score_sentiment(text: Optional[str], scorer: Optional[str] = None) -> float:
+    """Score with the brand's chosen scorer (None means SENTIMENT_DEFAULT_SCORER)."""
+    return (await score_sentiment_with_scorer(text, scorer))[0]
+
+
+async def score_sentiment_with_scorer(text: Optional[str], scorer: Optional[str] = None) -> Tuple[float, str]:
+    """(score, scorer that produced it): "local" when the remote scorer fell back to the lexicon."""
+    scorer = scorer or SENTIMENT_DEFAULT_SCORER
+    if scorer == "remote" and text:
+        try:
+            return await remote_score(text), "remote"
+        except asyncio.TimeoutError:
+            logger.warning("Remote sentiment timed out; using lexicon scorer")
+        except Exception:
+            logger.warning("Remote sentiment failed; using lexicon scorer", exc_info=True)
+    return local_score(text), "local"
@@ -0,0 +1,147 @@
+# backend/app/core/channels/base.py
+"""
+Common interface for messaging channels.
+
+An adapter does two things for its provider:
+
+* parse_request() verifies an inbound webhook request and turns it into
+  InboundMessage objects (see app.services.webhooks for what happens next).
+* send() / send_many() deliver replies. Every adapter owns one pooled
+  httpx.AsyncClient (keep-alive, HTTP/2 where the provider supports it and
+  the h2 package is installed), so a reply fan-out reuses a handful of
+  connections instead of paying a TLS handshake per message. A token
+  bucket keeps each provider under its rate limit, a semaphore caps
+  concurrent calls, and 429/5xx answers are retried after Retry-After.
+
+Provider base URLs are configurable, so tests and local runs can point
+every adapter at app.core.channels.fake_server.
+"""
+import asyncio
+import hmac
+import importlib.util
+import logging
+import os
+from typing import Iterable, List, Optional, Tuple
+
+import httpx
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from app.core.ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_VERIFY_SIGNATURES = os.getenv("WEBHOOK_VERIFY_SIGNATURES", "true").lower() in ("1", "true", "yes")
+CHANNEL_TIMEOUT_SECONDS = float(os.getenv("CHANNEL_TIMEOUT_SECONDS", "10"))
+CHANNEL_MAX_RETRIES = int(os.getenv("CHANNEL_MAX_RETRIES", "3"))
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class InvalidSignature(Exception):
+    pass
+
+
+class InboundMessage:
+    """One customer message, normalized across providers."""
+
+    __slots__ = ("key", "channel", "contact", "text", "brand_id", "brand_number", "audio_url")
+
+    def __init__(self, key: str, channel: str, contact: str, text: Optional[str],
+                 brand_id: Optional[int] = None, brand_number: Optional[str] = None,
+                 audio_url: Optional[str] = None):
+        self.key = key  # provider message id, namespaced by provider
+        self.channel = channel
+        self.contact = contact
+        self.text = text
+        self.brand_id = brand_id
+        self.brand_number = brand_number  # the brand's number the customer wrote to
+        self.audio_url = audio_url
+
+
+def require_secret(secret: str, name: str):
+    if not secret:
+        raise InvalidSignature(f"{name} is not configured")
+
+
+def check_signature(expected: str, received: Optional[str], provider: str):
+    if not hmac.compare_digest(expected, received or ""):
+        raise InvalidSignature(f"Bad {provider} signature")
+
+
+class ChannelAdapter:
+    """Base class; subclasses set the class attributes and implement the hooks."""
+
+    name = ""
+    base_url = ""
+    http2 = False
+    rate_per_second = 10.0
+    max_concurrency = 10
+
+    def __init__(self):
+        self._http: Optional[httpx.AsyncClient] = None
+        self._bucket = TokenBucket(self.rate_per_second, max(1.0, self.rate_per_second))
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    # Inbound ---------------------------------------------------------------
+
+    async def parse_request(self, request: Request) -> List[InboundMessage]:
+        """Verify the webhook request (InvalidSignature) and parse it (ValueError/KeyError)."""
+        raise NotImplementedError
+
+    def ack(self) -> Response:
+        return JSONResponse({"ok": True})
+
+    # Outbound --------------------------------------------------------------
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2 and HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+                timeout=CHANNEL_TIMEOUT_SECONDS,
+                **self.client_options(),
+            )
+        return self._http
+
+    def client_options(self) -> dict:
+        """Extra httpx.AsyncClient arguments (auth, headers)."""
+        return {}
+
+    def build_send(self, contact: str, text: str) -> Tuple[str, dict]:
+        """(path, httpx request kwargs) for one outbound message."""
+        raise NotImplementedError
+
+    async def send(self, contact: str, text: str):
+        path, kwargs = self.build_send(contact, text)
+        await self._post(path, **kwargs)
+
+    async def send_many(self, messages: Iterable[Tuple[str, str]]) -> List[Optional[Exception]]:
+        """Send (contact, text) pairs concurrently; returns None or the error for each."""
+        results = await asyncio.gather(
+            *(self.send(contact, text) for contact, text in messages), return_exceptions=True
+        )
+        return [result if isinstance(result, Exception) else None for result in results]
+
+    async def _post(self, path: str, **kwargs) -> httpx.Response:
+        for attempt in range(CHANNEL_MAX_RETRIES + 1):
+            await self._bucket.acquire()
+            async with self._slots:
+                response = await self.http.post(path, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == CHANNEL_MAX_RETRIES:
+                break
+            retry_after = response.headers.get("retry-after")
+            delay = float(retry_after) if retry_after else 2 ** attempt
+            logger.warning("%s send got %s, retrying in %.1fs", self.name, response.status_code, delay)
+            await asyncio.sleep(delay)
+        response.raise_for_status()
+        return response
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
@@ -0,0 +1,106 @@
+# backend/app/core/channels/fake_server.py
+"""
+Fake messaging provider APIs for tests and local runs.
+
+    uvicorn app.core.channels.fake_server:app --port 8002
+    TELEGRAM_API_URL=http://127.0.0.1:8002/telegram
+    WHATSAPP_API_URL=http://127.0.0.1:8002/whatsapp
+    TWILIO_API_URL=http://127.0.0.1:8002/twilio
+    WEBCHAT_API_URL=http://127.0.0.1:8002/webchat
+
+Every send endpoint answers like its provider after
+FAKE_CHANNEL_LATENCY_SECONDS. /stats reports, per provider, how many
+requests and messages arrived and over how many distinct client
+connections (peer ports), which shows whether clients reuse connections.
+FAKE_CHANNEL_MAX_CONCURRENT makes it answer 429 when more calls than that
+are in flight. Twilio recordings can be fetched too; their "audio" is text
+naming the recording, which app.services.speech.fake_deepgram transcribes
+as is.
+"""
+import asyncio
+import os
+import time
+from collections import defaultdict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+FAKE_CHANNEL_LATENCY_SECONDS = float(os.getenv("FAKE_CHANNEL_LATENCY_SECONDS", "0.02"))
+FAKE_CHANNEL_MAX_CONCURRENT = int(os.getenv("FAKE_CHANNEL_MAX_CONCURRENT", "0"))  # 0 disables
+
+app = FastAPI(title="Fake messaging providers")
+
+_stats = defaultdict(lambda: {"requests": 0, "messages": 0, "rejected": 0, "connections": set()})
+_in_flight = 0
+
+
+async def _receive(provider: str, request: Request, messages: int):
+    """Record the call and simulate latency; returns a 429 response when saturated."""
+    global _in_flight
+    stats = _stats[provider]
+    if FAKE_CHANNEL_MAX_CONCURRENT and _in_flight >= FAKE_CHANNEL_MAX_CONCURRENT:
+        stats["rejected"] += 1
+        return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "0.1"})
+    stats["requests"] += 1
+    stats["messages"] += messages
+    stats["connections"].add(request.client.port if request.client else None)
+    _in_flight += 1
+    try:
+        await asyncio.sleep(FAKE_CHANNEL_LATENCY_SECONDS)
+    finally:
+        _in_flight -= 1
+    return None
+
+
+@app.post("/telegram/bot{token}/sendMessage")
+async def telegram_send(token: str, request: Request):
+    payload = await request.json()
+    return await _receive("telegram", request, 1) or {
+        "ok": True,
+        "result": {"message_id": time.monotonic_ns(), "chat": {"id": payload["chat_id"]}, "text": payload["text"]},
+    }
+
+
+@app.post("/whatsapp/{phone_number_id}/messages")
+async def whatsapp_send(phone_number_id: str, request: Request):
+    payload = await request.json()
+    return await _receive("whatsapp", request, 1) or {
+        "messaging_product": "whatsapp",
+        "contacts": [{"input": payload["to"], "wa_id": payload["to"]}],
+        "messages": [{"id": f"wamid.{time.monotonic_ns()}"}],
+    }
+
+
+@app.post("/twilio/2010-04-01/Accounts/{sid}/Messages.json")
+async def twilio_send(sid: str, request: Request):
+    form = await request.form()
+    return await _receive("twilio", request, 1) or JSONResponse({
+        "sid": f"SM{time.monotonic_ns()}", "to": form["To"], "body": form["Body"], "status": "queued",
+    }, status_code=201)
+
+
+@app.get("/twilio/2010-04-01/Accounts/{sid}/Recordings/{recording_sid}")
+async def twilio_recording(sid: str, recording_sid: str, request: Request):
+    return await _receive("twilio_recordings", request, 0) or Response(
+        f"Recorded complaint {recording_sid}.".encode(), media_type="audio/x-wav",
+    )
+
+
+@app.post("/webchat/messages")
+async def webchat_send(request: Request):
+    payload = await request.json()
+    return await _receive("webchat", request, len(payload)) or {"accepted": len(payload)}
+
+
+@app.get("/stats")
+async def get_stats():
+    return {
+        provider: {**{k: v for k, v in stats.items() if k != "connections"}, "connections": len(stats["connections"])}
+        for provider, stats in _stats.items()
+    }
+
+
+@app.post("/stats/reset")
+async def reset_stats():
+    _stats.clear()
+    return {"ok": True}
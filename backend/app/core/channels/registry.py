@@ -0,0 +1,57 @@
+# backend/app/core/channels/registry.py
+"""One adapter (and so one pooled HTTP client) per provider, per process."""
+import asyncio
+from typing import Dict, Optional
+
+from app.core.channels.base import ChannelAdapter
+from app.core.channels.telegram import TelegramAdapter
+from app.core.channels.twilio import TwilioAdapter
+from app.core.channels.webchat import WebchatAdapter
+from app.core.channels.whatsapp import WhatsAppAdapter
+
+ADAPTERS = {
+    "telegram": TelegramAdapter,
+    "twilio": TwilioAdapter,
+    "webchat": WebchatAdapter,
+    "whatsapp": WhatsAppAdapter,
+}
+
+# Ticket.channel -> provider that delivers replies on it (the one the message came through)
+REPLY_PROVIDERS = {
+    "sms": "twilio",
+    "telegram": "telegram",
+    "twilio_whatsapp": "twilio",
+    "webchat": "webchat",
+    "whatsapp": "whatsapp",
+}
+
+# Channels their provider addresses with a scheme in front of the contact
+ADDRESS_SCHEMES = {
+    "twilio_whatsapp": "whatsapp:",
+}
+
+_adapters: Dict[str, ChannelAdapter] = {}
+
+
+def get_adapter(name: str) -> ChannelAdapter:
+    """The shared adapter for a provider; KeyError if there is none."""
+    adapter = _adapters.get(name)
+    if adapter is None:
+        adapter = _adapters[name] = ADAPTERS[name]()
+    return adapter
+
+
+def for_ticket_channel(channel: Optional[str]) -> Optional[ChannelAdapter]:
+    """Adapter that can reply on a ticket's channel, or None (web, email, voice)."""
+    provider = REPLY_PROVIDERS.get(channel or "")
+    return get_adapter(provider) if provider else None
+
+
+def reply_address(channel: Optional[str], contact: str) -> str:
+    """How the channel's reply provider addresses a ticket's contact."""
+    return ADDRESS_SCHEMES.get(channel or "", "") + contact
+
+
+async def close():
+    await asyncio.gather(*(adapter.close() for adapter in _adapters.values()))
+    _adapters.clear()
@@ -0,0 +1,55 @@
+# backend/app/core/channels/telegram.py
+"""Telegram Bot API: webhook updates in, sendMessage out."""
+import json
+import os
+from typing import List, Tuple
+
+from fastapi import Request
+
+from app.core.channels.base import (
+    WEBHOOK_VERIFY_SIGNATURES, ChannelAdapter, InboundMessage, check_signature, require_secret,
+)
+
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+# Telegram allows about 30 messages per second per bot
+TELEGRAM_RATE_PER_SECOND = float(os.getenv("TELEGRAM_RATE_PER_SECOND", "25"))
+
+
+def parse_update(update: dict, brand_id: int) -> List[InboundMessage]:
+    """One Telegram update; each brand's bot posts to its own webhook URL."""
+    message = update.get("message") or update.get("edited_message")
+    if not message or not message.get("text"):
+        return []
+    return [InboundMessage(
+        key=f"telegram:{brand_id}:{update['update_id']}",
+        channel="telegram",
+        contact=str(message["chat"]["id"]),
+        text=message["text"],
+        brand_id=brand_id,
+    )]
+
+
+class TelegramAdapter(ChannelAdapter):
+    name = "telegram"
+    base_url = TELEGRAM_API_URL
+    http2 = True
+    rate_per_second = TELEGRAM_RATE_PER_SECOND
+
+    def verify(self, secret_token: str):
+        """X-Telegram-Bot-Api-Secret-Token must echo the secret set with setWebhook."""
+        if not WEBHOOK_VERIFY_SIGNATURES:
+            return
+        require_secret(TELEGRAM_WEBHOOK_SECRET, "TELEGRAM_WEBHOOK_SECRET")
+        check_signature(TELEGRAM_WEBHOOK_SECRET, secret_token, "Telegram")
+
+    async def parse_request(self, request: Request) -> List[InboundMessage]:
+        self.verify(request.headers.get("x-telegram-bot-api-secret-token", ""))
+        brand_id = request.query_params.get("brand_id")
+        if brand_id is None:
+            raise ValueError("brand_id is required")
+        return parse_update(json.loads(await request.body()), int(brand_id))
+
+    def build_send(self, contact: str, text: str) -> Tuple[str, dict]:
+        return f"/bot{TELEGRAM_BOT_TOKEN}/sendMessage", {"json": {"chat_id": contact, "text": text}}
@@ -0,0 +1,184 @@
+# backend/app/core/channels/twilio.py
+"""Twilio: signed form-encoded webhooks (messaging and voice) in, Messages API out."""
+import base64
+import hashlib
+import hmac
+import json
+import os
+from typing import AsyncIterator, Dict, Iterable, List, Tuple
+
+import aiofiles
+from fastapi import Request, Response, WebSocket
+
+from app.core.channels.base import (
+    WEBHOOK_VERIFY_SIGNATURES, ChannelAdapter, InboundMessage, check_signature, require_secret,
+)
+
+TWILIO_API_URL = os.getenv("TWILIO_API_URL", "https://api.twilio.com")
+TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID", "")
+TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN", "")
+TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER", "")
+# Sender for WhatsApp replies through Twilio, when it isn't the SMS number
+TWILIO_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER", "") or TWILIO_PHONE_NUMBER
+TWILIO_RATE_PER_SECOND = float(os.getenv("TWILIO_RATE_PER_SECOND", "10"))
+# Public base URL the providers call (Twilio signs the full URL); defaults to the request URL
+WEBHOOK_PUBLIC_URL = os.getenv("WEBHOOK_PUBLIC_URL", "")
+
+# Twilio reads the response as TwiML; an empty document means "no reply"
+EMPTY_TWIML = '<?xml version="1.0" encoding="UTF-8"?><Response></Response>'
+WHATSAPP_SCHEME = "whatsapp:"
+# Media Streams always carry 8 kHz mono mu-law
+MEDIA_STREAM_ENCODING = "mulaw"
+MEDIA_STREAM_SAMPLE_RATE = 8000
+
+
+def _public_url(url: str, scheme: str) -> str:
+    """The URL Twilio called, when we sit behind a proxy at WEBHOOK_PUBLIC_URL."""
+    if not WEBHOOK_PUBLIC_URL:
+        return url
+    public = WEBHOOK_PUBLIC_URL.rstrip("/")
+    return scheme + public[public.index(":"):] + url[url.index("/", url.index("//") + 2):]
+
+
+def _strip_scheme(address: str) -> str:
+    # Twilio prefixes WhatsApp addresses with WHATSAPP_SCHEME
+    return address.split(":", 1)[1] if ":" in address else address
+
+
+def parse_message(form: Dict[str, str]) -> List[InboundMessage]:
+    """
+    Twilio Messaging: SMS, or WhatsApp through Twilio. The latter is its own
+    channel ("twilio_whatsapp") so replies go back through Twilio rather
+    than the WhatsApp Cloud API.
+    """
+    if not form.get("MessageSid") or not form.get("From"):
+        return []
+    channel = "twilio_whatsapp" if form["From"].startswith(WHATSAPP_SCHEME) else "sms"
+    return [InboundMessage(
+        key=f"twilio:{form['MessageSid']}",
+        channel=channel,
+        contact=_strip_scheme(form["From"]),
+        text=form.get("Body", ""),
+        brand_number=_strip_scheme(form.get("To", "")),
+    )]
+
+
+def parse_voice(form: Dict[str, str]) -> List[InboundMessage]:
+    """Twilio recording/transcription callbacks; other call status callbacks are ignored."""
+    recording = form.get("RecordingSid")
+    if not recording or not form.get("From"):
+        return []
+    return [InboundMessage(
+        key=f"twilio:{recording}",
+        channel="voice",
+        contact=form["From"],
+        text=form.get("TranscriptionText") or None,
+        brand_number=form.get("To", ""),
+        audio_url=form.get("RecordingUrl"),
+    )]
+
+
+def parse_stream_start(event: dict) -> InboundMessage:
+    """
+    The "start" event of a Media Stream. Twilio doesn't include the numbers,
+    so the TwiML that opens the stream must pass From and To as <Parameter>s.
+    """
+    start = event["start"]
+    parameters = start.get("customParameters", {})
+    return InboundMessage(
+        key=f"twilio:{start['callSid']}",
+        channel="voice",
+        contact=parameters["From"],
+        text=None,
+        brand_number=parameters.get("To", ""),
+    )
+
+
+async def _stream_events(websocket: WebSocket) -> AsyncIterator[dict]:
+    async for raw in websocket.iter_text():
+        event = json.loads(raw)
+        if event.get("event") == "stop":
+            return
+        yield event
+
+
+async def _stream_audio(events: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for event in events:
+        if event.get("event") == "media":
+            yield base64.b64decode(event["media"]["payload"])
+
+
+class TwilioAdapter(ChannelAdapter):
+    name = "twilio"
+    base_url = TWILIO_API_URL
+    # api.twilio.com only speaks HTTP/1.1; keep-alive still saves the handshakes
+    http2 = False
+    rate_per_second = TWILIO_RATE_PER_SECOND
+
+    def verify(self, url: str, params: Iterable[Tuple[str, str]], signature: str):
+        """X-Twilio-Signature: base64 HMAC-SHA1 of the URL followed by the sorted POST params."""
+        self._check(_public_url(url, "https"), params, signature)
+
+    def _check(self, url: str, params: Iterable[Tuple[str, str]], signature: str):
+        if not WEBHOOK_VERIFY_SIGNATURES:
+            return
+        require_secret(TWILIO_AUTH_TOKEN, "TWILIO_AUTH_TOKEN")
+        payload = url + "".join(key + value for key, value in sorted(params))
+        expected = base64.b64encode(
+            hmac.new(TWILIO_AUTH_TOKEN.encode(), payload.encode(), hashlib.sha1).digest()
+        ).decode()
+        check_signature(expected, signature, "Twilio")
+
+    async def _form(self, request: Request) -> Dict[str, str]:
+        form = await request.form()
+        self.verify(str(request.url), form.multi_items(), request.headers.get("x-twilio-signature", ""))
+        return dict(form)
+
+    async def parse_request(self, request: Request) -> List[InboundMessage]:
+        return parse_message(await self._form(request))
+
+    async def parse_voice_request(self, request: Request) -> List[InboundMessage]:
+        return parse_voice(await self._form(request))
+
+    def ack(self) -> Response:
+        return Response(EMPTY_TWIML, media_type="application/xml")
+
+    def verify_stream(self, websocket: WebSocket):
+        """Media Stream handshakes are signed like webhooks, over the wss:// URL with no params."""
+        self._check(_public_url(str(websocket.url), "wss"), (), websocket.headers.get("x-twilio-signature", ""))
+
+    async def read_media_stream(self, websocket: WebSocket) -> Tuple[InboundMessage, AsyncIterator[bytes]]:
+        """
+        Wait for the start of a Media Stream (call audio pushed over a
+        WebSocket); returns the caller as an InboundMessage and an iterator of
+        8 kHz mu-law audio chunks that ends with the call.
+        """
+        events = _stream_events(websocket)
+        async for event in events:
+            if event.get("event") == "start":
+                return parse_stream_start(event), _stream_audio(events)
+        raise ValueError("Media stream ended before it started")
+
+    async def download_recording(self, url: str, file_path: str):
+        """Stream a call recording (a RecordingUrl, WAV by default) to file_path."""
+        async with self._slots:
+            async with self.http.stream("GET", url) as response:
+                response.raise_for_status()
+                async with aiofiles.open(file_path, "wb") as out:
+                    async for chunk in response.aiter_bytes():
+                        await out.write(chunk)
+
+    def client_options(self) -> dict:
+        return {"auth": (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)}
+
+    def build_send(self, contact: str, text: str) -> Tuple[str, dict]:
+        """contact is a phone number, or "whatsapp:<number>" for WhatsApp (see registry.reply_address)."""
+        if contact.startswith(WHATSAPP_SCHEME):
+            sender = WHATSAPP_SCHEME + TWILIO_WHATSAPP_NUMBER
+        else:
+            sender = TWILIO_PHONE_NUMBER
+        return f"/2010-04-01/Accounts/{TWILIO_ACCOUNT_SID}/Messages.json", {"data": {
+            "From": sender,
+            "To": contact,
+            "Body": text,
+        }}
@@ -0,0 +1,106 @@
+# backend/app/core/channels/webchat.py
+"""
+Website chat widget, relayed through our own chat gateway.
+
+The gateway posts visitor messages as {"id", "session", "brand_id", "text"}
+signed with X-Webchat-Signature (hex HMAC-SHA256 of the body with
+WEBCHAT_SECRET). Unlike the phone providers, the gateway accepts a JSON
+array of outbound messages, so replies sent within WEBCHAT_BATCH_WINDOW_MS
+of each other share one request.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+from typing import List, Optional, Set, Tuple
+
+from fastapi import Request
+
+from app.core.channels.base import (
+    WEBHOOK_VERIFY_SIGNATURES, ChannelAdapter, InboundMessage, check_signature, require_secret,
+)
+
+WEBCHAT_API_URL = os.getenv("WEBCHAT_API_URL", "http://localhost:8090")
+WEBCHAT_SECRET = os.getenv("WEBCHAT_SECRET", "")
+WEBCHAT_RATE_PER_SECOND = float(os.getenv("WEBCHAT_RATE_PER_SECOND", "50"))
+WEBCHAT_BATCH_WINDOW_MS = float(os.getenv("WEBCHAT_BATCH_WINDOW_MS", "20"))
+WEBCHAT_BATCH_MAX_SIZE = int(os.getenv("WEBCHAT_BATCH_MAX_SIZE", "100"))
+
+
+def parse_payload(payload: dict) -> List[InboundMessage]:
+    if not payload.get("text"):
+        return []
+    return [InboundMessage(
+        key=f"webchat:{payload['id']}",
+        channel="webchat",
+        contact=str(payload["session"]),
+        text=payload["text"],
+        brand_id=int(payload["brand_id"]),
+    )]
+
+
+class WebchatAdapter(ChannelAdapter):
+    name = "webchat"
+    base_url = WEBCHAT_API_URL
+    http2 = True
+    rate_per_second = WEBCHAT_RATE_PER_SECOND
+
+    def __init__(self):
+        super().__init__()
+        # (contact, text, future) triples in the open batch window
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+
+    def verify(self, body: bytes, signature: str):
+        if not WEBHOOK_VERIFY_SIGNATURES:
+            return
+        require_secret(WEBCHAT_SECRET, "WEBCHAT_SECRET")
+        expected = hmac.new(WEBCHAT_SECRET.encode(), body, hashlib.sha256).hexdigest()
+        check_signature(expected, signature, "webchat")
+
+    async def parse_request(self, request: Request) -> List[InboundMessage]:
+        body = await request.body()
+        self.verify(body, request.headers.get("x-webchat-signature", ""))
+        return parse_payload(json.loads(body))
+
+    async def send(self, contact: str, text: str):
+        """Queue the reply into the current batch window and wait for its request."""
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            self._timer = loop.call_later(WEBCHAT_BATCH_WINDOW_MS / 1000, self._flush_window)
+        future = loop.create_future()
+        self._pending.append((contact, text, future))
+        if len(self._pending) >= WEBCHAT_BATCH_MAX_SIZE:
+            self._flush_window()
+        await asyncio.shield(future)
+
+    def _flush_window(self):
+        # A window filled before its timer fired must not leave the timer to cut the next one short
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        window, self._pending = self._pending, []
+        if window:
+            task = asyncio.get_running_loop().create_task(self._run_batch(window))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, window: List[Tuple[str, str, asyncio.Future]]):
+        try:
+            await self._post("/messages", json=[{"session": contact, "text": text} for contact, text, _ in window])
+        except Exception as exc:
+            for _, _, future in window:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for _, _, future in window:
+            if not future.done():
+                future.set_result(None)
+
+    async def close(self):
+        self._flush_window()
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        await super().close()
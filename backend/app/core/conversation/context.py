@@ -0,0 +1,96 @@
+# backend/app/core/conversation/context.py
+"""
+Per-conversation state kept in memory between webhook hits.
+
+A conversation is one customer (contact) talking to one brand on one
+channel. Objects here use __slots__ and keep only the last
+CONVERSATION_MAX_TURNS turns, each truncated to CONVERSATION_MAX_TURN_CHARS,
+so a resident conversation costs a bounded, small amount of memory however
+long the customer keeps writing. nbytes is maintained incrementally so the
+manager can report memory use without walking every session.
+"""
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Iterable, List, Optional, Tuple
+
+CONVERSATION_MAX_TURNS = int(os.getenv("CONVERSATION_MAX_TURNS", "20"))
+CONVERSATION_MAX_TURN_CHARS = int(os.getenv("CONVERSATION_MAX_TURN_CHARS", "1000"))
+
+ConversationKey = Tuple[int, str, str]  # (brand_id, channel, contact)
+
+
+class Turn:
+    __slots__ = ("role", "text", "at")
+
+    def __init__(self, role: str, text: str, at: float):
+        self.role = role  # "customer" or "agent"
+        self.text = text
+        self.at = at  # epoch seconds
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.text) + sys.getsizeof(self.at)
+
+    def to_dict(self) -> dict:
+        return {"role": self.role, "text": self.text, "at": datetime.utcfromtimestamp(self.at).isoformat()}
+
+
+class ConversationContext:
+    __slots__ = ("brand_id", "channel", "contact", "ticket_id", "turns", "turn_count",
+                 "updated_at", "last_seen", "nbytes")
+
+    def __init__(self, brand_id: int, channel: str, contact: str, ticket_id: Optional[int] = None,
+                 turns: Iterable[Turn] = (), turn_count: int = 0, updated_at: Optional[float] = None):
+        self.brand_id = brand_id
+        self.channel = channel
+        self.contact = contact
+        self.ticket_id = ticket_id
+        self.turns: Deque[Turn] = deque(turns, maxlen=CONVERSATION_MAX_TURNS)
+        self.turn_count = turn_count  # every turn ever, not just the retained ones
+        self.updated_at = updated_at or time.time()
+        self.last_seen = time.monotonic()  # for idle expiry and LRU order
+        self.nbytes = sys.getsizeof(self) + sys.getsizeof(self.turns) + sum(turn.nbytes() for turn in self.turns)
+
+    @property
+    def key(self) -> ConversationKey:
+        return (self.brand_id, self.channel, self.contact)
+
+    def add_turn(self, role: str, text: str, ticket_id: Optional[int] = None) -> int:
+        """Append a turn (dropping the oldest past the cap); returns the change in nbytes."""
+        turn = Turn(role, (text or "")[:CONVERSATION_MAX_TURN_CHARS], time.time())
+        delta = turn.nbytes()
+        if len(self.turns) == self.turns.maxlen:
+            delta -= self.turns[0].nbytes()
+        self.turns.append(turn)
+        self.turn_count += 1
+        self.updated_at = turn.at
+        if ticket_id is not None:
+            self.ticket_id = ticket_id
+        self.nbytes += delta
+        return delta
+
+    def recent(self, limit: Optional[int] = None) -> List[Turn]:
+        turns = list(self.turns)
+        return turns[-limit:] if limit else turns
+
+    # Persistence -----------------------------------------------------------
+
+    def to_row(self) -> dict:
+        return {
+            "brand_id": self.brand_id,
+            "channel": self.channel,
+            "contact": self.contact,
+            "ticket_id": self.ticket_id,
+            "turns": json.dumps([[turn.role, turn.text, turn.at] for turn in self.turns]),
+            "turn_count": self.turn_count,
+            "updated_at": datetime.utcfromtimestamp(self.updated_at),
+        }
+
+    @classmethod
+    def from_row(cls, row) -> "ConversationContext":
+        turns = [Turn(role, text, at) for role, text, at in json.loads(row.turns or "[]")]
+        updated_at = (row.updated_at - datetime(1970, 1, 1)).total_seconds() if row.updated_at else None
+        return cls(row.brand_id, row.channel, row.contact, row.ticket_id, turns, row.turn_count or 0, updated_at)
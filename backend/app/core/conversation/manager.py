@@ -0,0 +1,254 @@
+# backend/app/core/conversation/manager.py
+"""
+Conversation state store: an in-memory tier in front of the conversations table.
+
+Resident conversations live in an LRU of at most CONVERSATION_MAX_SESSIONS
+contexts; ones idle for CONVERSATION_IDLE_SECONDS are swept out. A message
+on a resident conversation costs no database access at all:
+
+* Reads hit the database only on a miss, and get_many() loads every missing
+  conversation of a webhook batch with one SELECT.
+* Writes are write-behind. Changed contexts are marked dirty and a
+  background task upserts all of them every CONVERSATION_FLUSH_SECONDS in
+  batches, so a busy number writing ten messages between flushes costs one
+  row write. Evicting a dirty context keeps it queued for the next flush,
+  and a miss on it is served from that queue instead of the stale row.
+
+Anything not yet flushed when a worker crashes is lost (a graceful
+shutdown flushes). Each worker process has its own resident set; inbound
+messages for one contact are always handled by the same worker consumer,
+and a conversation moving between processes picks up the last flushed
+state.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.conversation.context import ConversationContext, ConversationKey
+from app.database import AsyncSessionLocal
+from app.models import Conversation
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "50000"))
+CONVERSATION_IDLE_SECONDS = float(os.getenv("CONVERSATION_IDLE_SECONDS", "1800"))
+CONVERSATION_FLUSH_SECONDS = float(os.getenv("CONVERSATION_FLUSH_SECONDS", "5"))
+CONVERSATION_FLUSH_BATCH_SIZE = 500
+CONVERSATION_LOAD_BATCH_SIZE = 200
+
+_PERSISTED = ("ticket_id", "turns", "turn_count", "updated_at")
+
+
+class ConversationManager:
+    def __init__(self, max_sessions: int = CONVERSATION_MAX_SESSIONS,
+                 idle_seconds: float = CONVERSATION_IDLE_SECONDS):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions: "OrderedDict[ConversationKey, ConversationContext]" = OrderedDict()
+        # Changed since the last flush, resident or already evicted
+        self._dirty: Dict[ConversationKey, ConversationContext] = {}
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "loaded": 0, "created": 0, "evicted_lru": 0,
+                      "evicted_idle": 0, "flushed": 0, "flush_failures": 0}
+
+    # Lookup ----------------------------------------------------------------
+
+    def _touch(self, context: ConversationContext):
+        context.last_seen = time.monotonic()
+        self._sessions.move_to_end(context.key)
+
+    def _admit(self, context: ConversationContext) -> ConversationContext:
+        self._sessions[context.key] = context
+        self._bytes += context.nbytes
+        while len(self._sessions) > self.max_sessions:
+            self._evict(next(iter(self._sessions)))
+            self.stats["evicted_lru"] += 1
+        return context
+
+    def _evict(self, key: ConversationKey):
+        # A dirty context stays in _dirty until flushed
+        context = self._sessions.pop(key)
+        self._bytes -= context.nbytes
+
+    def peek(self, key: ConversationKey) -> Optional[ConversationContext]:
+        """The context if it is in memory, without loading or touching it."""
+        return self._sessions.get(key) or self._dirty.get(key)
+
+    async def get(self, brand_id: int, channel: str, contact: str) -> ConversationContext:
+        key = (brand_id, channel, contact)
+        return (await self.get_many([key]))[key]
+
+    async def get_many(self, keys: Iterable[ConversationKey]) -> Dict[ConversationKey, ConversationContext]:
+        """Contexts for keys, loading all non-resident ones in one query."""
+        found: Dict[ConversationKey, ConversationContext] = {}
+        missing: List[ConversationKey] = []
+        for key in dict.fromkeys(keys):
+            context = self._sessions.get(key)
+            if context is not None:
+                self.stats["hits"] += 1
+                self._touch(context)
+                found[key] = context
+            elif key in self._dirty:
+                # Evicted before its last write was flushed: newer than the row
+                self.stats["hits"] += 1
+                found[key] = self._admit(self._dirty[key])
+                self._touch(found[key])
+            else:
+                self.stats["misses"] += 1
+                missing.append(key)
+        if not missing:
+            return found
+
+        loaded = await self._load(missing)
+        for key in missing:
+            # Another caller may have loaded or created it while we waited
+            context = self._sessions.get(key) or self._dirty.get(key)
+            if context is None:
+                context = loaded.get(key)
+                if context is None:
+                    context = ConversationContext(*key)
+                    self.stats["created"] += 1
+                else:
+                    self.stats["loaded"] += 1
+            if key not in self._sessions:
+                self._admit(context)
+            self._touch(context)
+            found[key] = context
+        return found
+
+    async def _load(self, keys: List[ConversationKey]) -> Dict[ConversationKey, ConversationContext]:
+        loaded = {}
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(keys), CONVERSATION_LOAD_BATCH_SIZE):
+                chunk = keys[start:start + CONVERSATION_LOAD_BATCH_SIZE]
+                rows = (await db.execute(select(Conversation).where(or_(*(
+                    and_(Conversation.brand_id == brand_id, Conversation.channel == channel,
+                         Conversation.contact == contact)
+                    for brand_id, channel, contact in chunk
+                ))))).scalars()
+                for row in rows:
+                    context = ConversationContext.from_row(row)
+                    loaded[context.key] = context
+        return loaded
+
+    # Updates ---------------------------------------------------------------
+
+    def record(self, context: ConversationContext, role: str, text: str, ticket_id: Optional[int] = None):
+        """Append a turn; persisted by the next flush."""
+        delta = context.add_turn(role, text, ticket_id)
+        if context.key in self._sessions:
+            self._bytes += delta
+        self._dirty[context.key] = context
+
+    async def flush(self) -> int:
+        """Upsert every dirty context in batches. Returns how many were written."""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        # Snapshot now: contexts keep changing while the write is in flight
+        rows = [context.to_row() for context in dirty.values()]
+        try:
+            async with AsyncSessionLocal() as db:
+                for start in range(0, len(rows), CONVERSATION_FLUSH_BATCH_SIZE):
+                    await _upsert(db, rows[start:start + CONVERSATION_FLUSH_BATCH_SIZE])
+                await db.commit()
+        except Exception:
+            self.stats["flush_failures"] += 1
+            # Requeue, unless changed again meanwhile (then it is queued already)
+            for key, context in dirty.items():
+                self._dirty.setdefault(key, context)
+            raise
+        self.stats["flushed"] += len(rows)
+        return len(rows)
+
+    def sweep(self) -> int:
+        """Evict conversations idle for longer than idle_seconds; returns how many."""
+        cutoff = time.monotonic() - self.idle_seconds
+        expired = []
+        # LRU order: the least recently seen come first
+        for key, context in self._sessions.items():
+            if context.last_seen > cutoff:
+                break
+            expired.append(key)
+        for key in expired:
+            self._evict(key)
+        self.stats["evicted_idle"] += len(expired)
+        return len(expired)
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "resident": len(self._sessions),
+            "dirty": len(self._dirty),
+            "resident_bytes": self._bytes,
+            "max_sessions": self.max_sessions,
+        }
+
+
+async def _upsert(db, rows: List[dict]):
+    dialect = db.get_bind().dialect.name
+    table = Conversation.__table__
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["brand_id", "channel", "contact"],
+            set_={name: stmt.excluded[name] for name in _PERSISTED},
+        )
+        await db.execute(stmt, rows)
+        return
+    for row in rows:
+        result = await db.execute(
+            update(table)
+            .where(table.c.brand_id == row["brand_id"], table.c.channel == row["channel"],
+                   table.c.contact == row["contact"])
+            .values(**{name: row[name] for name in _PERSISTED})
+        )
+        if result.rowcount == 0:
+            await db.execute(table.insert().values(**row))
+
+
+manager = ConversationManager()
+_flusher: Optional[asyncio.Task] = None
+
+
+async def _flush_forever():
+    while True:
+        await asyncio.sleep(CONVERSATION_FLUSH_SECONDS)
+        try:
+            await manager.flush()
+        except Exception:
+            logger.exception("Conversation flush failed")
+        manager.sweep()
+
+
+def start():
+    global _flusher
+    if _flusher is None or _flusher.done():
+        _flusher = asyncio.get_running_loop().create_task(_flush_forever())
+
+
+async def stop():
+    """Stop the periodic flush and write out whatever is still dirty."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        try:
+            await _flusher
+        except asyncio.CancelledError:
+            pass
+        _flusher = None
+    try:
+        await manager.flush()
+    except Exception:
+        logger.exception("Final conversation flush failed")
+
+
+def status() -> dict:
+    return manager.status()
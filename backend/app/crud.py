@@ -1,23 +1,36 @@
 # backend/app/crud.py
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
-from app.utils import get_password_hash
+from app.services import rollups
+from app.utils import hash_password_async
+from datetime import datetime
+from typing import Optional
+import base64
+import json
 import logging
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
 
-def get_user_by_id(db: Session, user_id: int):
-    return db.query(models.User).filter(models.User.id == user_id).first()
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.get(models.User, user_id)
 
-def create_user(db: Session, user: schemas.UserCreate):
+async def get_brand_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(models.Brand).where(models.Brand.email == email))
+    return result.scalars().first()
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate):
     logger.info(f"Creating user with email: {user.email}")
     
+    # Hashed on the bounded pool; raises 503 when it is saturated
+    hashed = await hash_password_async(user.password)
+    
     try:
-        hashed = get_password_hash(user.password)
         db_user = models.User(
             name=user.name,
             email=user.email,
@@ -32,18 +45,18 @@ def create_user(db: Session, user: schemas.UserCreate):
         db.add(db_user)
         
         logger.info("Flushing to database...")
-        db.flush()  # Force write to database
+        await db.flush()  # Force write to database
         
         logger.info("Committing to database...")
-        db.commit()
+        await db.commit()
         
         logger.info(f"Refreshing user object...")
-        db.refresh(db_user)
+        await db.refresh(db_user)
         
         logger.info(f"User created successfully with ID: {db_user.id}")
         
         # Double-check by querying
-        check_user = db.query(models.User).filter(models.User.id == db_user.id).first()
+        check_user = await get_user_by_id(db, db_user.id)
         if check_user:
             logger.info(f"✓ Verified: User exists in DB with ID {check_user.id}")
         else:
@@ -53,10 +66,10 @@ def create_user(db: Session, user: schemas.UserCreate):
         
     except Exception as e:
         logger.error(f"Error creating user: {e}")
-        db.rollback()
+        await db.rollback()
         raise
 
-def create_ticket(db: Session, ticket: schemas.TicketCreate):
+async def create_ticket(db: AsyncSession, ticket: schemas.TicketCreate):
     db_ticket = models.Ticket(
         brand_id=ticket.brand_id,
         user_id=ticket.user_id,
@@ -66,12 +79,80 @@ def create_ticket(db: Session, ticket: schemas.TicketCreate):
         status="new"
     )
     db.add(db_ticket)
-    db.commit()
-    db.refresh(db_ticket)
+    await db.flush()
+    await db.run_sync(rollups.record_ticket_created, db_ticket)
+    await db.commit()
+    await db.refresh(db_ticket)
     return db_ticket
 
-def get_ticket(db: Session, ticket_id: int):
-    return db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
+async def get_ticket(db: AsyncSession, ticket_id: int):
+    return await db.get(models.Ticket, ticket_id)
+
+def _filter_tickets(query, brand_id: Optional[int] = None, status: Optional[str] = None,
+                    channel: Optional[str] = None):
+    if brand_id is not None:
+        query = query.where(models.Ticket.brand_id == brand_id)
+    if status is not None:
+        query = query.where(models.Ticket.status == status)
+    if channel is not None:
+        query = query.where(models.Ticket.channel == channel)
+    return query
+
+async def list_tickets(db: AsyncSession, skip: int = 0, limit: int = 20, brand_id: Optional[int] = None,
+                       status: Optional[str] = None, channel: Optional[str] = None):
+    query = _filter_tickets(select(models.Ticket), brand_id, status, channel)
+    result = await db.execute(query.order_by(
+        models.Ticket.created_at.desc(), models.Ticket.id.desc()
+    ).offset(skip).limit(limit))
+    return result.scalars().all()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Keyset pagination
+# ─────────────────────────────────────────────────────────────────────────────
+
+def encode_cursor(created_at: datetime, ticket_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), ticket_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Return (created_at, id) for a cursor, or raise ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+async def list_tickets_keyset(db: AsyncSession, limit: int = 20, cursor: Optional[str] = None,
+                              brand_id: Optional[int] = None, status: Optional[str] = None,
+                              channel: Optional[str] = None):
+    """
+    Newest-first page of tickets keyed on (created_at, id).
+
+    Each page seeks straight to the cursor through the composite indexes on
+    Ticket, so deep pages cost the same as the first one and rows inserted
+    while paging don't shift results. Returns (tickets, next_cursor) where
+    next_cursor is None on the last page. Tickets without a created_at
+    (rows written before it had a default) have no place in that order and
+    are left out.
+    """
+    query = _filter_tickets(select(models.Ticket), brand_id, status, channel)
+    query = query.where(models.Ticket.created_at.isnot(None))
+    if cursor:
+        created_at, ticket_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(models.Ticket.created_at, models.Ticket.id) < tuple_(created_at, ticket_id)
+        )
+
+    # Fetch one extra row to learn whether another page exists
+    result = await db.execute(query.order_by(
+        models.Ticket.created_at.desc(), models.Ticket.id.desc()
+    ).limit(limit + 1))
+    rows = result.scalars().all()
 
-def list_tickets(db: Session, skip: int = 0, limit: int = 20):
-    return db.query(models.Ticket).offset(skip).limit(limit).all()
\ No newline at end of file
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
\ No newline at end of file
@@ -1,8 +1,13 @@
 # backend/app/database.py
 
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.schema import CreateIndex
 
 # Import your Base so create_all() (if you call it) knows about it
 from app.db.base_class import Base
@@ -13,12 +18,169 @@ DATABASE_URL = os.getenv(
     "sqlite:///./test.db"  # fallback for local dev
 )
 
+# Connection pool settings (ignored for SQLite, which uses its own pooling)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 disables
+
+
+class PoolStats:
+    """Counters fed by pool events, read by the internal pool endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connected_at = {}
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def connection_opened(self, key):
+        with self._lock:
+            self._connected_at[key] = time.monotonic()
+
+    def connection_closed(self, key):
+        with self._lock:
+            self._connected_at.pop(key, None)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - opened for opened in self._connected_at.values()]
+            return {
+                "checkouts": self.checkouts,
+                "wait_seconds_avg": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+                "open_connections": len(ages),
+                "connection_age_seconds_max": max(ages, default=0.0),
+                "connection_age_seconds_avg": sum(ages) / len(ages) if ages else 0.0,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+    stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.record_wait(time.perf_counter() - started)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """asyncio flavour of InstrumentedQueuePool, for the async engine."""
+    stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.record_wait(time.perf_counter() - started)
+
+
+def _async_url(url: str) -> str:
+    """Swap the sync driver in DATABASE_URL for its asyncio counterpart."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
 # For SQLite only: disable thread check
 connect_args = {}
+async_connect_args = {}
+engine_kwargs = {}
 if DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
+else:
+    engine_kwargs = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if DB_STATEMENT_TIMEOUT_MS and DATABASE_URL.startswith("postgres"):
+        connect_args = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+        async_connect_args = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=connect_args,
+    **({"poolclass": InstrumentedQueuePool, **engine_kwargs} if engine_kwargs else {})
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=async_connect_args,
+    **({"poolclass": InstrumentedAsyncQueuePool, **engine_kwargs} if engine_kwargs else {})
+)
+
+
+def _track_connections(sync_engine, stats: PoolStats):
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.connection_opened(id(dbapi_connection))
+
+    @event.listens_for(sync_engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        stats.connection_closed(id(dbapi_connection))
+
+    @event.listens_for(sync_engine, "close_detached")
+    def _on_close_detached(dbapi_connection):
+        stats.connection_closed(id(dbapi_connection))
+
+
+_track_connections(engine, InstrumentedQueuePool.stats)
+_track_connections(async_engine.sync_engine, InstrumentedAsyncQueuePool.stats)
+
+
+def _pool_status(pool, stats: PoolStats) -> dict:
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    status.update(stats.snapshot())
+    return status
+
+
+def get_pool_status() -> dict:
+    """Live pool gauges plus wait/age counters, for sizing against max_connections."""
+    status = {
+        "sync": _pool_status(engine.pool, InstrumentedQueuePool.stats),
+        "async": _pool_status(async_engine.pool, InstrumentedAsyncQueuePool.stats),
+    }
+    if engine_kwargs:
+        status["config"] = {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout_seconds": DB_POOL_TIMEOUT,
+            "recycle_seconds": DB_POOL_RECYCLE,
+            "pre_ping": DB_POOL_PRE_PING,
+            "statement_timeout_ms": DB_STATEMENT_TIMEOUT_MS,
+        }
+    return status
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -26,9 +188,58 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Optional: create tables (call this once at startup if you want)
 # Base.metadata.create_all(bind=engine)
 
+def ensure_columns(bind=engine):
+    """
+    Add nullable columns declared on the models but missing from existing
+    tables. Like ensure_indexes, this lets deployments created before a
+    column was introduced pick it up without a migration; existing rows get
+    NULL, so code reading such columns must treat NULL as "not set".
+    """
+    inspector = inspect(bind)
+    preparer = bind.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            with bind.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(bind.dialect)}"
+                ))
+
+def ensure_indexes(bind=engine):
+    """
+    Create any index declared on the models that is missing from the
+    database. create_all() only builds indexes together with new tables,
+    so existing deployments need this to pick up indexes added later.
+    On Postgres they are built CONCURRENTLY so a large table stays
+    writable meanwhile; that can't run inside a transaction, hence
+    autocommit.
+    """
+    if bind.dialect.name != "postgresql":
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=bind, checkfirst=True)
+        return
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=bind.dialect))
+                # CREATE [UNIQUE] INDEX CONCURRENTLY IF NOT EXISTS ...
+                conn.execute(text(ddl.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)))
+
 def get_db():
     """
     FastAPI dependency that yields a SQLAlchemy Session,
@@ -39,3 +250,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Async counterpart of get_db: yields an AsyncSession so handlers can
+    await queries instead of blocking the event loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
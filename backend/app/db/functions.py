@@ -0,0 +1,47 @@
+# backend/app/db/functions.py
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.types import Float
+
+
+class hours_between(FunctionElement):
+    """Hours elapsed between two timestamp expressions, per dialect."""
+    type = Float()
+    inherit_cache = True
+    name = "hours_between"
+
+
+@compiles(hours_between)
+def _hours_between_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "EXTRACT(EPOCH FROM (%s - %s)) / 3600.0" % (
+        compiler.process(end, **kw), compiler.process(start, **kw)
+    )
+
+
+@compiles(hours_between, "sqlite")
+def _hours_between_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "(julianday(%s) - julianday(%s)) * 24.0" % (
+        compiler.process(end, **kw), compiler.process(start, **kw)
+    )
+
+
+class search_document(FunctionElement):
+    """
+    Full-text document for a text column (Postgres tsvector).
+
+    Used both for the GIN index on ticket descriptions and in search
+    queries, so the planner sees the exact indexed expression.
+    """
+    type = TSVECTOR()
+    inherit_cache = True
+    name = "search_document"
+
+
+@compiles(search_document)
+def _search_document_default(element, compiler, **kw):
+    (column,) = list(element.clauses)
+    return "to_tsvector('english'::regconfig, coalesce(%s, ''))" % compiler.process(column, **kw)
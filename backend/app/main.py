@@ -1,14 +1,21 @@
-from fastapi import FastAPI
+from fastapi import APIRouter, Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.routes import webhook, tickets, analytics, auth, brands
-from app.database import engine
-from app.db.base_class import Base
+from app.api.v1.endpoints import tickets_extended
+from app import websocket
+from app.database import async_engine, get_pool_status
+from app.core.ai import cache as ai_cache, chatgpt
+from app.core.channels import registry as channels
+from app.core.conversation import manager as conversations
+from app.services import duplicates, jobs, public_feed, ticket_jobs, view_counter, webhooks
+from app.services.speech import deepgram
+from app.utils import get_current_admin_user, shutdown_password_hashing
 from app.models import User, Brand, Ticket  # Import all models
 from dotenv import load_dotenv
 load_dotenv()  # reads .env into os.environ
 
-# Create tables on startup
-Base.metadata.create_all(bind=engine)
+# Schema changes (tables, columns, indexes) are applied by init_db.py as a
+# deploy step, not here: every worker imports this module
 
 app = FastAPI(title="Complaint Hub API v1")
 
@@ -25,8 +32,35 @@ app.add_middleware(
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(brands.router, prefix="/api/v1/brands", tags=["brands"])  # Add brand routes
 app.include_router(webhook.router, prefix="/api/v1/webhook", tags=["webhook"])
+# Extended ticket routes go first so /public isn't captured by /{ticket_id}
+app.include_router(tickets_extended.router, prefix="/api/v1/tickets", tags=["tickets"])
 app.include_router(tickets.router, prefix="/api/v1/tickets", tags=["tickets"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
+app.include_router(websocket.router, prefix="/api/v1", tags=["live"])
+
+@app.on_event("startup")
+async def start_background_tasks():
+    public_feed.start_refresher()
+    view_counter.start_flusher()
+    duplicates.start()
+    await websocket.start()
+    webhooks.start()
+    conversations.start()
+
+@app.on_event("shutdown")
+async def release_resources():
+    await webhooks.stop()
+    await conversations.stop()
+    await public_feed.stop_refresher()
+    await view_counter.stop_flusher()
+    await jobs.stop()
+    await duplicates.stop()
+    await websocket.stop()
+    await chatgpt.close()
+    await channels.close()
+    await deepgram.close()
+    await async_engine.dispose()
+    shutdown_password_hashing()
 
 @app.get("/")
 def root():
@@ -34,4 +68,34 @@ def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+# Operational status, for admins only: these expose pool, queue and
+# connection details
+internal = APIRouter(dependencies=[Depends(get_current_admin_user)], include_in_schema=False)
+
+@internal.get("/db/pool")
+def db_pool_status():
+    return get_pool_status()
+
+@internal.get("/ai/cache")
+def ai_cache_status():
+    return ai_cache.results.status()
+
+@internal.get("/webhooks")
+def webhook_status():
+    return webhooks.status()
+
+@internal.get("/ws")
+def websocket_status():
+    return websocket.hub.status()
+
+@internal.get("/conversations")
+def conversation_status():
+    return conversations.status()
+
+@internal.get("/speech")
+def speech_status():
+    return deepgram.status()
+
+app.include_router(internal, prefix="/internal")
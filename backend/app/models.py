@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, Boolean, ForeignKey, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
+from app.db.functions import search_document
 from datetime import datetime
 
 class User(Base):
@@ -33,6 +34,9 @@ class Brand(Base):
     credits_updated_at = Column(DateTime, default=datetime.utcnow)
     auto_routing_enabled = Column(Boolean, default=False)
     routing_rules = Column(String)
+    # "remote" (Google NL, local lexicon as fallback) or "local"; NULL means
+    # SENTIMENT_DEFAULT_SCORER
+    sentiment_scorer = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -42,6 +46,18 @@ class Brand(Base):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Composite indexes backing keyset pagination on (created_at, id),
+        # optionally narrowed by brand, status or channel
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_brand_created_at_id", "brand_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tickets_channel_created_at_id", "channel", "created_at", "id"),
+        # Live dashboard counters (open/new tickets per brand)
+        Index("ix_tickets_brand_status", "brand_id", "status"),
+        # Finding a sender's open conversation for inbound webhooks
+        Index("ix_tickets_contact_status", "contact", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     brand_id = Column(Integer, ForeignKey("brands.id"))
@@ -60,12 +76,75 @@ class Ticket(Base):
     rated_at = Column(DateTime, nullable=True)
     resolved_at = Column(DateTime, nullable=True)
     resolution_time_hours = Column(Float, nullable=True)
+    # Set when the post-resolution follow-up goes out, so a redelivered job
+    # doesn't send it again; cleared when the ticket is reopened
+    follow_up_sent_at = Column(DateTime, nullable=True)
     is_public = Column(Boolean, default=True)
     view_count = Column(Integer, default=0)
     charge_applied = Column(Boolean, default=False)
     charge_amount = Column(Float, nullable=True)
+    # Sender address on messaging channels (phone number, chat id); NULL for
+    # tickets filed through the app
+    contact = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     brand = relationship("Brand", back_populates="tickets")
-    user = relationship("User", back_populates="tickets")
\ No newline at end of file
+    user = relationship("User", back_populates="tickets")
+
+
+# Full-text search over descriptions. Postgres keeps this GIN index current
+# on every insert/update; SQLite uses the FTS5 table from app.services.search.
+Index(
+    "ix_tickets_description_search",
+    search_document(Ticket.description),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
+
+class BrandDailyStat(Base):
+    """
+    Per brand, day, channel and category rollup of ticket counters.
+
+    Rows are keyed on the day the tickets were created and updated
+    incrementally by app.services.rollups as tickets are created, resolved
+    and rated. Unknown channel/category values are stored as "".
+    """
+    __tablename__ = "brand_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("brand_id", "day", "channel", "category", name="uq_brand_daily_stats_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    brand_id = Column(Integer, ForeignKey("brands.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    channel = Column(String, nullable=False, default="")
+    category = Column(String, nullable=False, default="")
+    total = Column(Integer, nullable=False, default=0)
+    resolved = Column(Integer, nullable=False, default=0)
+    resolution_count = Column(Integer, nullable=False, default=0)
+    resolution_hours = Column(Float, nullable=False, default=0.0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+
+
+class Conversation(Base):
+    """
+    Persisted tier of app.core.conversation: recent turns of one contact's
+    conversation with a brand on a channel. Written behind the in-memory
+    state in batches, and read back only when a conversation is not resident.
+    """
+    __tablename__ = "conversations"
+    __table_args__ = (
+        UniqueConstraint("brand_id", "channel", "contact", name="uq_conversations_contact"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    brand_id = Column(Integer, ForeignKey("brands.id"), nullable=False)
+    channel = Column(String, nullable=False)
+    contact = Column(String, nullable=False)
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=True)
+    # JSON list of [role, text, epoch seconds], oldest first, capped like the in-memory deque
+    turns = Column(Text, nullable=False, default="[]")
+    turn_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,8 +1,10 @@
 # backend/app/schemas.py
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, field_validator
+from typing import List, Optional
 from datetime import datetime
 
+from app.core.ai.sentiment import SCORERS
+
 # ─────────────────────────────────────────────────────────────────────────────
 # User schemas
 # ─────────────────────────────────────────────────────────────────────────────
@@ -37,6 +39,31 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[str] = None
 
+class Principal(BaseModel):
+    """
+    The authenticated caller as seen by request handlers. Built from the
+    users table (and cached), or straight from brand token claims, so it
+    never holds a live ORM object.
+    """
+    id: int
+    email: EmailStr
+    name: Optional[str] = None
+    phone: Optional[str] = None
+    is_active: bool = True
+    is_brand: bool = False
+    is_admin: bool = False
+    brand_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+    @property
+    def role(self) -> str:
+        if self.is_admin:
+            return "admin"
+        return "brand" if self.is_brand else "user"
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Ticket schemas
 # ─────────────────────────────────────────────────────────────────────────────
@@ -48,6 +75,13 @@ class TicketCreate(BaseModel):
     description: str
     category: str
 
+class TicketImport(TicketCreate):
+    """One row of a bulk import; history fields are optional"""
+    status: str = "new"
+    urgency: int = 1
+    created_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+
 class TicketUpdate(BaseModel):
     status: Optional[str] = None
     assigned_to: Optional[int] = None
@@ -82,6 +116,13 @@ class TicketOut(BaseModel):
     class Config:
         from_attributes = True
 
+class TicketPage(BaseModel):
+    items: List[TicketOut]
+    next_cursor: Optional[str] = None
+
+class TicketSearchHit(TicketOut):
+    rank: float
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Brand schemas
 # ─────────────────────────────────────────────────────────────────────────────
@@ -98,6 +139,15 @@ class BrandUpdate(BaseModel):
     phone_number: Optional[str] = None
     auto_routing_enabled: Optional[bool] = None
     routing_rules: Optional[str] = None
+    # None goes back to SENTIMENT_DEFAULT_SCORER
+    sentiment_scorer: Optional[str] = None
+
+    @field_validator("sentiment_scorer")
+    @classmethod
+    def known_scorer(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and value not in SCORERS:
+            raise ValueError(f"must be one of {', '.join(SCORERS)}")
+        return value
 
 class BrandRead(BaseModel):
     id: int
@@ -108,6 +158,7 @@ class BrandRead(BaseModel):
     phone_provider: Optional[str]
     credit_balance: float
     auto_routing_enabled: bool
+    sentiment_scorer: Optional[str] = None
     created_at: datetime
 
     class Config:
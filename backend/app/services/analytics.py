@@ -0,0 +1,103 @@
+# backend/app/services/analytics.py
+"""
+Database-side aggregation for brand analytics.
+
+All counting, summing and averaging runs in a single GROUP BY query over
+(category, channel). The handful of rows that come back are folded into the
+API response in Python, so cost no longer grows with the number of tickets
+loaded into memory.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.functions import hours_between
+from app.models import Ticket
+from app.services import rollups
+
+
+def _is_resolved():
+    return (Ticket.status == "resolved") & Ticket.resolved_at.isnot(None)
+
+
+def ticket_cells(db: Session, brand_id: int, start_date: Optional[datetime] = None,
+                 end_date: Optional[datetime] = None):
+    """
+    Aggregate a brand's tickets per (category, channel) in one query.
+
+    Each row carries the additive counters every analytics view is built from:
+    total, resolved, resolution_count, resolution_hours, rating_count and
+    rating_sum.
+    """
+    resolved = _is_resolved()
+    query = db.query(
+        Ticket.category.label("category"),
+        Ticket.channel.label("channel"),
+        func.count(Ticket.id).label("total"),
+        func.count(Ticket.id).filter(Ticket.status == "resolved").label("resolved"),
+        func.count(Ticket.id).filter(resolved).label("resolution_count"),
+        func.coalesce(
+            func.sum(hours_between(Ticket.created_at, Ticket.resolved_at)).filter(resolved), 0
+        ).label("resolution_hours"),
+        func.count(Ticket.rating).label("rating_count"),
+        func.coalesce(func.sum(Ticket.rating), 0).label("rating_sum"),
+    ).filter(Ticket.brand_id == brand_id)
+
+    if start_date:
+        query = query.filter(Ticket.created_at >= start_date)
+    if end_date:
+        query = query.filter(Ticket.created_at <= end_date)
+
+    return query.group_by(Ticket.category, Ticket.channel).all()
+
+
+def summarize(cells: Iterable) -> Dict:
+    """Fold (category, channel) aggregate rows into the analytics response."""
+    total = resolved = resolution_count = rating_count = 0
+    resolution_hours = rating_sum = 0.0
+    category_breakdown: Dict[str, int] = {}
+    channel_breakdown: Dict[str, int] = {}
+
+    for cell in cells:
+        total += cell.total
+        resolved += cell.resolved
+        resolution_count += cell.resolution_count
+        resolution_hours += cell.resolution_hours or 0
+        rating_count += cell.rating_count
+        rating_sum += cell.rating_sum or 0
+        category_breakdown[cell.category] = category_breakdown.get(cell.category, 0) + cell.total
+        channel_breakdown[cell.channel] = channel_breakdown.get(cell.channel, 0) + cell.total
+
+    avg_resolution_time = resolution_hours / resolution_count if resolution_count else 0
+    avg_rating = rating_sum / rating_count if rating_count else 0
+
+    return {
+        "total_tickets": total,
+        "resolved_tickets": resolved,
+        "resolution_rate": (resolved / total * 100) if total > 0 else 0,
+        "avg_resolution_time_hours": round(avg_resolution_time, 1),
+        "category_breakdown": category_breakdown,
+        "channel_breakdown": channel_breakdown,
+        "satisfaction_scores": {
+            "average": round(avg_rating, 1),
+            "total_ratings": rating_count
+        }
+    }
+
+
+def get_brand_analytics(db: Session, brand_id: int, start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None) -> Dict:
+    """
+    Brand analytics for tickets created in [start_date, end_date].
+
+    Ranges made of whole days (bounds at midnight, or open) are answered from
+    the brand_daily_stats rollup, so their cost doesn't grow with history.
+    There the end bound is exclusive, which only differs from the raw query
+    for tickets stamped exactly at midnight. Other ranges scan tickets.
+    """
+    days = rollups.whole_day_range(start_date, end_date)
+    if days is not None:
+        return summarize(rollups.rollup_cells(db, brand_id, *days))
+    return summarize(ticket_cells(db, brand_id, start_date, end_date))
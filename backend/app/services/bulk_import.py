@@ -0,0 +1,325 @@
+# backend/app/services/bulk_import.py
+"""
+Bulk ticket ingestion.
+
+The request body (NDJSON, or a JSON array) is parsed incrementally as it
+streams in, each row is validated on its own, and valid rows are written in
+batches of BULK_INSERT_BATCH_SIZE. Rows are scored with the lexicon's batch
+mode just before they are written. On Postgres a batch reserves its ids from
+the tickets sequence and is loaded with COPY (asyncpg) or an executemany
+INSERT (other drivers); on SQLite it is one executemany INSERT. Each batch
+commits together with its rollup deltas (one upsert per
+brand/day/channel/category bucket), then the affected dashboards are
+invalidated; the duplicate index picks up the imported id range in the
+background at the end. Invalid rows are reported by position and never stop
+the import; a body that stops parsing (malformed JSON array, oversized row)
+ends it at that position, keeping the rows before it.
+"""
+import codecs
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.core.ai import sentiment
+from app.models import Brand, Ticket, User
+from app.services import dashboard, duplicates, rollups
+
+BULK_INSERT_BATCH_SIZE = 2000
+BULK_MAX_REPORTED_ERRORS = 1000
+# Longest single row accepted; a longer one stops the import instead of being buffered
+BULK_MAX_ROW_BYTES = 1024 * 1024
+
+_COLUMNS = (
+    "brand_id", "user_id", "channel", "description", "category", "status",
+    "urgency", "sentiment_score", "abuse_level", "is_public", "view_count",
+    "charge_applied", "created_at", "resolved_at", "resolution_time_hours",
+)
+
+
+class RowError(ValueError):
+    pass
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[object]:
+    """
+    One parsed value per non-blank line; a bad line yields a RowError. A
+    line that outgrows BULK_MAX_ROW_BYTES before its newline arrives raises
+    one instead, ending the body there.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if len(line) > BULK_MAX_ROW_BYTES:
+                yield RowError(f"Row is longer than {BULK_MAX_ROW_BYTES} bytes")
+            elif line.strip():
+                yield _loads(line)
+        if len(buffer) > BULK_MAX_ROW_BYTES:
+            # Lines are independent, but this one can't be read to its end
+            raise RowError(f"Row is longer than {BULK_MAX_ROW_BYTES} bytes")
+    if buffer.strip():
+        yield _loads(buffer)
+
+
+def _loads(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return RowError(f"Invalid JSON: {exc}")
+
+
+_WHITESPACE = " \t\r\n"
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+
+
+def _incomplete(buffer: str, exc: json.JSONDecodeError) -> bool:
+    """Whether a decode error only means the element's remaining bytes haven't arrived."""
+    rest = buffer[exc.pos:]
+    return (
+        exc.msg.startswith("Unterminated string")
+        or (exc.msg.startswith("Invalid \\uXXXX escape") and exc.pos + 6 > len(buffer))
+        or any(literal.startswith(rest) for literal in _LITERALS)
+        or _NUMBER_CHARS.issuperset(rest)
+    )
+
+
+def _decode_element(decoder: json.JSONDecoder, buffer: str, pos: int):
+    """(value, end) for the element at pos, or None if it may still be incomplete."""
+    try:
+        value, end = decoder.raw_decode(buffer, pos)
+    except json.JSONDecodeError as exc:
+        if _incomplete(buffer, exc):
+            return None
+        raise RowError(f"Invalid JSON: {exc.msg}")
+    if not isinstance(value, (dict, list, str)) and _NUMBER_CHARS.issuperset(buffer[end:]):
+        # A bare number or literal at the end of the buffer may still be growing
+        return None
+    return value, end
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[object]:
+    """
+    Elements of a top-level JSON array, decoded as soon as each is complete.
+    Raises RowError as soon as the body can no longer be a valid array (a
+    malformed element, a missing or stray comma, an element longer than
+    BULK_MAX_ROW_BYTES), so the import stops at that row instead of
+    buffering the rest of the body.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    # What comes next: "[", then "value or ]", then alternately "," / "]" and "value"
+    expect = "["
+    async for chunk in chunks:
+        buffer = buffer[pos:] + text.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+            if expect == "end":
+                raise RowError("Unexpected data after the JSON array")
+            if expect == "[":
+                if char != "[":
+                    raise RowError("Body must be a JSON array")
+                expect = "value or ]"
+                pos += 1
+            elif char == "]" and expect != "value":
+                expect = "end"
+                pos += 1
+            elif expect == ", or ]":
+                if char != ",":
+                    raise RowError("Expected ',' or ']' after a row")
+                expect = "value"
+                pos += 1
+            elif char in ",]":
+                raise RowError("Expected a row, not '%s'" % char)
+            else:
+                element = _decode_element(decoder, buffer, pos)
+                end = element[1] if element else len(buffer)
+                if end - pos > BULK_MAX_ROW_BYTES:
+                    raise RowError(f"Row is longer than {BULK_MAX_ROW_BYTES} bytes")
+                if element is None:
+                    break
+                value, pos = element
+                expect = ", or ]"
+                yield value
+    if expect == "[":
+        raise RowError("Body must be a JSON array")
+    if expect != "end":
+        raise RowError("Truncated JSON array")
+
+
+def _validate(value, brand_id: Optional[int]) -> dict:
+    if isinstance(value, RowError):
+        raise value
+    if not isinstance(value, dict):
+        raise RowError("Row must be a JSON object")
+    try:
+        row = schemas.TicketImport.model_validate(value)
+    except ValidationError as exc:
+        raise RowError("; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        ))
+    if brand_id is not None and row.brand_id != brand_id:
+        raise RowError("brand_id does not match your brand")
+
+    created_at = _naive_utc(row.created_at) or datetime.utcnow()
+    resolved_at = _naive_utc(row.resolved_at) if row.status == "resolved" else None
+    if row.status == "resolved" and resolved_at is None:
+        resolved_at = created_at
+    if resolved_at is not None and resolved_at < created_at:
+        raise RowError("resolved_at is before created_at")
+    return {
+        "brand_id": row.brand_id,
+        "user_id": row.user_id,
+        "channel": row.channel,
+        "description": row.description,
+        "category": row.category,
+        "status": row.status,
+        "urgency": row.urgency,
+        "sentiment_score": 0.0,
+        "abuse_level": 0,
+        "is_public": True,
+        "view_count": 0,
+        "charge_applied": False,
+        "created_at": created_at,
+        "resolved_at": resolved_at,
+        "resolution_time_hours": (resolved_at - created_at).total_seconds() / 3600 if resolved_at else None,
+    }
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Tickets store naive UTC timestamps
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def _exists(db: AsyncSession, model, id_: int) -> bool:
+    return (await db.execute(select(model.id).where(model.id == id_))).first() is not None
+
+
+async def _insert_batch(db: AsyncSession, rows: List[dict]) -> List[int]:
+    table = Ticket.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        # COPY can't return ids, so reserve them from the sequence first
+        sequence = func.pg_get_serial_sequence("tickets", "id")
+        ids = (await db.execute(
+            select(func.nextval(sequence)).select_from(func.generate_series(1, len(rows)))
+        )).scalars().all()
+        if db.get_bind().dialect.driver != "asyncpg":
+            # COPY goes through asyncpg's own API; other drivers (see
+            # ASYNC_DATABASE_URL) get an executemany with the reserved ids
+            await db.execute(insert(table), [dict(row, id=ticket_id) for ticket_id, row in zip(ids, rows)])
+            return list(ids)
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            columns=("id",) + _COLUMNS,
+            records=[(ticket_id,) + tuple(row[name] for name in _COLUMNS) for ticket_id, row in zip(ids, rows)],
+        )
+        return list(ids)
+
+    # SQLite: a plain executemany (RETURNING would go row by row). The write
+    # lock is held from the first insert to commit, so the batch's rowids
+    # are the consecutive values ending at the new max(id).
+    await db.execute(insert(table), rows)
+    last_id = (await db.execute(select(func.max(table.c.id)))).scalar_one()
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+async def _write_batch(db: AsyncSession, rows: List[dict]) -> List[int]:
+    # The lexicon for every brand, even those scoring remotely: a Google
+    # call per imported row is the slow path the lexicon stands in for
+    scores = sentiment.local_score_batch(row["description"] for row in rows)
+    for row, score in zip(rows, scores):
+        row["sentiment_score"] = score
+    ids = await _insert_batch(db, rows)
+    # Imported tickets are unrated
+    tickets = [SimpleNamespace(rating=None, **row) for row in rows]
+    await db.run_sync(rollups.record_tickets_created, tickets)
+    await db.commit()
+
+    # Core inserts bypass the ORM listener that does this for single tickets
+    for brand_id in {row["brand_id"] for row in rows}:
+        dashboard.invalidate(brand_id)
+    return ids
+
+
+async def _check_references(db: AsyncSession, row: dict, references: Dict):
+    for model, column in ((Brand, "brand_id"), (User, "user_id")):
+        value = row[column]
+        if value is None:
+            continue
+        known, unknown = references[model]
+        if value not in known and value not in unknown:
+            (known if await _exists(db, model, value) else unknown).add(value)
+        if value in unknown:
+            raise RowError(f"{column} {value} does not exist")
+
+
+async def import_tickets(db: AsyncSession, values: AsyncIterator[object],
+                         brand_id: Optional[int] = None) -> Dict:
+    """
+    Validate and insert every row from values. brand_id, if given, is the
+    only brand rows may belong to.
+    """
+    ids: List[int] = []
+    failed = 0
+    errors: List[dict] = []
+    brands: Set[int] = set()
+    batch: List[dict] = []
+    # Foreign keys checked once per distinct id: model -> (known, unknown)
+    references = {Brand: (set(), set()), User: (set(), set())}
+
+    def reject(position: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < BULK_MAX_REPORTED_ERRORS:
+            errors.append({"row": position, "error": message})
+
+    position = 0
+    try:
+        async for value in values:
+            try:
+                row = _validate(value, brand_id)
+                await _check_references(db, row, references)
+            except RowError as exc:
+                reject(position, str(exc))
+            else:
+                batch.append(row)
+                brands.add(row["brand_id"])
+            position += 1
+            if len(batch) >= BULK_INSERT_BATCH_SIZE:
+                ids += await _write_batch(db, batch)
+                batch = []
+    except RowError as exc:
+        # The body itself is malformed past this point
+        reject(position, str(exc))
+    if batch:
+        ids += await _write_batch(db, batch)
+
+    if ids:
+        # Hashed once the import is done rather than competing with it
+        duplicates.index_range(ids[0], ids[-1])
+
+    return {
+        "inserted": len(ids),
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+        "brands": sorted(brands),
+    }
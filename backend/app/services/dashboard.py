@@ -0,0 +1,119 @@
+# backend/app/services/dashboard.py
+"""
+Brand dashboard counters with a short-lived per-brand cache.
+
+Every counter is computed by one statement: the all-time figures are summed
+from the brand_daily_stats rollup and the live ones (new and overdue tickets)
+are counted with conditional aggregation over the brand's open tickets. The
+result is cached per brand for DASHBOARD_CACHE_TTL_SECONDS and dropped as
+soon as a transaction touching one of that brand's tickets commits.
+"""
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict
+
+from sqlalchemy import event, func, select, true
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.config.settings import settings
+from app.core.cache import TTLCache
+from app.models import BrandDailyStat, Ticket
+
+URGENT_AFTER_HOURS = 20
+URGENT_TICKETS_LIMIT = 10
+
+_cache = TTLCache(settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+
+def invalidate(brand_id: int):
+    """Drop a brand's cached dashboard, e.g. after bulk Core-level writes."""
+    _cache.invalidate(brand_id)
+
+
+def _counters(db: Session, brand_id: int, urgent_cutoff: datetime):
+    rollup = select(
+        func.coalesce(
+            func.sum(BrandDailyStat.total).filter(BrandDailyStat.category == "complaint"), 0
+        ).label("total_complaints"),
+        func.coalesce(func.sum(BrandDailyStat.rating_sum), 0).label("rating_sum"),
+        func.coalesce(func.sum(BrandDailyStat.rating_count), 0).label("rating_count"),
+        func.coalesce(func.sum(BrandDailyStat.resolution_hours), 0).label("resolution_hours"),
+        func.coalesce(func.sum(BrandDailyStat.resolution_count), 0).label("resolution_count"),
+    ).where(BrandDailyStat.brand_id == brand_id).subquery()
+
+    live = select(
+        func.count(Ticket.id).filter(
+            Ticket.status == "new", Ticket.category == "complaint"
+        ).label("new_complaints"),
+        func.count(Ticket.id).filter(Ticket.created_at < urgent_cutoff).label("urgent_count"),
+    ).where(Ticket.brand_id == brand_id, Ticket.status != "resolved").subquery()
+
+    # Both sides aggregate to exactly one row
+    stmt = select(rollup, live).select_from(rollup.join(live, true()))
+    return db.execute(stmt).one()
+
+
+def _build(db: Session, brand_id: int) -> Dict:
+    urgent_cutoff = datetime.utcnow() - timedelta(hours=URGENT_AFTER_HOURS)
+    row = _counters(db, brand_id, urgent_cutoff)
+
+    avg_rating = row.rating_sum / row.rating_count if row.rating_count else 0
+    avg_resolution = row.resolution_hours / row.resolution_count if row.resolution_count else 0
+
+    # Only pay for the row fetch when there is something to show
+    urgent_tickets = []
+    if row.urgent_count:
+        urgent_tickets = [
+            schemas.TicketOut.model_validate(ticket).model_dump()
+            for ticket in db.query(Ticket).filter(
+                Ticket.brand_id == brand_id,
+                Ticket.status != "resolved",
+                Ticket.created_at < urgent_cutoff
+            ).limit(URGENT_TICKETS_LIMIT).all()
+        ]
+
+    return {
+        "new_complaints": row.new_complaints,
+        "total_active": row.total_complaints,
+        "avg_rating": round(avg_rating, 1),
+        "avg_resolution_time": f"{round(avg_resolution, 1):g}h",
+        "urgent_tickets": urgent_tickets
+    }
+
+
+def get_brand_dashboard(db: Session, brand_id: int) -> Dict:
+    cached = _cache.get(brand_id)
+    if cached is not None:
+        return cached
+    data = _build(db, brand_id)
+    _cache.set(brand_id, data)
+    return data
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Invalidation: remember which brands' tickets a session flushed and drop
+# their cache entries once the transaction commits. Listening on the Session
+# class covers both SessionLocal and the sessions behind AsyncSessionLocal.
+# ─────────────────────────────────────────────────────────────────────────────
+
+_DIRTY_KEY = "dashboard_dirty_brands"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_brands(session, flush_context):
+    brands = session.info.setdefault(_DIRTY_KEY, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Ticket) and obj.brand_id is not None:
+            brands.add(obj.brand_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dirty_brands(session):
+    for brand_id in session.info.pop(_DIRTY_KEY, ()):
+        _cache.invalidate(brand_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_brands(session):
+    session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,390 @@
+# backend/app/services/duplicates.py
+"""
+Near-duplicate ticket detection with MinHash + LSH.
+
+Every ticket description is reduced to a MinHash signature over its
+character 5-grams (text normalized as in the AI result cache), which stay
+similar across the small rewordings seen in forwarded complaints. Signatures are split
+into LSH bands; tickets sharing any band bucket are candidates, and a
+candidate whose estimated Jaccard similarity reaches DUPLICATE_THRESHOLD
+joins the same incident (union-find, so duplicates of duplicates cluster
+too). Indexes are partitioned per brand. When a ticket's description
+changes, the rest of its old incident is re-clustered, so an incident that
+hinged on that ticket splits.
+
+The index is updated incrementally: a Session listener picks up tickets
+whose description was inserted or changed and, once the transaction
+commits, hashes them on the index's own worker thread (in commit order,
+off the event loop). It is snapshotted to DUPLICATE_INDEX_PATH (on
+shutdown and every DUPLICATE_SNAPSHOT_SECONDS); at startup the snapshot is
+loaded, buckets are rebuilt from the stored signatures, and only tickets
+newer than the snapshot are hashed.
+
+Each worker process keeps its own index, so with several workers a ticket
+written through one of them only reaches the others after a restart.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import pickle
+import random
+import threading
+from array import array
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select, true
+from sqlalchemy.orm import Session
+
+from app.core.ai.cache import normalize_text
+from app.database import AsyncSessionLocal
+from app.models import Ticket
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.6"))
+DUPLICATE_INDEX_PATH = os.getenv("DUPLICATE_INDEX_PATH", "data/duplicate_index.pickle")
+DUPLICATE_SNAPSHOT_SECONDS = float(os.getenv("DUPLICATE_SNAPSHOT_SECONDS", "300"))
+DUPLICATE_BUILD_BATCH_SIZE = 1000
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_CHARS = 5
+SNAPSHOT_VERSION = 1
+
+_MERSENNE = (1 << 61) - 1
+# Fixed seed: signatures must stay comparable across restarts and snapshots
+_rng = random.Random(20240501)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+
+def _shingles(text: Optional[str]) -> Set[bytes]:
+    normalized = normalize_text(text).encode()
+    if len(normalized) <= SHINGLE_CHARS:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_CHARS] for i in range(len(normalized) - SHINGLE_CHARS + 1)}
+
+
+def signature(text: Optional[str]) -> Optional[array]:
+    """MinHash signature of the text, or None when it is empty."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "little")
+        for shingle in _shingles(text)
+    ]
+    if not hashes:
+        return None
+    return array("Q", (
+        min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMUTATIONS
+    ))
+
+
+def similarity(left: array, right: array) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(left, right) if x == y) / NUM_PERM
+
+
+def _bands(sig: array) -> Iterable[Tuple[int, int]]:
+    for band in range(BANDS):
+        yield band, hash(tuple(sig[band * ROWS:(band + 1) * ROWS]))
+
+
+class BrandIndex:
+    """LSH buckets and incident clusters for one brand's tickets."""
+
+    def __init__(self):
+        self.signatures: Dict[int, array] = {}
+        self.parent: Dict[int, int] = {}
+        self.members: Dict[int, Set[int]] = {}  # incident root -> its tickets
+        self.buckets: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+
+    def find(self, ticket_id: int) -> int:
+        root = ticket_id
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[ticket_id] != root:
+            self.parent[ticket_id], ticket_id = root, self.parent[ticket_id]
+        return root
+
+    def _union(self, left: int, right: int):
+        left, right = self.find(left), self.find(right)
+        if left != right:
+            # The oldest ticket (lowest id) names the incident
+            root, child = min(left, right), max(left, right)
+            self.parent[child] = root
+            self.members[root] |= self.members.pop(child)
+
+    def _join(self, ticket_id: int):
+        """Merge the ticket's incident with those of its near-duplicates."""
+        sig = self.signatures[ticket_id]
+        candidates = set(chain.from_iterable(self.buckets.get(key, ()) for key in _bands(sig)))
+        candidates.discard(ticket_id)
+        for other in candidates:
+            if similarity(sig, self.signatures[other]) >= DUPLICATE_THRESHOLD:
+                self._union(ticket_id, other)
+
+    def _detach(self, ticket_id: int) -> Set[int]:
+        """Drop the ticket; returns the rest of its incident, each now on its own."""
+        old = self.signatures.pop(ticket_id, None)
+        if old is None:
+            return set()
+        for key in _bands(old):
+            self.buckets[key].discard(ticket_id)
+        others = self.members.pop(self.find(ticket_id))
+        others.discard(ticket_id)
+        del self.parent[ticket_id]
+        for other in others:
+            self.parent[other] = other
+            self.members[other] = {other}
+        return others
+
+    def add(self, ticket_id: int, sig: Optional[array]):
+        if sig is not None and self.signatures.get(ticket_id) == sig:
+            # Unchanged, e.g. a backfill re-adding a ticket the listener indexed
+            return
+        others = self._detach(ticket_id)
+        if sig is not None:
+            for key in _bands(sig):
+                self.buckets[key].add(ticket_id)
+            self.signatures[ticket_id] = sig
+            self.parent[ticket_id] = ticket_id
+            self.members[ticket_id] = {ticket_id}
+            self._join(ticket_id)
+        # The old incident may have hinged on this ticket: re-cluster what is left of it
+        for other in others:
+            self._join(other)
+
+    def rebuild(self):
+        """Buckets and incident members from signatures and parent links (after a load)."""
+        self.buckets = defaultdict(set)
+        for ticket_id, sig in self.signatures.items():
+            for key in _bands(sig):
+                self.buckets[key].add(ticket_id)
+        roots = {ticket_id: self.find(ticket_id) for ticket_id in self.signatures}
+        self.parent = {ticket_id: root for ticket_id, root in roots.items()}
+        self.members = defaultdict(set)
+        for ticket_id, root in roots.items():
+            self.members[root].add(ticket_id)
+        self.members = dict(self.members)
+
+    def incident_of(self, ticket_id: int) -> Optional[List[int]]:
+        if ticket_id not in self.signatures:
+            return None
+        members = self.members[self.find(ticket_id)]
+        return sorted(members) if len(members) > 1 else None
+
+    def clusters(self) -> Dict[int, List[int]]:
+        """Incident id -> member ticket ids, for clusters of two or more."""
+        return {root: sorted(members) for root, members in self.members.items() if len(members) > 1}
+
+
+class DuplicateIndex:
+    def __init__(self):
+        self.brands: Dict[int, BrandIndex] = defaultdict(BrandIndex)
+        self.watermark = 0  # highest ticket id indexed
+        self._lock = threading.Lock()
+
+    def add(self, brand_id: Optional[int], ticket_id: int, text: Optional[str]):
+        if brand_id is None:
+            return
+        sig = signature(text)
+        with self._lock:
+            self.brands[brand_id].add(ticket_id, sig)
+            self.watermark = max(self.watermark, ticket_id)
+
+    def incident_of(self, brand_id: int, ticket_id: int) -> Optional[List[int]]:
+        with self._lock:
+            index = self.brands.get(brand_id)
+            return index.incident_of(ticket_id) if index else None
+
+    def clusters(self, brand_id: int) -> Dict[int, List[int]]:
+        with self._lock:
+            index = self.brands.get(brand_id)
+            return index.clusters() if index else {}
+
+    def save(self, path: str):
+        with self._lock:
+            state = {
+                "version": SNAPSHOT_VERSION,
+                "params": (NUM_PERM, BANDS, SHINGLE_CHARS, DUPLICATE_THRESHOLD),
+                "watermark": self.watermark,
+                "brands": {
+                    brand_id: {
+                        "signatures": {tid: sig.tobytes() for tid, sig in index.signatures.items()},
+                        "parent": dict(index.parent),
+                    }
+                    for brand_id, index in self.brands.items()
+                },
+            }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Restore a snapshot; False if missing or built with other parameters."""
+        if not os.path.exists(path):
+            return False
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != SNAPSHOT_VERSION or \
+                tuple(state.get("params", ())) != (NUM_PERM, BANDS, SHINGLE_CHARS, DUPLICATE_THRESHOLD):
+            logger.info("Ignoring duplicate index snapshot built with other parameters")
+            return False
+        brands: Dict[int, BrandIndex] = defaultdict(BrandIndex)
+        for brand_id, data in state["brands"].items():
+            index = brands[brand_id]
+            for ticket_id, raw in data["signatures"].items():
+                sig = array("Q")
+                sig.frombytes(raw)
+                index.signatures[ticket_id] = sig
+            index.parent = data["parent"]
+            index.rebuild()
+        with self._lock:
+            self.brands = brands
+            self.watermark = state["watermark"]
+        return True
+
+
+index = DuplicateIndex()
+# One worker keeps hashing off the event loop and applies updates in the order they were scheduled
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="duplicates")
+_snapshotter: Optional[asyncio.Task] = None
+_pending: Set[asyncio.Future] = set()
+
+
+def _add_all(rows: Iterable[Tuple[Optional[int], int, Optional[str]]]):
+    for brand_id, ticket_id, text in rows:
+        index.add(brand_id, ticket_id, text)
+
+
+def _schedule(func, *args) -> asyncio.Future:
+    future = asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+    return future
+
+
+async def drain():
+    """Wait for scheduled index updates, including those backfills schedule meanwhile."""
+    while _pending:
+        await asyncio.gather(*_pending, return_exceptions=True)
+
+
+async def _index_where(condition, after: int = 0) -> int:
+    """Index tickets matching condition with id > after, in batches; returns how many."""
+    indexed = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (await db.execute(
+                select(Ticket.id, Ticket.brand_id, Ticket.description)
+                .where(condition, Ticket.id > after)
+                .order_by(Ticket.id)
+                .limit(DUPLICATE_BUILD_BATCH_SIZE)
+            )).all()
+            if not rows:
+                return indexed
+            await _schedule(_add_all, [(row.brand_id, row.id, row.description) for row in rows])
+            indexed += len(rows)
+            after = rows[-1].id
+
+
+def index_range(first_id: int, last_id: int):
+    """
+    Index tickets first_id..last_id in the background. For bulk writes that
+    bypass the ORM listeners; tickets the listeners already indexed are
+    simply re-added.
+    """
+    task = asyncio.get_running_loop().create_task(_index_where(Ticket.id.between(first_id, last_id)))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def load():
+    """Startup: restore the snapshot, then hash only tickets written since."""
+    try:
+        restored = await asyncio.to_thread(index.load, DUPLICATE_INDEX_PATH)
+    except Exception:
+        logger.exception("Could not load duplicate index snapshot; rebuilding")
+        restored = False
+    caught_up = await _index_where(true(), after=index.watermark)
+    logger.info("Duplicate index ready (snapshot %s, %d tickets hashed)",
+                "loaded" if restored else "not used", caught_up)
+
+
+async def save():
+    try:
+        await asyncio.to_thread(index.save, DUPLICATE_INDEX_PATH)
+    except Exception:
+        logger.exception("Could not save duplicate index snapshot")
+
+
+async def _maintain():
+    await load()
+    while True:
+        await asyncio.sleep(DUPLICATE_SNAPSHOT_SECONDS)
+        await save()
+
+
+def start():
+    """Load/catch up in the background, then snapshot periodically."""
+    global _snapshotter
+    if _snapshotter is None or _snapshotter.done():
+        _snapshotter = asyncio.get_running_loop().create_task(_maintain())
+
+
+async def stop():
+    global _snapshotter
+    if _snapshotter is not None:
+        _snapshotter.cancel()
+        try:
+            await _snapshotter
+        except asyncio.CancelledError:
+            pass
+        _snapshotter = None
+    await drain()
+    await save()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Incremental updates: note tickets whose description a flush wrote and index
+# them after the transaction commits, the same way dashboard invalidation
+# tracks dirty brands.
+# ─────────────────────────────────────────────────────────────────────────────
+
+_PENDING_KEY = "duplicate_index_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_descriptions(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, Ticket) and obj.id is not None and (
+            obj in session.new or inspect(obj).attrs.description.history.has_changes()
+        ):
+            pending[obj.id] = (obj.brand_id, obj.description)
+
+
+@event.listens_for(Session, "after_commit")
+def _index_committed(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    rows = [(brand_id, ticket_id, description) for ticket_id, (brand_id, description) in pending.items()]
+    try:
+        _schedule(_add_all, rows)
+    except RuntimeError:
+        # No running loop: a sync Session on a worker thread, already off the event loop
+        _add_all(rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,148 @@
+# backend/app/services/export.py
+"""
+Streaming exports of tickets and daily analytics rollups.
+
+Rows are read through AsyncSession.stream() with yield_per, i.e. a
+server-side cursor on Postgres, and encoded one partition of
+EXPORT_BATCH_SIZE rows at a time, so memory stays flat however many rows a
+brand has. Output is CSV (with a header row) or NDJSON, optionally gzipped
+on the fly. Each export opens its own session because the response body is
+produced after the request handler has returned.
+"""
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, Iterable, Optional, Sequence
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import BrandDailyStat, Ticket
+from app.schemas import TicketOut
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+TICKET_FIELDS = tuple(TicketOut.model_fields)
+STAT_FIELDS = (
+    "brand_id", "day", "channel", "category", "total", "resolved",
+    "resolution_count", "resolution_hours", "rating_count", "rating_sum",
+)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _encode_csv(fields: Sequence[str], rows: Iterable[Sequence], header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _encode_ndjson(fields: Sequence[str], rows: Iterable[Sequence], header: bool) -> str:
+    return "".join(
+        json.dumps(dict(zip(fields, row)), default=_json_default) + "\n" for row in rows
+    )
+
+
+async def _stream_rows(stmt, fields: Sequence[str], fmt: str) -> AsyncIterator[bytes]:
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    header = True
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield encode(fields, rows, header).encode()
+            header = False
+        if header and fmt == "csv":
+            # No rows: still send the header so the file is well-formed
+            yield encode(fields, [], True).encode()
+
+
+async def _gzipped(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _finish(stmt, fields: Sequence[str], fmt: str, gzip: bool) -> AsyncIterator[bytes]:
+    chunks = _stream_rows(stmt, fields, fmt)
+    return _gzipped(chunks) if gzip else chunks
+
+
+def export_tickets(
+    fmt: str,
+    gzip: bool = False,
+    brand_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    channel: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> AsyncIterator[bytes]:
+    """Encoded ticket rows (TicketOut fields), oldest first."""
+    table = Ticket.__table__
+    stmt = select(*(table.c[name] for name in TICKET_FIELDS))
+    if brand_id is not None:
+        stmt = stmt.where(table.c.brand_id == brand_id)
+    if user_id is not None:
+        stmt = stmt.where(table.c.user_id == user_id)
+    if status:
+        stmt = stmt.where(table.c.status == status)
+    if category:
+        stmt = stmt.where(table.c.category == category)
+    if channel:
+        stmt = stmt.where(table.c.channel == channel)
+    if start_date:
+        stmt = stmt.where(table.c.created_at >= start_date)
+    if end_date:
+        stmt = stmt.where(table.c.created_at <= end_date)
+    return _finish(stmt.order_by(table.c.id), TICKET_FIELDS, fmt, gzip)
+
+
+def export_daily_stats(
+    fmt: str,
+    gzip: bool = False,
+    brand_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> AsyncIterator[bytes]:
+    """Encoded rollup rows, one per brand/day/channel/category bucket."""
+    table = BrandDailyStat.__table__
+    stmt = select(*(table.c[name] for name in STAT_FIELDS))
+    if brand_id is not None:
+        stmt = stmt.where(table.c.brand_id == brand_id)
+    if start_date:
+        stmt = stmt.where(table.c.day >= start_date)
+    if end_date:
+        stmt = stmt.where(table.c.day <= end_date)
+    return _finish(
+        stmt.order_by(table.c.brand_id, table.c.day, table.c.channel, table.c.category),
+        STAT_FIELDS, fmt, gzip,
+    )
+
+
+def headers(name: str, fmt: str, gzip: bool) -> dict:
+    """Response headers for an export download named name.<ext>[.gz]."""
+    filename = f"{name}.{FORMATS[fmt][1]}" + (".gz" if gzip else "")
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+def media_type(fmt: str, gzip: bool) -> str:
+    return "application/gzip" if gzip else FORMATS[fmt][0]
@@ -0,0 +1,209 @@
+# backend/app/services/jobs.py
+"""
+Background jobs with a pluggable broker.
+
+Job handlers are async functions registered with the @job decorator, which
+also sets their retry policy and how many may run at once. Callers enqueue
+work by name through the returned Job (await notify_brand.enqueue(...)),
+optionally delayed; arguments must be JSON-serializable.
+
+JOB_BACKEND picks where jobs run:
+
+* local (default): an in-process asyncio scheduler, for local runs and
+  tests. Per-type concurrency is a semaphore, delays are loop timers, and
+  anything still pending is lost when the process exits.
+* celery: jobs go through Celery on REDIS_URL, each type on its own queue
+  ("jobs.<name>") so its concurrency is set by the workers consuming that
+  queue, e.g. `celery -A app.worker worker -Q jobs.process_voice_ticket -c 2`.
+  Delays use countdowns, so the 24h follow-up survives restarts. The Redis
+  broker redelivers any message not acknowledged within its visibility
+  timeout, and with late acks a countdown task counts as unacknowledged
+  while it waits, so JOB_VISIBILITY_TIMEOUT_SECONDS must exceed the longest
+  delay. Handlers with side effects still guard against running twice.
+"""
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+JOB_BACKEND = os.getenv("JOB_BACKEND", "local")
+JOB_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("JOB_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+# Above the longest countdown (the 24h follow-up), or Redis redelivers it every timeout
+JOB_VISIBILITY_TIMEOUT_SECONDS = float(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", str(2 * 24 * 3600)))
+
+Handler = Callable[..., Awaitable[None]]
+
+
+class Job:
+    """A registered job type; enqueue() hands a call to the active backend."""
+
+    def __init__(self, name: str, handler: Handler, max_retries: int,
+                 retry_backoff: float, concurrency: int):
+        self.name = name
+        self.handler = handler
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.concurrency = concurrency
+
+    def retry_delay(self, attempt: int) -> float:
+        """Exponential backoff: retry_backoff, 2x, 4x, ..."""
+        return self.retry_backoff * 2 ** (attempt - 1)
+
+    async def enqueue(self, *args, delay: Optional[float] = None, **kwargs):
+        await backend.enqueue(self, args, kwargs, delay)
+
+    async def __call__(self, *args, **kwargs):
+        """Run the handler inline, bypassing the queue."""
+        await self.handler(*args, **kwargs)
+
+
+registry: Dict[str, Job] = {}
+
+
+def job(name: Optional[str] = None, *, max_retries: int = 3, retry_backoff: float = 5.0,
+        concurrency: int = 4):
+    """Register an async function as a job type."""
+    def register(handler: Handler) -> Job:
+        registered = Job(name or handler.__name__, handler, max_retries, retry_backoff, concurrency)
+        if registered.name in registry:
+            raise ValueError(f"Job {registered.name!r} is already registered")
+        registry[registered.name] = registered
+        backend.register(registered)
+        return registered
+    return register
+
+
+class LocalJobBackend:
+    """Runs jobs as tasks on the current event loop."""
+
+    def __init__(self):
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._running: Set[asyncio.Task] = set()
+        self._delayed: Set[asyncio.TimerHandle] = set()
+
+    def register(self, job: Job):
+        pass
+
+    async def enqueue(self, job: Job, args: tuple, kwargs: dict, delay: Optional[float]):
+        self._schedule(job, args, kwargs, delay or 0, attempt=1)
+
+    def _schedule(self, job: Job, args: tuple, kwargs: dict, delay: float, attempt: int):
+        loop = asyncio.get_running_loop()
+        if delay <= 0:
+            self._start(job, args, kwargs, attempt)
+            return
+
+        def fire():
+            self._delayed.discard(handle)
+            self._start(job, args, kwargs, attempt)
+
+        handle = loop.call_later(delay, fire)
+        self._delayed.add(handle)
+
+    def _start(self, job: Job, args: tuple, kwargs: dict, attempt: int):
+        task = asyncio.get_running_loop().create_task(self._run(job, args, kwargs, attempt))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, job: Job, args: tuple, kwargs: dict, attempt: int):
+        slots = self._slots.setdefault(job.name, asyncio.Semaphore(job.concurrency))
+        async with slots:
+            try:
+                await job.handler(*args, **kwargs)
+                return
+            except Exception:
+                if attempt > job.max_retries:
+                    logger.exception("Job %s failed after %d attempts", job.name, attempt)
+                    return
+                delay = job.retry_delay(attempt)
+                logger.warning("Job %s failed (attempt %d), retrying in %.1fs",
+                               job.name, attempt, delay, exc_info=True)
+        self._schedule(job, args, kwargs, delay, attempt + 1)
+
+    async def drain(self):
+        """Wait for every running job, including ones started meanwhile."""
+        while self._running:
+            await asyncio.gather(*list(self._running), return_exceptions=True)
+
+    async def stop(self):
+        for handle in self._delayed:
+            handle.cancel()
+        if self._delayed:
+            logger.warning("Dropping %d delayed job(s) on shutdown", len(self._delayed))
+        self._delayed.clear()
+        try:
+            await asyncio.wait_for(self.drain(), JOB_SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Cancelling %d job(s) still running at shutdown", len(self._running))
+            for task in list(self._running):
+                task.cancel()
+
+
+class CeleryJobBackend:
+    """Sends jobs through Celery; workers run them on a per-process event loop."""
+
+    def __init__(self, url: str):
+        from celery import Celery
+        self.celery = Celery("complainthub", broker=url, backend=None)
+        self.celery.conf.update(
+            task_acks_late=True,
+            task_reject_on_worker_lost=True,
+            worker_prefetch_multiplier=1,
+            task_serializer="json",
+            accept_content=["json"],
+            broker_transport_options={"visibility_timeout": JOB_VISIBILITY_TIMEOUT_SECONDS},
+        )
+        self._tasks = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _run_in_worker(self, coro):
+        # One loop per worker process, so pooled async DB connections stay valid
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def register(self, job: Job):
+        @self.celery.task(name=f"jobs.{job.name}", bind=True, max_retries=job.max_retries)
+        def run(task, *args, **kwargs):
+            try:
+                self._run_in_worker(job.handler(*args, **kwargs))
+            except Exception as exc:
+                attempt = task.request.retries + 1
+                raise task.retry(exc=exc, countdown=job.retry_delay(attempt))
+
+        self.celery.conf.task_routes = {
+            **(self.celery.conf.task_routes or {}),
+            f"jobs.{job.name}": {"queue": f"jobs.{job.name}"},
+        }
+        self._tasks[job.name] = run
+
+    async def enqueue(self, job: Job, args: tuple, kwargs: dict, delay: Optional[float]):
+        task = self._tasks[job.name]
+        if delay and delay >= JOB_VISIBILITY_TIMEOUT_SECONDS:
+            logger.warning("Job %s delayed %.0fs, beyond the %.0fs visibility timeout; it will be redelivered",
+                           job.name, delay, JOB_VISIBILITY_TIMEOUT_SECONDS)
+        # Publishing talks to the broker synchronously
+        await asyncio.to_thread(task.apply_async, args=args, kwargs=kwargs, countdown=delay)
+
+    async def drain(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+def _make_backend():
+    if JOB_BACKEND == "celery":
+        return CeleryJobBackend(REDIS_URL)
+    return LocalJobBackend()
+
+
+backend = _make_backend()
+
+
+async def stop():
+    """Shutdown hook: let running jobs finish (local backend only)."""
+    await backend.stop()
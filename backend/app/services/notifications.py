@@ -0,0 +1,41 @@
+# backend/app/services/notifications.py
+"""
+Outgoing email notifications.
+
+Mail goes out over SMTP when SMTP_HOST is set; otherwise messages are only
+logged, which keeps local runs and tests free of network calls. Sending is
+blocking, so it runs in a worker thread.
+"""
+import asyncio
+import logging
+import os
+import smtplib
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = os.getenv("SMTP_HOST", "")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+NOTIFY_FROM_EMAIL = os.getenv("NOTIFY_FROM_EMAIL", SMTP_USER or "noreply@complainthub.local")
+
+
+def _send(message: EmailMessage):
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as smtp:
+        smtp.starttls()
+        if SMTP_USER:
+            smtp.login(SMTP_USER, SMTP_PASSWORD)
+        smtp.send_message(message)
+
+
+async def send_email(to: str, subject: str, body: str):
+    if not SMTP_HOST:
+        logger.info("Email to %s (SMTP not configured): %s", to, subject)
+        return
+    message = EmailMessage()
+    message["From"] = NOTIFY_FROM_EMAIL
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+    await asyncio.to_thread(_send, message)
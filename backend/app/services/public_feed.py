@@ -0,0 +1,140 @@
+# backend/app/services/public_feed.py
+"""
+Precomputed feed of public, long-unresolved complaints.
+
+The feed is built by one projection query (ticket columns joined to the
+brand name, description already truncated in SQL) and kept in memory as a
+snapshot that a background task refreshes every PUBLIC_FEED_REFRESH_SECONDS.
+Requests slice the snapshot and use its version for ETag validation, so the
+anonymous public page normally costs no database work at all.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models import Brand, Ticket
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_FEED_SIZE = int(os.getenv("PUBLIC_FEED_SIZE", "500"))
+PUBLIC_FEED_REFRESH_SECONDS = float(os.getenv("PUBLIC_FEED_REFRESH_SECONDS", "60"))
+UNRESOLVED_AFTER_HOURS = 48
+DESCRIPTION_PREVIEW_CHARS = 200
+DEFAULT_LOCATION = "India"
+
+
+class FeedSnapshot:
+    def __init__(self, items: List[dict], generated_at: float):
+        self.items = items
+        self.generated_at = generated_at
+        digest = hashlib.sha1(json.dumps(items, sort_keys=True).encode()).hexdigest()
+        self.version = digest[:16]
+
+    def etag(self, skip: int, limit: int) -> str:
+        return f'W/"{self.version}-{skip}-{limit}"'
+
+    def covers(self, skip: int, limit: int) -> bool:
+        """Whether the page lies inside the snapshot (or the feed is shorter than it)."""
+        return skip + limit <= len(self.items) or len(self.items) < PUBLIC_FEED_SIZE
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self.generated_at > PUBLIC_FEED_REFRESH_SECONDS * 2
+
+
+def _feed_query(now: datetime):
+    cutoff = now - timedelta(hours=UNRESOLVED_AFTER_HOURS)
+    return select(
+        Ticket.id,
+        Brand.name.label("brand_name"),
+        func.substr(Ticket.description, 1, DESCRIPTION_PREVIEW_CHARS).label("preview"),
+        Ticket.view_count,
+        Ticket.created_at,
+    ).join(Brand, Brand.id == Ticket.brand_id).where(
+        Ticket.category == "complaint",
+        Ticket.status != "resolved",
+        Ticket.created_at < cutoff,
+        Ticket.is_public == True  # Brand can opt-out of public display
+    ).order_by(Ticket.created_at.desc(), Ticket.id.desc())
+
+
+def _to_item(row, now: datetime) -> dict:
+    # Anonymized: nothing from the complainant is exposed
+    return {
+        "id": row.id,
+        "brand_name": row.brand_name,
+        "description": (row.preview or "") + "...",
+        "days_unresolved": (now - row.created_at).days,
+        "views": row.view_count or 0,
+        "location": DEFAULT_LOCATION,
+        "created_at": row.created_at.isoformat()
+    }
+
+
+async def query_page(db: AsyncSession, skip: int, limit: int) -> List[dict]:
+    """Read a page straight from the database, for pages beyond the snapshot."""
+    now = datetime.utcnow()
+    result = await db.execute(_feed_query(now).offset(skip).limit(limit))
+    return [_to_item(row, now) for row in result]
+
+
+async def build_snapshot(db: AsyncSession) -> FeedSnapshot:
+    now = datetime.utcnow()
+    result = await db.execute(_feed_query(now).limit(PUBLIC_FEED_SIZE))
+    return FeedSnapshot([_to_item(row, now) for row in result], time.monotonic())
+
+
+_snapshot: Optional[FeedSnapshot] = None
+_refresh_lock = asyncio.Lock()
+_refresher: Optional[asyncio.Task] = None
+
+
+async def refresh() -> FeedSnapshot:
+    global _snapshot
+    async with AsyncSessionLocal() as db:
+        _snapshot = await build_snapshot(db)
+    return _snapshot
+
+
+async def get_snapshot() -> FeedSnapshot:
+    """Current snapshot, rebuilt inline only if the refresher is missing or behind."""
+    if _snapshot is not None and not _snapshot.is_stale():
+        return _snapshot
+    async with _refresh_lock:
+        if _snapshot is None or _snapshot.is_stale():
+            await refresh()
+    return _snapshot
+
+
+async def _refresh_forever():
+    while True:
+        try:
+            await refresh()
+        except Exception:
+            logger.exception("Public feed refresh failed")
+        await asyncio.sleep(PUBLIC_FEED_REFRESH_SECONDS)
+
+
+def start_refresher():
+    global _refresher
+    if _refresher is None or _refresher.done():
+        _refresher = asyncio.get_running_loop().create_task(_refresh_forever())
+
+
+async def stop_refresher():
+    global _refresher
+    if _refresher is not None:
+        _refresher.cancel()
+        try:
+            await _refresher
+        except asyncio.CancelledError:
+            pass
+        _refresher = None
@@ -0,0 +1,235 @@
+# backend/app/services/rollups.py
+"""
+Incremental maintenance of the brand_daily_stats rollup.
+
+Each ticket contributes to exactly one bucket: its brand, the day it was
+created, its channel and its category. Ticket lifecycle code calls the
+record_* helpers inside the same transaction that changes the ticket, so the
+rollup stays in step without rescanning the tickets table. backfill()
+rebuilds buckets from history (see backfill_rollups.py); init_db.py runs
+it whenever the rollup is empty, so dashboards of a deployment that
+predates the rollup aren't blank.
+"""
+from collections import Counter, defaultdict
+from datetime import date, datetime, time
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.functions import hours_between
+from app.models import BrandDailyStat, Ticket
+
+_BUCKET = ("brand_id", "day", "channel", "category")
+_COUNTERS = ("total", "resolved", "resolution_count", "resolution_hours", "rating_count", "rating_sum")
+
+
+def _bucket(ticket: Ticket, **overrides) -> dict:
+    key = {
+        "brand_id": ticket.brand_id,
+        "day": (ticket.created_at or datetime.utcnow()).date(),
+        "channel": ticket.channel or "",
+        "category": ticket.category or "",
+    }
+    key.update(overrides)
+    return key
+
+
+def _apply(db: Session, ticket: Ticket, key: Optional[dict] = None, **deltas):
+    """Add deltas to the ticket's bucket (or to key), creating the row if needed."""
+    if ticket.brand_id is None:
+        return
+    _upsert(db, key or _bucket(ticket), deltas)
+
+
+def _dialect_insert(db: Session):
+    """The dialect's INSERT construct if it supports ON CONFLICT upserts, else None."""
+    return {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(db.get_bind().dialect.name)
+
+
+def _upsert(db: Session, key: dict, deltas: dict):
+    dialect_insert = _dialect_insert(db)
+    table = BrandDailyStat.__table__
+
+    if dialect_insert is not None:
+        values = dict(key, **{name: deltas.get(name, 0) for name in _COUNTERS})
+        stmt = dialect_insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(_BUCKET),
+            set_={name: table.c[name] + stmt.excluded[name] for name in deltas},
+        )
+        db.execute(stmt)
+        return
+
+    row = db.query(BrandDailyStat).filter_by(**key).with_for_update().first()
+    if row is None:
+        row = BrandDailyStat(**key, **{name: 0 for name in _COUNTERS})
+        db.add(row)
+    for name, delta in deltas.items():
+        setattr(row, name, getattr(row, name) + delta)
+
+
+def _contribution(ticket: Ticket) -> dict:
+    """Everything a ticket in its current state adds to its bucket."""
+    deltas = {"total": 1}
+    if ticket.status == "resolved":
+        deltas["resolved"] = 1
+        if ticket.resolution_time_hours is not None:
+            deltas.update(resolution_count=1, resolution_hours=ticket.resolution_time_hours)
+    if ticket.rating is not None:
+        deltas.update(rating_count=1, rating_sum=ticket.rating)
+    return deltas
+
+
+def record_ticket_created(db: Session, ticket: Ticket):
+    _apply(db, ticket, **_contribution(ticket))
+
+
+def record_tickets_created(db: Session, tickets: Iterable[Ticket]) -> int:
+    """
+    record_ticket_created for many tickets (or ticket-like rows) at once,
+    summed per bucket first. Where the database has ON CONFLICT, all buckets
+    go in one executemany upsert, so tickets spread over months of history
+    don't cost a statement per bucket. Returns the number of buckets touched.
+    """
+    buckets: Dict[tuple, Counter] = defaultdict(Counter)
+    for ticket in tickets:
+        if ticket.brand_id is not None:
+            buckets[tuple(_bucket(ticket).items())].update(_contribution(ticket))
+    if not buckets:
+        return 0
+
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is None:
+        for key, deltas in buckets.items():
+            _upsert(db, dict(key), dict(deltas))
+        return len(buckets)
+
+    table = BrandDailyStat.__table__
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(_BUCKET),
+        set_={name: table.c[name] + stmt.excluded[name] for name in _COUNTERS},
+    )
+    db.execute(stmt, [
+        dict(key, **{name: deltas.get(name, 0) for name in _COUNTERS}) for key, deltas in buckets.items()
+    ])
+    return len(buckets)
+
+
+def record_ticket_recategorized(db: Session, ticket: Ticket, previous_category: Optional[str]):
+    """Move a ticket's contribution after its category changed."""
+    if (previous_category or "") == (ticket.category or ""):
+        return
+    deltas = _contribution(ticket)
+    previous = _bucket(ticket, category=previous_category or "")
+    _apply(db, ticket, key=previous, **{name: -delta for name, delta in deltas.items()})
+    _apply(db, ticket, **deltas)
+
+
+def record_ticket_resolved(db: Session, ticket: Ticket):
+    deltas = {"resolved": 1}
+    if ticket.resolution_time_hours is not None:
+        deltas.update(resolution_count=1, resolution_hours=ticket.resolution_time_hours)
+    _apply(db, ticket, **deltas)
+
+
+def record_ticket_reopened(db: Session, ticket: Ticket, resolution_time_hours: Optional[float]):
+    """Undo record_ticket_resolved for a ticket moved out of "resolved"."""
+    deltas = {"resolved": -1}
+    if resolution_time_hours is not None:
+        deltas.update(resolution_count=-1, resolution_hours=-resolution_time_hours)
+    _apply(db, ticket, **deltas)
+
+
+def record_ticket_rated(db: Session, ticket: Ticket, previous_rating: Optional[int] = None):
+    if previous_rating is None:
+        _apply(db, ticket, rating_count=1, rating_sum=ticket.rating)
+    else:
+        _apply(db, ticket, rating_sum=ticket.rating - previous_rating)
+
+
+def backfill(db: Session, brand_id: Optional[int] = None) -> int:
+    """
+    Rebuild rollup rows from the tickets table, for one brand or all.
+
+    Runs as a single DELETE plus INSERT ... SELECT ... GROUP BY, so the work
+    happens in the database. Returns the number of buckets written.
+    """
+    resolved = (Ticket.status == "resolved") & Ticket.resolved_at.isnot(None)
+    day = func.date(Ticket.created_at)
+    channel = func.coalesce(Ticket.channel, literal(""))
+    category = func.coalesce(Ticket.category, literal(""))
+
+    source = select(
+        Ticket.brand_id,
+        day,
+        channel,
+        category,
+        func.count(Ticket.id),
+        func.count(Ticket.id).filter(Ticket.status == "resolved"),
+        func.count(Ticket.id).filter(resolved),
+        func.coalesce(func.sum(hours_between(Ticket.created_at, Ticket.resolved_at)).filter(resolved), 0),
+        func.count(Ticket.rating),
+        func.coalesce(func.sum(Ticket.rating), 0),
+    ).where(Ticket.brand_id.isnot(None)).group_by(Ticket.brand_id, day, channel, category)
+
+    clear = delete(BrandDailyStat)
+    if brand_id is not None:
+        source = source.where(Ticket.brand_id == brand_id)
+        clear = clear.where(BrandDailyStat.brand_id == brand_id)
+
+    db.execute(clear)
+    result = db.execute(
+        insert(BrandDailyStat).from_select(list(_BUCKET) + list(_COUNTERS), source)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def backfill_if_empty(db: Session) -> int:
+    """backfill() everything if the rollup has no rows yet, else nothing."""
+    if db.query(BrandDailyStat.id).first() is not None:
+        return 0
+    return backfill(db)
+
+
+def whole_day_range(start: Optional[datetime], end: Optional[datetime]) -> Optional[Tuple[Optional[date], Optional[date]]]:
+    """
+    Map a datetime range onto rollup days, as (first_day, end_day_exclusive).
+
+    Returns None when either bound falls inside a day, in which case the
+    rollup can't answer the range and callers should query tickets directly.
+    """
+    for bound in (start, end):
+        if bound is not None and bound.time() != time.min:
+            return None
+    return (start.date() if start else None, end.date() if end else None)
+
+
+def rollup_cells(db: Session, brand_id: int, first_day: Optional[date] = None,
+                 end_day: Optional[date] = None):
+    """
+    Sum a brand's rollup rows per (category, channel) over [first_day, end_day).
+
+    Rows have the same shape as analytics.ticket_cells, so they can be fed to
+    analytics.summarize unchanged.
+    """
+    query = db.query(
+        func.nullif(BrandDailyStat.category, "").label("category"),
+        func.nullif(BrandDailyStat.channel, "").label("channel"),
+        func.sum(BrandDailyStat.total).label("total"),
+        func.sum(BrandDailyStat.resolved).label("resolved"),
+        func.sum(BrandDailyStat.resolution_count).label("resolution_count"),
+        func.sum(BrandDailyStat.resolution_hours).label("resolution_hours"),
+        func.sum(BrandDailyStat.rating_count).label("rating_count"),
+        func.sum(BrandDailyStat.rating_sum).label("rating_sum"),
+    ).filter(BrandDailyStat.brand_id == brand_id)
+
+    if first_day:
+        query = query.filter(BrandDailyStat.day >= first_day)
+    if end_day:
+        query = query.filter(BrandDailyStat.day < end_day)
+
+    return query.group_by(BrandDailyStat.category, BrandDailyStat.channel).all()
@@ -0,0 +1,135 @@
+# backend/app/services/search.py
+"""
+Full-text search over ticket descriptions.
+
+On Postgres, queries match websearch_to_tsquery against the same tsvector
+expression that ix_tickets_description_search indexes (GIN), ranked with
+ts_rank. On SQLite, descriptions are mirrored into an external-content FTS5
+table that triggers keep in step with inserts, updates and deletes, ranked
+with bm25. Either way the index is maintained by the database as tickets
+are written, and a search never scans the tickets table.
+
+A word ending in * matches as a prefix ("parc*" finds "parcel"); on
+Postgres those words become a to_tsquery prefix match ANDed with the
+websearch query of the rest.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.functions import search_document
+from app.models import Ticket
+
+FTS_TABLE = "tickets_fts"
+
+_SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "description, content='tickets', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS tickets_fts_update AFTER UPDATE OF description ON tickets BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END",
+)
+
+# The FTS5 table's hidden column named after the table is the MATCH target
+_fts = table(FTS_TABLE, column("rowid"), column(FTS_TABLE))
+
+_WORD = re.compile(r"\w+")
+_PREFIX = re.compile(r"(\w+)\*")
+_ENGLISH = literal_column("'english'::regconfig")
+
+
+def ensure_search_index(bind: Engine):
+    """
+    Create the SQLite FTS5 table and its triggers, and fill it from existing
+    tickets the first time. Postgres needs nothing here: its GIN index is
+    declared on the model and created by ensure_indexes.
+    """
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        for statement in _SQLITE_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def _fts5_query(query: str) -> str:
+    # Quote every word so user input can't use FTS5 operators; words are
+    # ANDed, and a trailing * (outside the quotes) makes a word a prefix
+    return " ".join(
+        '"%s"%s' % (word, "*" if star else "") for word, star in re.findall(r"(\w+)(\*?)", query)
+    )
+
+
+def _pg_tsquery(query: str):
+    """websearch_to_tsquery of the query, ANDed with a prefix match for each word*."""
+    prefixes = _PREFIX.findall(query)
+    rest = _PREFIX.sub(" ", query)
+    parts = []
+    if _WORD.search(rest):
+        parts.append(func.websearch_to_tsquery(_ENGLISH, rest))
+    if prefixes:
+        # Words only (\w+), so nothing here is parsed as a tsquery operator
+        parts.append(func.to_tsquery(_ENGLISH, " & ".join(f"{word}:*" for word in prefixes)))
+    tsquery = parts[0]
+    for part in parts[1:]:
+        tsquery = tsquery.op("&&")(part)
+    return tsquery
+
+
+def _filtered(stmt, brand_id: Optional[int], user_id: Optional[int], status: Optional[str],
+              category: Optional[str], channel: Optional[str]):
+    if brand_id is not None:
+        stmt = stmt.where(Ticket.brand_id == brand_id)
+    if user_id is not None:
+        stmt = stmt.where(Ticket.user_id == user_id)
+    if status:
+        stmt = stmt.where(Ticket.status == status)
+    if category:
+        stmt = stmt.where(Ticket.category == category)
+    if channel:
+        stmt = stmt.where(Ticket.channel == channel)
+    return stmt
+
+
+async def search_tickets(
+    db: AsyncSession,
+    query: str,
+    brand_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    channel: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[Tuple[Ticket, float]]:
+    """Best matches first, as (ticket, rank) pairs; higher rank is better."""
+    if not _WORD.search(query or ""):
+        return []
+
+    if db.get_bind().dialect.name == "sqlite":
+        # bm25 is lower-is-better; negate so both dialects rank the same way
+        rank = (-func.bm25(literal_column(FTS_TABLE))).label("rank")
+        stmt = select(Ticket, rank).join(_fts, _fts.c.rowid == Ticket.id).where(
+            _fts.c[FTS_TABLE].op("MATCH")(_fts5_query(query))
+        )
+    else:
+        document = search_document(Ticket.description)
+        tsquery = _pg_tsquery(query)
+        rank = func.ts_rank(document, tsquery).label("rank")
+        stmt = select(Ticket, rank).where(document.op("@@")(tsquery))
+
+    stmt = _filtered(stmt, brand_id, user_id, status, category, channel)
+    stmt = stmt.order_by(rank.desc(), Ticket.created_at.desc(), Ticket.id.desc()).limit(limit).offset(offset)
+    result = await db.execute(stmt)
+    return [(ticket, score) for ticket, score in result]
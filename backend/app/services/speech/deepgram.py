@@ -0,0 +1,190 @@
+# backend/app/services/speech/deepgram.py
+"""
+Speech-to-text through Deepgram's HTTP and WebSocket APIs.
+
+One SpeechClient per process holds a pooled keep-alive httpx.AsyncClient,
+so transcribing recordings doesn't build a client and pay a TLS handshake
+per file. Two modes:
+
+* transcribe_file() streams a recording from disk as the request body
+  (prerecorded /v1/listen), never holding the whole file in memory.
+* live() opens a streaming /v1/listen WebSocket for a call in progress.
+  Audio is sent as it arrives and interim/final results are passed to a
+  callback, so a call's transcript is ready moments after it ends instead
+  of after the call plus an upload plus a prerecorded pass.
+
+Every file and every live stream holds one of STT_MAX_CONCURRENCY slots,
+which keeps the process within the Deepgram account's concurrency limit;
+extra work waits for a slot.
+
+DEEPGRAM_API_URL can point at app.services.speech.fake_deepgram for tests
+and local runs.
+"""
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+import aiofiles
+import httpx
+from websockets.asyncio.client import connect
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DEEPGRAM_API_URL = os.getenv("DEEPGRAM_API_URL", "https://api.deepgram.com")
+DEEPGRAM_MODEL = os.getenv("DEEPGRAM_MODEL", "general")
+DEEPGRAM_LANGUAGE = os.getenv("DEEPGRAM_LANGUAGE", "en-IN")
+STT_MAX_CONCURRENCY = int(os.getenv("STT_MAX_CONCURRENCY", "20"))
+STT_TIMEOUT_SECONDS = float(os.getenv("STT_TIMEOUT_SECONDS", "300"))
+STT_UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# (transcript so far, whether the latest segment is final)
+TranscriptCallback = Callable[[str, bool], Awaitable[None]]
+
+
+async def _read_chunks(file_path: str) -> AsyncIterator[bytes]:
+    async with aiofiles.open(file_path, "rb") as audio:
+        while chunk := await audio.read(STT_UPLOAD_CHUNK_BYTES):
+            yield chunk
+
+
+class LiveTranscription:
+    """One open streaming session; feed it audio with send(), end it with finish()."""
+
+    def __init__(self, ws, on_transcript: Optional[TranscriptCallback], stats: dict):
+        self._ws = ws
+        self._on_transcript = on_transcript
+        self._stats = stats
+        self._finals: List[str] = []
+        self._interim = ""
+        self._receiver = asyncio.get_running_loop().create_task(self._receive())
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self._finals + ([self._interim] if self._interim else []))
+
+    async def send(self, chunk: bytes):
+        await self._ws.send(chunk)
+
+    async def finish(self) -> str:
+        """Flush the stream and wait for the last results; returns the final transcript."""
+        await self._ws.send(json.dumps({"type": "CloseStream"}))
+        await self._receiver
+        self._interim = ""
+        return self.transcript
+
+    async def _receive(self):
+        async for raw in self._ws:
+            message = json.loads(raw)
+            if message.get("type") != "Results":
+                continue
+            text = message["channel"]["alternatives"][0]["transcript"]
+            is_final = bool(message.get("is_final"))
+            if is_final:
+                if text:
+                    self._finals.append(text)
+                self._interim = ""
+            else:
+                self._interim = text
+                self._stats["interim_results"] += 1
+            if self._on_transcript is not None:
+                await self._on_transcript(self.transcript, is_final)
+
+    async def close(self):
+        if not self._receiver.done():
+            self._receiver.cancel()
+            await asyncio.gather(self._receiver, return_exceptions=True)
+        await self._ws.close()
+
+
+class SpeechClient:
+    def __init__(self, base_url: str = DEEPGRAM_API_URL, api_key: str = "",
+                 max_concurrency: int = STT_MAX_CONCURRENCY):
+        self.base_url = base_url
+        self.api_key = api_key
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._http: Optional[httpx.AsyncClient] = None
+        self.stats = {"files": 0, "streams": 0, "active": 0, "waiting": 0, "interim_results": 0, "failures": 0}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(base_url=self.base_url, headers=self._headers(),
+                                           timeout=STT_TIMEOUT_SECONDS)
+        return self._http
+
+    def _headers(self) -> dict:
+        return {"Authorization": f"Token {self.api_key}"} if self.api_key else {}
+
+    def _params(self, **extra) -> dict:
+        return {"model": DEEPGRAM_MODEL, "language": DEEPGRAM_LANGUAGE, "punctuate": "true", **extra}
+
+    @asynccontextmanager
+    async def _slot(self):
+        self.stats["waiting"] += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.stats["waiting"] -= 1
+        self.stats["active"] += 1
+        try:
+            yield
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        finally:
+            self.stats["active"] -= 1
+            self._slots.release()
+
+    async def transcribe_file(self, file_path: str, mimetype: str = "audio/webm") -> str:
+        async with self._slot():
+            self.stats["files"] += 1
+            response = await self.http.post(
+                "/v1/listen", params=self._params(), content=_read_chunks(file_path),
+                headers={"Content-Type": mimetype},
+            )
+            response.raise_for_status()
+        return response.json()["results"]["channels"][0]["alternatives"][0]["transcript"]
+
+    @asynccontextmanager
+    async def live(self, encoding: str, sample_rate: int,
+                   on_transcript: Optional[TranscriptCallback] = None) -> AsyncIterator[LiveTranscription]:
+        """Streaming session for raw audio in encoding (e.g. "mulaw") at sample_rate Hz."""
+        params = self._params(encoding=encoding, sample_rate=sample_rate, channels=1, interim_results="true")
+        url = httpx.URL(self.base_url.replace("http", "ws", 1)).join("/v1/listen").copy_merge_params(params)
+        async with self._slot():
+            self.stats["streams"] += 1
+            ws = await connect(str(url), additional_headers=self._headers())
+            session = LiveTranscription(ws, on_transcript, self.stats)
+            try:
+                yield session
+            finally:
+                await session.close()
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+_client: Optional[SpeechClient] = None
+
+
+def get_client() -> SpeechClient:
+    global _client
+    if _client is None:
+        _client = SpeechClient(api_key=settings.DEEPGRAM_API_KEY)
+    return _client
+
+
+async def close():
+    if _client is not None:
+        await _client.close()
+
+
+def status() -> dict:
+    return _client.stats if _client is not None else {}
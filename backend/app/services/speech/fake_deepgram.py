@@ -0,0 +1,89 @@
+# backend/app/services/speech/fake_deepgram.py
+"""
+Fake Deepgram /v1/listen (prerecorded and streaming) for tests and local runs.
+
+    uvicorn app.services.speech.fake_deepgram:app --port 8003
+    DEEPGRAM_API_URL=http://127.0.0.1:8003
+
+"Audio" is read as UTF-8 text and its words are the transcript, so tests
+can stream b"my parcel " b"never arrived." and know what to expect. On the
+WebSocket every chunk produces an interim result for the current segment,
+and a segment is finalized when a chunk ends a sentence (".", "?", "!") or
+the client sends CloseStream. FAKE_STT_LATENCY_SECONDS delays prerecorded
+answers; /stats reports what it has seen.
+"""
+import asyncio
+import json
+import os
+
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+
+FAKE_STT_LATENCY_SECONDS = float(os.getenv("FAKE_STT_LATENCY_SECONDS", "0.05"))
+
+app = FastAPI(title="Fake Deepgram")
+
+stats = {"prerecorded": 0, "streams": 0, "audio_bytes": 0, "connections": set()}
+
+
+def _words(audio: bytes) -> str:
+    return " ".join(audio.decode("utf-8", errors="ignore").split())
+
+
+def _results(transcript: str, is_final: bool) -> str:
+    return json.dumps({
+        "type": "Results",
+        "is_final": is_final,
+        "speech_final": is_final,
+        "channel": {"alternatives": [{"transcript": transcript, "confidence": 0.99}]},
+    })
+
+
+@app.post("/v1/listen")
+async def prerecorded(request: Request):
+    audio = b""
+    async for chunk in request.stream():
+        audio += chunk
+    stats["prerecorded"] += 1
+    stats["audio_bytes"] += len(audio)
+    stats["connections"].add(request.client.port if request.client else None)
+    await asyncio.sleep(FAKE_STT_LATENCY_SECONDS)
+    return {"results": {"channels": [{"alternatives": [{"transcript": _words(audio), "confidence": 0.99}]}]}}
+
+
+@app.websocket("/v1/listen")
+async def live(websocket: WebSocket):
+    await websocket.accept()
+    stats["streams"] += 1
+    segment = ""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                stats["audio_bytes"] += len(message["bytes"])
+                segment = " ".join(filter(None, [segment, _words(message["bytes"])]))
+                if segment.endswith((".", "?", "!")):
+                    await websocket.send_text(_results(segment, True))
+                    segment = ""
+                else:
+                    await websocket.send_text(_results(segment, False))
+            elif json.loads(message.get("text") or "{}").get("type") == "CloseStream":
+                if segment:
+                    await websocket.send_text(_results(segment, True))
+                await websocket.send_text(json.dumps({"type": "Metadata"}))
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        return
+
+
+@app.get("/stats")
+async def get_stats():
+    return {**{k: v for k, v in stats.items() if k != "connections"}, "connections": len(stats["connections"])}
+
+
+@app.post("/stats/reset")
+async def reset_stats():
+    stats.update(prerecorded=0, streams=0, audio_bytes=0, connections=set())
+    return {"ok": True}
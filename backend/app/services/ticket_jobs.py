@@ -0,0 +1,106 @@
+# backend/app/services/ticket_jobs.py
+"""
+Job types for ticket post-processing.
+
+Request handlers enqueue these after their transaction commits instead of
+doing the work inline. Each handler loads what it needs by id in its own
+session, so it behaves the same under the local and the Celery backend.
+"""
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update
+
+from app.core.channels import registry as channels
+from app.database import AsyncSessionLocal
+from app.models import Brand, Ticket, User
+from app.services import notifications, voice_pipeline
+from app.services.jobs import job
+
+logger = logging.getLogger(__name__)
+
+FOLLOW_UP_DELAY_HOURS = 24
+
+
+@job(concurrency=2, retry_backoff=30)
+async def process_voice_ticket(ticket_id: int, file_path: Optional[str]):
+    """Transcribe (unless already transcribed live) and analyze a recording, then notify the brand."""
+    if not await voice_pipeline.process_voice_ticket(ticket_id, file_path):
+        return
+    async with AsyncSessionLocal() as db:
+        ticket = await db.get(Ticket, ticket_id)
+        brand_id = ticket.brand_id if ticket else None
+    if brand_id is not None:
+        await notify_brand.enqueue(brand_id, ticket_id)
+
+
+@job(concurrency=8)
+async def notify_brand(brand_id: int, ticket_id: int):
+    """Send notification to brand about new complaint"""
+    async with AsyncSessionLocal() as db:
+        brand = await db.get(Brand, brand_id)
+        ticket = await db.get(Ticket, ticket_id)
+    if brand is None or ticket is None:
+        return
+    await notifications.send_email(
+        brand.support_email or brand.email,
+        f"New {ticket.category or 'ticket'} #{ticket.id} via {ticket.channel or 'web'}",
+        ticket.description or "(no description yet)",
+    )
+
+
+@job(concurrency=4)
+async def follow_up(ticket_id: int):
+    """Check back with the customer once a resolved ticket has settled (once per resolution)."""
+    async with AsyncSessionLocal() as db:
+        # Claim the follow-up before sending, so a redelivered job finds it taken
+        claimed = await db.execute(
+            update(Ticket)
+            .where(Ticket.id == ticket_id, Ticket.status == "resolved", Ticket.rating.is_(None),
+                   Ticket.follow_up_sent_at.is_(None))
+            .values(follow_up_sent_at=datetime.utcnow())
+        )
+        if claimed.rowcount != 1:
+            # Reopened, already rated or already followed up: nothing to do
+            return
+        ticket = await db.get(Ticket, ticket_id)
+        user = await db.get(User, ticket.user_id) if ticket.user_id else None
+        await db.commit()
+    if user is None:
+        return
+    try:
+        await notifications.send_email(
+            user.email,
+            f"How did we do on ticket #{ticket.id}?",
+            "Your complaint was marked resolved. Please rate the resolution in ComplaintHub.",
+        )
+    except Exception:
+        # Not sent: release the claim for the retry
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Ticket).where(Ticket.id == ticket_id).values(follow_up_sent_at=None))
+            await db.commit()
+        raise
+
+
+@job(concurrency=16)
+async def send_reply(ticket_id: int, text: str):
+    """Deliver an agent's reply to the customer on the channel the ticket came in on."""
+    async with AsyncSessionLocal() as db:
+        ticket = await db.get(Ticket, ticket_id)
+    if ticket is None or not ticket.contact:
+        return
+    adapter = channels.for_ticket_channel(ticket.channel)
+    if adapter is None:
+        logger.warning("No channel adapter to reply to ticket %s via %s", ticket_id, ticket.channel)
+        return
+    await adapter.send(channels.reply_address(ticket.channel, ticket.contact), text)
+
+
+async def ticket_created(ticket: Ticket):
+    if ticket.brand_id is not None:
+        await notify_brand.enqueue(ticket.brand_id, ticket.id)
+
+
+async def ticket_resolved(ticket: Ticket, delay_hours: float = FOLLOW_UP_DELAY_HOURS):
+    await follow_up.enqueue(ticket.id, delay=delay_hours * 3600)
@@ -0,0 +1,159 @@
+# backend/app/services/view_counter.py
+"""
+Coalesced view counting for tickets.
+
+Views are added to a counter keyed by ticket id instead of updating the
+tickets row each time. A background task drains the counter every
+VIEW_COUNT_FLUSH_SECONDS and applies all pending increments with one batched
+UPDATE (executemany), and a final flush runs on shutdown. A hot ticket viewed
+thousands of times between flushes costs a single row update.
+
+The default backend keeps counts in process memory. With
+VIEW_COUNTER_BACKEND=redis the counts live in a Redis hash shared by every
+worker, so one drain coalesces views across the whole deployment.
+"""
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import bindparam, func, update
+
+from app.database import AsyncSessionLocal
+from app.models import Ticket
+
+logger = logging.getLogger(__name__)
+
+VIEW_COUNTER_BACKEND = os.getenv("VIEW_COUNTER_BACKEND", "local")
+VIEW_COUNT_FLUSH_SECONDS = float(os.getenv("VIEW_COUNT_FLUSH_SECONDS", "5"))
+VIEW_COUNT_BATCH_SIZE = int(os.getenv("VIEW_COUNT_BATCH_SIZE", "500"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_VIEWS_KEY = "complainthub:ticket_views"
+
+
+class LocalViewCounter:
+    """In-process counter; the stand-in for Redis in local runs and tests."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    async def add(self, ticket_ids: Iterable[int]):
+        with self._lock:
+            self._counts.update(ticket_ids)
+
+    async def restore(self, counts: Dict[int, int]):
+        with self._lock:
+            self._counts.update(counts)
+
+    async def drain(self) -> Dict[int, int]:
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return dict(counts)
+
+
+class RedisViewCounter:
+    """Counts in a Redis hash; drain atomically renames it so no view is lost."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self._response_error = redis.ResponseError
+
+    async def add(self, ticket_ids: Iterable[int]):
+        pipe = self._redis.pipeline(transaction=False)
+        for ticket_id in ticket_ids:
+            pipe.hincrby(REDIS_VIEWS_KEY, ticket_id, 1)
+        await pipe.execute()
+
+    async def restore(self, counts: Dict[int, int]):
+        pipe = self._redis.pipeline(transaction=False)
+        for ticket_id, count in counts.items():
+            pipe.hincrby(REDIS_VIEWS_KEY, ticket_id, count)
+        await pipe.execute()
+
+    async def drain(self) -> Dict[int, int]:
+        draining = f"{REDIS_VIEWS_KEY}:draining:{uuid.uuid4().hex}"
+        try:
+            await self._redis.rename(REDIS_VIEWS_KEY, draining)
+        except self._response_error:
+            # Key missing: nothing was viewed since the last drain
+            return {}
+        raw = await self._redis.hgetall(draining)
+        await self._redis.delete(draining)
+        return {int(ticket_id): int(count) for ticket_id, count in raw.items()}
+
+
+def _make_counter():
+    if VIEW_COUNTER_BACKEND == "redis":
+        return RedisViewCounter(REDIS_URL)
+    return LocalViewCounter()
+
+
+counter = _make_counter()
+_flusher: Optional[asyncio.Task] = None
+
+
+async def record_views(ticket_ids: Iterable[int]):
+    """Count one view for each ticket id; never touches the database."""
+    ids = list(ticket_ids)
+    if ids:
+        await counter.add(ids)
+
+
+async def flush() -> int:
+    """Apply pending increments in batched UPDATEs. Returns tickets updated."""
+    counts = await counter.drain()
+    if not counts:
+        return 0
+
+    table = Ticket.__table__
+    stmt = update(table).where(table.c.id == bindparam("ticket_id")).values(
+        view_count=func.coalesce(table.c.view_count, 0) + bindparam("views")
+    )
+    # Sorted ids give every flusher the same lock order
+    params = [{"ticket_id": ticket_id, "views": views} for ticket_id, views in sorted(counts.items())]
+    try:
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(params), VIEW_COUNT_BATCH_SIZE):
+                await db.execute(stmt, params[start:start + VIEW_COUNT_BATCH_SIZE])
+            await db.commit()
+    except Exception:
+        # Put the counts back so the next flush retries them
+        await counter.restore(counts)
+        raise
+    return len(params)
+
+
+async def _flush_forever():
+    while True:
+        await asyncio.sleep(VIEW_COUNT_FLUSH_SECONDS)
+        try:
+            await flush()
+        except Exception:
+            logger.exception("View count flush failed")
+
+
+def start_flusher():
+    global _flusher
+    if _flusher is None or _flusher.done():
+        _flusher = asyncio.get_running_loop().create_task(_flush_forever())
+
+
+async def stop_flusher():
+    """Stop the periodic flush and write out whatever is still pending."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        try:
+            await _flusher
+        except asyncio.CancelledError:
+            pass
+        _flusher = None
+    try:
+        await flush()
+    except Exception:
+        logger.exception("Final view count flush failed")
@@ -0,0 +1,217 @@
+# backend/app/services/voice_pipeline.py
+"""
+Voice complaint pipeline.
+
+The upload handler only streams the audio to disk (in VOICE_UPLOAD_CHUNK_BYTES
+chunks through aiofiles, so a large recording never sits in memory) and
+creates a placeholder ticket. Transcription and text analysis run afterwards
+as background stages in process_voice_ticket (queued as a job, see
+ticket_jobs), which fills in the ticket's description, category, urgency
+and sentiment once they are known.
+
+Recordings hosted by the telephony provider (Twilio recording callbacks)
+are downloaded to VOICE_UPLOAD_DIR first and then go through the same
+stages.
+
+Phone calls streamed to us while they happen skip the upload entirely:
+transcribe_call() feeds the audio to a live transcription session and
+keeps the ticket's description up to date with the interim transcript.
+Interim writes are plain UPDATEs that bypass the ORM change listeners
+(duplicate index, dashboard cache, WebSocket events); those run once, for
+the final transcript.
+"""
+import logging
+import os
+import time
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.core.ai import cache as ai_cache
+from app.core.ai import classifier
+from app.core.ai import sentiment as sentiment_scoring
+from app.core.channels import registry as channels
+from app.database import AsyncSessionLocal
+from app.models import Brand, Ticket
+from app.services import rollups
+from app.services.speech import deepgram
+
+logger = logging.getLogger(__name__)
+
+VOICE_UPLOAD_DIR = os.getenv("VOICE_UPLOAD_DIR", "uploads/voice")
+VOICE_UPLOAD_CHUNK_BYTES = int(os.getenv("VOICE_UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+VOICE_UPLOAD_MAX_BYTES = int(os.getenv("VOICE_UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+STT_INTERIM_WRITE_SECONDS = float(os.getenv("STT_INTERIM_WRITE_SECONDS", "1"))
+
+
+async def save_upload(audio: UploadFile, user_id: int) -> str:
+    """Stream an uploaded recording to disk chunk by chunk; returns its path."""
+    os.makedirs(VOICE_UPLOAD_DIR, exist_ok=True)
+    file_path = os.path.join(VOICE_UPLOAD_DIR, f"{user_id}_{datetime.utcnow().timestamp()}.webm")
+
+    written = 0
+    try:
+        async with aiofiles.open(file_path, "wb") as out:
+            while chunk := await audio.read(VOICE_UPLOAD_CHUNK_BYTES):
+                written += len(chunk)
+                if written > VOICE_UPLOAD_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="Audio file too large")
+                await out.write(chunk)
+    except BaseException:
+        # Don't leave partial recordings behind
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    finally:
+        await audio.close()
+    return file_path
+
+
+async def process_speech_to_text(file_path: str) -> str:
+    """Transcribe a recording, reusing the transcript of identical audio"""
+    key = await ai_cache.audio_key("transcript", file_path)
+    return await ai_cache.results.get_or_compute(key, lambda: _transcribe(file_path))
+
+
+async def _transcribe(file_path: str) -> str:
+    # Uploads are browser-recorded WebM; fetched call recordings are WAV
+    mimetype = "audio/wav" if file_path.endswith(".wav") else "audio/webm"
+    return await deepgram.get_client().transcribe_file(file_path, mimetype)
+
+
+async def fetch_recording(ticket_id: int, url: str) -> str:
+    """Download a provider-hosted recording to VOICE_UPLOAD_DIR; returns its path."""
+    os.makedirs(VOICE_UPLOAD_DIR, exist_ok=True)
+    file_path = os.path.join(VOICE_UPLOAD_DIR, f"call_{ticket_id}.wav")
+    await channels.get_adapter("twilio").download_recording(url, file_path)
+    return file_path
+
+
+async def _write_interim_transcript(ticket_id: int, transcript: str):
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Ticket).where(Ticket.id == ticket_id).values(description=transcript))
+        await db.commit()
+
+
+async def _write_transcript(ticket_id: int, transcript: str):
+    async with AsyncSessionLocal() as db:
+        ticket = await db.get(Ticket, ticket_id)
+        if ticket is not None:
+            ticket.description = transcript
+            # The last interim write may already hold this text; the listeners still need to see it
+            flag_modified(ticket, "description")
+            await db.commit()
+
+
+async def transcribe_call(ticket_id: int, audio: AsyncIterator[bytes], encoding: str, sample_rate: int) -> str:
+    """
+    Transcribe a call live as its audio arrives. The ticket's description
+    follows the interim transcript (at most every STT_INTERIM_WRITE_SECONDS)
+    and holds the final transcript when the audio ends; returns it.
+    """
+    written = ""
+    last_write = 0.0
+
+    async def on_transcript(transcript: str, is_final: bool):
+        nonlocal written, last_write
+        if transcript and transcript != written and time.monotonic() - last_write >= STT_INTERIM_WRITE_SECONDS:
+            await _write_interim_transcript(ticket_id, transcript)
+            written, last_write = transcript, time.monotonic()
+
+    async with deepgram.get_client().live(encoding, sample_rate, on_transcript) as session:
+        async for chunk in audio:
+            await session.send(chunk)
+        transcript = await session.finish()
+    if transcript:
+        await _write_transcript(ticket_id, transcript)
+    return transcript
+
+
+async def analyze_complaint_text(text: str, scorer: Optional[str] = None) -> dict:
+    """
+    Analyze complaint text, reusing the result for repeated (normalized) text.
+    Results are cached under the scorer that actually produced them, so a
+    lexicon fallback during a remote outage isn't served as a remote result.
+    """
+    scorer = scorer or sentiment_scoring.SENTIMENT_DEFAULT_SCORER
+    analysis = await ai_cache.results.get(ai_cache.text_key(f"analysis:{scorer}", text))
+    if analysis is None:
+        analysis = await _analyze(text, scorer)
+        await ai_cache.results.set(ai_cache.text_key(f"analysis:{analysis['scorer']}", text), analysis)
+    return analysis
+
+
+async def _analyze(text: str, scorer: str) -> dict:
+    """Analyze complaint text for category and urgency"""
+    sentiment, used_scorer = await sentiment_scoring.score_sentiment_with_scorer(text, scorer)
+
+    rules = classifier.classify(text)
+
+    # Determine urgency based on sentiment and keywords
+    urgency = rules["urgency"]
+    if sentiment < -0.5:
+        urgency = max(urgency, 2)  # High
+
+    return {
+        "category": rules["category"],
+        "urgency": urgency,
+        "sentiment": sentiment,
+        "scorer": used_scorer,
+        "matched_terms": rules["matched_terms"]
+    }
+
+
+async def _update_ticket(ticket_id: int, **fields) -> Optional[Ticket]:
+    async with AsyncSessionLocal() as db:
+        ticket = await db.get(Ticket, ticket_id)
+        if ticket is None:
+            return None
+        previous_category = ticket.category
+        for name, value in fields.items():
+            setattr(ticket, name, value)
+        await db.run_sync(rollups.record_ticket_recategorized, ticket, previous_category)
+        await db.commit()
+        return ticket
+
+
+async def process_voice_ticket(ticket_id: int, file_path: Optional[str]) -> bool:
+    """
+    Background stages for a recording: transcribe, then analyze. file_path
+    is an uploaded file or a provider's recording URL. Live calls arrive
+    already transcribed (file_path None) and only get analyzed.
+
+    Each stage writes its result as soon as it has it, so the transcript is
+    visible even if analysis fails afterwards, and a retry after such a
+    failure skips straight to analysis. Failures propagate to the caller.
+    Returns False, without analyzing, when the ticket is gone or has neither
+    a transcript nor a recording (a call that never produced speech).
+    """
+    async with AsyncSessionLocal() as db:
+        ticket = await db.get(Ticket, ticket_id)
+        if ticket is None:
+            return False
+        transcript = ticket.description
+        brand = await db.get(Brand, ticket.brand_id) if ticket.brand_id else None
+        scorer = brand.sentiment_scorer if brand else None
+
+    if not transcript:
+        if not file_path:
+            logger.warning("Voice ticket %s has no transcript and no recording; skipping analysis", ticket_id)
+            return False
+        if file_path.startswith(("http://", "https://")):
+            file_path = await fetch_recording(ticket_id, file_path)
+        transcript = await process_speech_to_text(file_path)
+        await _update_ticket(ticket_id, description=transcript)
+
+    analysis = await analyze_complaint_text(transcript, scorer)
+    await _update_ticket(
+        ticket_id,
+        category=analysis.get("category", "complaint"),
+        urgency=analysis.get("urgency", 1),
+        sentiment_score=analysis.get("sentiment", 0),
+    )
+    return True
@@ -0,0 +1,288 @@
+# backend/app/services/webhooks.py
+"""
+Inbound messaging webhooks (Twilio, WhatsApp Cloud API, Telegram, webchat).
+
+Handling is split in two stages so providers get their ack in
+milliseconds:
+
+1. The request handler has the provider's channel adapter
+   (app.core.channels) verify the signature and parse the payload into
+   InboundMessage objects, then claims each provider message id in the
+   idempotency store (retries of a message already seen are acked and
+   dropped) and puts the message on an in-process queue, picked by sender
+   so one conversation is always handled by the same consumer. If the
+   queue is full the claim is released and the webhook answered 503, so
+   the provider's retry gets another chance.
+2. WEBHOOK_WORKERS consumer tasks drain their queues in batches of up to
+   WEBHOOK_BATCH_SIZE. A batch costs one lookup of the senders' open
+   tickets and one commit: a message from a sender with an open ticket on
+   that brand and channel is appended to it, otherwise a new ticket is
+   created (classified locally) and the brand notified. Voice recordings
+   always get a new ticket, which is transcribed and analyzed by the
+   process_voice_ticket job before the brand hears of it. Each message is
+   also recorded as a turn of the sender's conversation
+   (app.core.conversation), which is kept in memory and written behind.
+
+The idempotency store is a bounded LRU of WEBHOOK_IDEMPOTENCY_MAX_KEYS ids
+per worker, or with WEBHOOK_IDEMPOTENCY_BACKEND=redis a SET NX key per
+message that expires after WEBHOOK_IDEMPOTENCY_TTL_SECONDS and is shared by
+every worker. stop() waits up to WEBHOOK_SHUTDOWN_TIMEOUT_SECONDS for the
+queue to drain; messages acked but still queued when a worker crashes are
+lost.
+"""
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.ai import classifier
+from app.core.channels.base import InboundMessage
+from app.core.conversation.manager import manager as conversations
+from app.core.cache import LRUCache, TTLCache
+from app.database import AsyncSessionLocal
+from app.models import Brand, Ticket
+from app.services import rollups, ticket_jobs
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "10000"))
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "2"))
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "200"))
+WEBHOOK_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+WEBHOOK_IDEMPOTENCY_BACKEND = os.getenv("WEBHOOK_IDEMPOTENCY_BACKEND", "local")
+WEBHOOK_IDEMPOTENCY_MAX_KEYS = int(os.getenv("WEBHOOK_IDEMPOTENCY_MAX_KEYS", "100000"))
+WEBHOOK_IDEMPOTENCY_TTL_SECONDS = int(os.getenv("WEBHOOK_IDEMPOTENCY_TTL_SECONDS", "86400"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_IDEMPOTENCY_PREFIX = "complainthub:webhook:"
+
+BRANDS_TTL_SECONDS = 60
+VOICE_PLACEHOLDER = "Voice message"
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+class Overloaded(Exception):
+    pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Idempotency
+# ─────────────────────────────────────────────────────────────────────────────
+
+class LocalIdempotencyStore:
+    def __init__(self, max_keys: int):
+        self._seen = LRUCache(max_keys)
+
+    async def claim(self, key: str) -> bool:
+        """True the first time key is seen."""
+        return self._seen.add(key, True)
+
+    async def release(self, key: str):
+        self._seen.invalidate(key)
+
+
+class RedisIdempotencyStore:
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self._ttl = ttl_seconds
+
+    async def claim(self, key: str) -> bool:
+        return bool(await self._redis.set(REDIS_IDEMPOTENCY_PREFIX + key, 1, nx=True, ex=self._ttl))
+
+    async def release(self, key: str):
+        await self._redis.delete(REDIS_IDEMPOTENCY_PREFIX + key)
+
+
+def _make_store():
+    if WEBHOOK_IDEMPOTENCY_BACKEND == "redis":
+        return RedisIdempotencyStore(REDIS_URL, WEBHOOK_IDEMPOTENCY_TTL_SECONDS)
+    return LocalIdempotencyStore(WEBHOOK_IDEMPOTENCY_MAX_KEYS)
+
+
+idempotency = _make_store()
+stats = {"received": 0, "duplicates": 0, "rejected": 0, "processed": 0, "created": 0, "failed": 0}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Stage 1: accept
+# ─────────────────────────────────────────────────────────────────────────────
+
+# One queue per consumer; a sender always maps to the same one, so two
+# consumers never race to open a ticket for the same conversation
+_queues: List[asyncio.Queue] = [
+    asyncio.Queue(max(1, WEBHOOK_QUEUE_SIZE // WEBHOOK_WORKERS)) for _ in range(WEBHOOK_WORKERS)
+]
+_workers: List[asyncio.Task] = []
+
+
+def _queue_for(message: InboundMessage) -> asyncio.Queue:
+    return _queues[hash(message.contact) % len(_queues)]
+
+
+async def accept(messages: List[InboundMessage]) -> int:
+    """Queue messages not seen before; returns how many were queued."""
+    queued = 0
+    for message in messages:
+        stats["received"] += 1
+        if not await idempotency.claim(message.key):
+            stats["duplicates"] += 1
+            continue
+        try:
+            _queue_for(message).put_nowait(message)
+        except asyncio.QueueFull:
+            await idempotency.release(message.key)
+            stats["rejected"] += 1
+            raise Overloaded()
+        queued += 1
+    return queued
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Stage 2: create or extend tickets
+# ─────────────────────────────────────────────────────────────────────────────
+
+_brands = TTLCache(BRANDS_TTL_SECONDS)
+
+
+def _digits(number: Optional[str]) -> str:
+    return _NON_DIGITS.sub("", number or "")
+
+
+async def _brand_directory(db: AsyncSession) -> Tuple[Dict[str, int], Set[int]]:
+    """(phone number digits -> brand id, all brand ids), cached briefly."""
+    directory = _brands.get("all")
+    if directory is None:
+        rows = (await db.execute(select(Brand.id, Brand.phone_number))).all()
+        numbers = {_digits(row.phone_number): row.id for row in rows if _digits(row.phone_number)}
+        directory = (numbers, {row.id for row in rows})
+        _brands.set("all", directory)
+    return directory
+
+
+async def process_batch(messages: List[InboundMessage]) -> List[Ticket]:
+    """Append each message to its sender's open ticket or open a new one; returns new tickets."""
+    async with AsyncSessionLocal() as db:
+        numbers, brand_ids = await _brand_directory(db)
+        routed = []
+        for message in messages:
+            brand_id = message.brand_id or numbers.get(_digits(message.brand_number))
+            if brand_id not in brand_ids:
+                logger.warning("Dropping %s message %s for an unknown brand", message.channel, message.key)
+                continue
+            routed.append((brand_id, message))
+        if not routed:
+            return []
+
+        open_tickets: Dict[Tuple[int, str, str], Ticket] = {}
+        rows = (await db.execute(
+            select(Ticket)
+            .where(Ticket.contact.in_({message.contact for _, message in routed}), Ticket.status != "resolved")
+            .order_by(Ticket.id)
+        )).scalars()
+        for ticket in rows:
+            # Newest open ticket per sender wins
+            open_tickets[(ticket.brand_id, ticket.channel, ticket.contact)] = ticket
+
+        created = []
+        handled: List[Tuple[int, InboundMessage, Ticket]] = []
+        for brand_id, message in routed:
+            ticket = open_tickets.get((brand_id, message.channel, message.contact))
+            # Each call or voice recording gets its own ticket
+            if ticket is not None and message.channel != "voice":
+                ticket.description = f"{ticket.description}\n{message.text}" if ticket.description else message.text
+                handled.append((brand_id, message, ticket))
+                continue
+            result = classifier.classify(message.text)
+            ticket = Ticket(
+                brand_id=brand_id,
+                channel=message.channel,
+                contact=message.contact,
+                # Empty for a recording the provider didn't transcribe (and for a live call
+                # until it is); process_voice_ticket fills it in
+                description=message.text or "",
+                category=result["category"],
+                urgency=result["urgency"],
+                status="new",
+                audio_file_path=message.audio_url,
+                created_at=datetime.utcnow(),
+            )
+            db.add(ticket)
+            open_tickets[(brand_id, message.channel, message.contact)] = ticket
+            created.append(ticket)
+            handled.append((brand_id, message, ticket))
+
+        await db.flush()
+        await db.run_sync(rollups.record_tickets_created, created)
+        await db.commit()
+
+    contexts = await conversations.get_many((brand_id, message.channel, message.contact)
+                                            for brand_id, message, _ in handled)
+    for brand_id, message, ticket in handled:
+        conversations.record(contexts[(brand_id, message.channel, message.contact)], "customer",
+                             message.text or VOICE_PLACEHOLDER, ticket.id)
+    return created
+
+
+async def _consume(queue: asyncio.Queue):
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < WEBHOOK_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        try:
+            await _run(batch)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def _run(batch: List[InboundMessage]):
+    try:
+        created = await process_batch(batch)
+    except Exception:
+        # Already acked, so the provider won't resend these
+        stats["failed"] += len(batch)
+        logger.exception("Could not process %d inbound messages", len(batch))
+        return
+    stats["processed"] += len(batch)
+    stats["created"] += len(created)
+    for ticket in created:
+        if ticket.channel == "voice":
+            # Transcribed (unless the provider sent text) and analyzed first; the job notifies the brand
+            await ticket_jobs.process_voice_ticket.enqueue(ticket.id, ticket.audio_file_path)
+        else:
+            await ticket_jobs.ticket_created(ticket)
+
+
+def start():
+    if not _workers:
+        loop = asyncio.get_running_loop()
+        _workers.extend(loop.create_task(_consume(queue)) for queue in _queues)
+
+
+async def stop():
+    """Let the consumers finish what is queued (up to the timeout), then stop them."""
+    if _workers:
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in _queues)), WEBHOOK_SHUTDOWN_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %d inbound messages unprocessed", _queued())
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+def status() -> dict:
+    return {**stats, "queued": _queued(), "workers": len(_workers)}
+
+
+def _queued() -> int:
+    return sum(queue.qsize() for queue in _queues)
@@ -1,27 +1,86 @@
+import asyncio
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app import crud, models
+from app.core.cache import TTLCache
+from app.database import get_async_db
+from app import crud, models, schemas
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor; hashes made with a different cost are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Password hashing runs on its own bounded pool so a login burst can't starve
+# the event loop or the default threadpool. bcrypt releases the GIL, so
+# threads give real parallelism here.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 4)))
+
+# Authenticated principals are cached per subject so most requests skip the
+# users table; AUTH_TRUST_TOKEN_CLAIMS lets brand tokens skip it entirely.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() in ("1", "true", "yes")
+
+_principal_cache = TTLCache(PRINCIPAL_CACHE_TTL_SECONDS, max_entries=PRINCIPAL_CACHE_MAX_ENTRIES)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="pwd-hash")
+# Running plus queued jobs; once full, new requests are turned away with 503
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def _run_hash_job(func, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = _hash_executor.submit(func, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    # The slot is freed when the work itself finishes, not when this caller
+    # stops waiting: a cancelled request leaves its hash running on the pool
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+async def hash_password_async(password: str) -> str:
+    """get_password_hash on the bounded hashing pool."""
+    return await _run_hash_job(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify on the bounded hashing pool. Returns (valid, new_hash), where
+    new_hash is set when the stored hash should be replaced because the
+    configured cost factor changed.
+    """
+    return await _run_hash_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+def shutdown_password_hashing():
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -31,24 +90,113 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    credentials_exc = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exc
     except JWTError:
-        raise credentials_exc
-    
-    user = crud.get_user_by_email(db, email)
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+async def _load_principal(db: AsyncSession, email: str) -> schemas.Principal:
+    principal = _principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    user = await crud.get_user_by_email(db, email)
     if user is None:
-        raise credentials_exc
-    return user
\ No newline at end of file
+        raise _credentials_exception()
+    principal = schemas.Principal.model_validate(user)
+    if user.is_brand:
+        brand = await crud.get_brand_by_email(db, email)
+        principal.brand_id = brand.id if brand else None
+    _principal_cache.set(email, principal)
+    return principal
+
+async def authenticate_token(db: AsyncSession, token: str) -> schemas.Principal:
+    """The active caller an access token belongs to; raises 401 otherwise."""
+    payload = _decode_token(token)
+    principal = await _load_principal(db, payload["sub"])
+    if not principal.is_active:
+        raise _credentials_exception()
+    return principal
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> schemas.Principal:
+    return await authenticate_token(db, token)
+
+async def get_current_brand_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> schemas.Principal:
+    """
+    Resolve a brand caller. With AUTH_TRUST_TOKEN_CLAIMS enabled, tokens
+    issued by brand_login are trusted as-is and never touch the database.
+    """
+    payload = _decode_token(token)
+    if AUTH_TRUST_TOKEN_CLAIMS and payload.get("is_brand") and payload.get("brand_id") and payload.get("user_id"):
+        return schemas.Principal(
+            id=payload["user_id"],
+            email=payload["sub"],
+            is_brand=True,
+            brand_id=payload["brand_id"],
+        )
+
+    principal = await _load_principal(db, payload["sub"])
+    if not principal.is_active:
+        raise _credentials_exception()
+    if not principal.is_brand or principal.brand_id is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a brand account")
+    return principal
+
+async def get_current_admin_user(
+    principal: schemas.Principal = Depends(get_current_user)
+) -> schemas.Principal:
+    if not principal.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not an admin account")
+    return principal
+
+def invalidate_principal(email: str):
+    """Forget the cached principal for a subject, e.g. after a role change."""
+    _principal_cache.invalidate(email)
+
+# Drop cached principals as soon as a commit changes a user's standing.
+# Other workers catch up within PRINCIPAL_CACHE_TTL_SECONDS.
+_PRINCIPAL_FIELDS = ("email", "is_active", "is_brand", "is_admin")
+_STALE_KEY = "stale_principals"
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_principals(session, flush_context):
+    stale = session.info.setdefault(_STALE_KEY, set())
+    for obj in session.dirty:
+        if not isinstance(obj, models.User):
+            continue
+        state = inspect(obj)
+        for field in _PRINCIPAL_FIELDS:
+            history = state.attrs[field].history
+            if history.has_changes():
+                stale.add(obj.email)
+                if field == "email":
+                    stale.update(history.deleted)
+    for obj in session.deleted:
+        if isinstance(obj, models.User):
+            stale.add(obj.email)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale_principals(session):
+    for email in session.info.pop(_STALE_KEY, ()):
+        _principal_cache.invalidate(email)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_principals(session):
+    session.info.pop(_STALE_KEY, None)
@@ -1,13 +1,404 @@
 # backend/app/websocket.py
-from fastapi import WebSocket
+"""
+Live ticket updates over WebSocket.
 
-@app.websocket("/ws/{client_id}")
-async def websocket_endpoint(websocket: WebSocket, client_id: str):
+Clients connect to /api/v1/ws and authenticate with their first message,
+{"action": "auth", "token": <access token>}, within WS_AUTH_TIMEOUT_SECONDS;
+anything else closes the socket with 1008. (Browsers can't set headers on
+a WebSocket, and a token in the URL would end up in access logs.) Brand
+users are then subscribed to their brand's channel ("brand:<id>") and
+anyone may follow
+tickets they can see by sending {"action": "subscribe", "ticket_id": N}
+("ticket:<id>"). Committed ticket inserts and updates are published to both
+channels by Session listeners, the same way dashboard invalidation works.
+
+Each event is encoded once and queued on every subscriber. A connection's
+sender drains whatever is queued and sends it as one JSON array frame, so a
+burst of updates costs one send per client. A client whose queue fills up
+(WS_SEND_QUEUE_SIZE) or whose send stalls for WS_SEND_TIMEOUT_SECONDS is
+closed with 1013 instead of holding up everyone else; it should reconnect
+and refetch.
+
+Workers share events through a backplane: WS_BACKPLANE=local delivers in
+process only, WS_BACKPLANE=redis publishes to Redis (batched per loop
+iteration) and every worker delivers what it receives to its own clients.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from itertools import chain
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal
+from app.models import Ticket
+from app.schemas import Principal, TicketOut
+from app.utils import authenticate_token
+
+logger = logging.getLogger(__name__)
+
+WS_BACKPLANE = os.getenv("WS_BACKPLANE", "local")
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+WS_MAX_SUBSCRIPTIONS = int(os.getenv("WS_MAX_SUBSCRIPTIONS", "50"))
+WS_AUTH_TIMEOUT_SECONDS = float(os.getenv("WS_AUTH_TIMEOUT_SECONDS", "10"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_CHANNEL_PREFIX = "complainthub:ws:"
+
+MAX_BATCH = 100
+CLOSE_TRY_AGAIN_LATER = 1013
+CLOSE_POLICY_VIOLATION = 1008
+
+router = APIRouter()
+
+
+def brand_channel(brand_id: int) -> str:
+    return f"brand:{brand_id}"
+
+
+def ticket_channel(ticket_id: int) -> str:
+    return f"ticket:{ticket_id}"
+
+
+class Connection:
+    """One client: its subscriptions and a bounded queue of encoded events."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.channels: Set[str] = set()
+        self.dropped = False
+        self._queue: asyncio.Queue = asyncio.Queue(WS_SEND_QUEUE_SIZE)
+        self._sender: Optional[asyncio.Task] = None
+
+    def offer(self, message: str) -> bool:
+        """Queue message; False if the client is too far behind."""
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def start(self) -> asyncio.Task:
+        self._sender = asyncio.get_running_loop().create_task(self._send_forever())
+        return self._sender
+
+    async def _send_forever(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Events are already JSON objects, so the frame is just their array
+            await asyncio.wait_for(
+                self.websocket.send_text("[" + ",".join(batch) + "]"), WS_SEND_TIMEOUT_SECONDS
+            )
+
+    def drop(self):
+        self.dropped = True
+        if self._sender is not None:
+            self._sender.cancel()
+
+
+class Hub:
+    """Channel -> connections in this worker."""
+
+    def __init__(self):
+        self.channels: Dict[str, Set[Connection]] = defaultdict(set)
+        self.connections = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, connection: Connection, channel: str):
+        connection.channels.add(channel)
+        self.channels[channel].add(connection)
+
+    def unsubscribe(self, connection: Connection, channel: str):
+        connection.channels.discard(channel)
+        members = self.channels.get(channel)
+        if members is not None:
+            members.discard(connection)
+            if not members:
+                del self.channels[channel]
+
+    def remove(self, connection: Connection):
+        for channel in list(connection.channels):
+            self.unsubscribe(connection, channel)
+
+    def deliver(self, channel: str, message: str):
+        for connection in list(self.channels.get(channel, ())):
+            if connection.offer(message):
+                self.delivered += 1
+            else:
+                logger.info("Dropping WebSocket client that fell %d events behind", WS_SEND_QUEUE_SIZE)
+                self.dropped += 1
+                self.remove(connection)
+                connection.drop()
+
+    def status(self) -> dict:
+        return {
+            "backplane": WS_BACKPLANE,
+            "connections": self.connections,
+            "channels": len(self.channels),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+class LocalBackplane:
+    """Single process: publishing is delivering."""
+
+    def __init__(self, hub: Hub):
+        self._hub = hub
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def publish(self, channel: str, message: str):
+        self._hub.deliver(channel, message)
+
+    def publish_blocking(self, channel: str, message: str):
+        # No hub runs in this process, so nobody here is listening
+        pass
+
+
+class RedisBackplane:
+    """Redis pub/sub shared by every worker; outgoing events are pipelined."""
+
+    def __init__(self, hub: Hub, url: str):
+        import redis
+        import redis.asyncio as aioredis
+        self._hub = hub
+        self._redis = aioredis.from_url(url)
+        self._sync_redis = redis.Redis.from_url(url)
+        self._outbox: List[Tuple[str, str]] = []
+        self._listener: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def start(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._flush()
+        await self._redis.aclose()
+
+    def publish(self, channel: str, message: str):
+        if not self._outbox:
+            task = asyncio.get_running_loop().create_task(self._flush())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        self._outbox.append((channel, message))
+
+    def publish_blocking(self, channel: str, message: str):
+        # For processes without a running hub, e.g. Celery workers
+        try:
+            self._sync_redis.publish(REDIS_CHANNEL_PREFIX + channel, message)
+        except Exception:
+            logger.exception("Could not publish WebSocket event to Redis")
+
+    async def _flush(self):
+        outbox, self._outbox = self._outbox, []
+        if not outbox:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for channel, message in outbox:
+            pipe.publish(REDIS_CHANNEL_PREFIX + channel, message)
+        try:
+            await pipe.execute()
+        except Exception:
+            logger.exception("Could not publish %d WebSocket events to Redis", len(outbox))
+
+    async def _listen(self):
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(REDIS_CHANNEL_PREFIX + "*")
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        channel = message["channel"].decode()[len(REDIS_CHANNEL_PREFIX):]
+                        self._hub.deliver(channel, message["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("WebSocket backplane subscription failed; resubscribing")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+def _make_backplane(hub: Hub):
+    if WS_BACKPLANE == "redis":
+        return RedisBackplane(hub, REDIS_URL)
+    return LocalBackplane(hub)
+
+
+hub = Hub()
+backplane = _make_backplane(hub)
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[int] = None
+
+
+async def start():
+    global _loop, _loop_thread
+    _loop = asyncio.get_running_loop()
+    _loop_thread = threading.get_ident()
+    await backplane.start()
+
+
+async def stop():
+    global _loop
+    await backplane.stop()
+    _loop = None
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def publish(channel: str, payload: dict):
+    """Send payload to channel's subscribers in every worker. Thread-safe."""
+    message = json.dumps(payload, default=_json_default)
+    if _loop is None:
+        backplane.publish_blocking(channel, message)
+    elif threading.get_ident() == _loop_thread:
+        backplane.publish(channel, message)
+    else:
+        # Sync sessions commit on threadpool threads
+        _loop.call_soon_threadsafe(backplane.publish, channel, message)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Endpoint
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def _can_follow(principal: Principal, ticket_id: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(Ticket.brand_id, Ticket.user_id).where(Ticket.id == ticket_id)
+        )).first()
+    if row is None:
+        return False
+    if principal.role == "brand":
+        return row.brand_id == principal.brand_id
+    if principal.role == "user":
+        return row.user_id == principal.id
+    return True
+
+
+async def _authenticate(websocket: WebSocket) -> Optional[Principal]:
+    """The caller named by the first message, or None if it isn't a valid auth message."""
+    try:
+        command = json.loads(await asyncio.wait_for(websocket.receive_text(), WS_AUTH_TIMEOUT_SECONDS))
+        if command["action"] != "auth":
+            return None
+        async with AsyncSessionLocal() as db:
+            return await authenticate_token(db, str(command["token"]))
+    except (asyncio.TimeoutError, ValueError, TypeError, KeyError, HTTPException):
+        return None
+
+
+async def _receive_commands(websocket: WebSocket, connection: Connection, principal: Principal):
+    while True:
+        try:
+            command = json.loads(await websocket.receive_text())
+            action, ticket_id = command["action"], int(command["ticket_id"])
+        except (ValueError, TypeError, KeyError):
+            continue
+        channel = ticket_channel(ticket_id)
+        if action == "unsubscribe":
+            hub.unsubscribe(connection, channel)
+        elif action == "subscribe" and len(connection.channels) < WS_MAX_SUBSCRIPTIONS \
+                and await _can_follow(principal, ticket_id):
+            hub.subscribe(connection, channel)
+
+
+@router.websocket("/ws")
+async def live_updates(websocket: WebSocket):
     await websocket.accept()
     try:
-        while True:
-            data = await websocket.receive_text()
-            # Handle real-time updates
-            await websocket.send_text(f"Message: {data}")
+        principal = await _authenticate(websocket)
     except WebSocketDisconnect:
-        pass
\ No newline at end of file
+        return
+    if principal is None:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+
+    connection = Connection(websocket)
+    if principal.role == "brand":
+        hub.subscribe(connection, brand_channel(principal.brand_id))
+    hub.connections += 1
+
+    tasks = [
+        connection.start(),
+        asyncio.create_task(_receive_commands(websocket, connection, principal)),
+    ]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        hub.remove(connection)
+        hub.connections -= 1
+
+    slow = connection.dropped or any(isinstance(result, asyncio.TimeoutError) for result in results)
+    if slow:
+        try:
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER, reason="Client too slow")
+        except RuntimeError:
+            pass  # already closed
+    else:
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, WebSocketDisconnect):
+                logger.warning("WebSocket connection failed: %r", result)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Events: remember tickets a flush wrote and publish them once the
+# transaction commits.
+# ─────────────────────────────────────────────────────────────────────────────
+
+_EVENTS_KEY = "websocket_ticket_events"
+TICKET_FIELDS = tuple(TicketOut.model_fields)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_ticket_events(session, flush_context):
+    if isinstance(backplane, LocalBackplane) and not hub.channels:
+        return  # nobody to tell
+    events = session.info.setdefault(_EVENTS_KEY, {})
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, Ticket) and obj.id is not None and obj.brand_id is not None:
+            kind = "ticket.created" if obj in session.new or events.get(obj.id, {}).get("type") == "ticket.created" \
+                else "ticket.updated"
+            events[obj.id] = {"type": kind, "ticket": {name: getattr(obj, name) for name in TICKET_FIELDS}}
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_ticket_events(session):
+    for ticket_id, payload in session.info.pop(_EVENTS_KEY, {}).items():
+        publish(brand_channel(payload["ticket"]["brand_id"]), payload)
+        publish(ticket_channel(ticket_id), payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_ticket_events(session):
+    session.info.pop(_EVENTS_KEY, None)
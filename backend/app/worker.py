@@ -0,0 +1,21 @@
+# backend/app/worker.py
+"""
+Celery entry point for JOB_BACKEND=celery.
+
+    celery -A app.worker worker -Q jobs.notify_brand,jobs.follow_up,jobs.send_reply -c 8
+    celery -A app.worker worker -Q jobs.process_voice_ticket -c 2
+
+Importing ticket_jobs registers every job type with the Celery app, and
+importing websocket lets ticket changes made here reach live dashboards
+(with WS_BACKPLANE=redis).
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+from app import websocket  # noqa: F401
+from app.services import jobs, ticket_jobs  # noqa: F401
+
+if not isinstance(jobs.backend, jobs.CeleryJobBackend):
+    raise RuntimeError("Set JOB_BACKEND=celery to run a Celery worker")
+
+celery = jobs.backend.celery
@@ -0,0 +1,17 @@
+import sys
+
+from app.database import SessionLocal
+from app.services import rollups
+
+def backfill_rollups(brand_id=None):
+    print("Rebuilding brand_daily_stats from tickets...")
+    db = SessionLocal()
+    try:
+        written = rollups.backfill(db, brand_id=brand_id)
+    finally:
+        db.close()
+    print(f"Rollup rebuilt: {written} buckets written")
+
+if __name__ == "__main__":
+    # Optional argument: a single brand id to rebuild
+    backfill_rollups(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,102 @@
+"""
+Measure bulk ticket import throughput through POST /api/v1/tickets/bulk.
+
+    DATABASE_URL=sqlite:////tmp/bulk_bench.db python benchmark_bulk_import.py [rows] [runs] [days]
+
+Streams generated NDJSON rows through the endpoint in-process (TestClient,
+so no network) as a brand user and prints rows per second for each run.
+created_at is spread over the last `days` days (90 by default, like a
+history import); every day, channel and category is a separate rollup
+bucket, so a wider spread means more rollup upserts per batch. The
+duplicate index hashes imported rows in the background after the
+response; that is drained (and timed separately) before the next run so
+runs don't compete with it.
+The rows are kept, so point DATABASE_URL at a scratch database.
+"""
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app import models
+from app.database import SessionLocal
+from app.services import duplicates
+from app.utils import get_password_hash
+from init_db import init_db
+
+BENCH_EMAIL = "bulk-bench@example.com"
+CHANNELS = ["sms", "whatsapp", "telegram", "webchat", "voice"]
+CATEGORIES = ["complaint", "query", "feedback"]
+SUBJECTS = ["my parcel", "the refund", "the app", "my invoice", "the technician", "support", "my router", "the delivery"]
+PROBLEMS = ["never arrived", "is still pending", "crashes on login", "charged me twice", "did not show up",
+            "never called back", "keeps disconnecting", "was damaged", "is missing items", "was cancelled"]
+DETAILS = ["since monday", "for the third time", "after two weeks", "even after I complained", "again today",
+           "despite the confirmation email", "and nobody answers", "before the weekend"]
+CHUNK_ROWS = 500
+
+
+def ensure_brand():
+    db = SessionLocal()
+    try:
+        brand = db.query(models.Brand).filter(models.Brand.email == BENCH_EMAIL).first()
+        if brand is None:
+            brand = models.Brand(name="Bulk Bench", email=BENCH_EMAIL)
+            db.add(brand)
+            db.add(models.User(name="Bulk Bench", phone="0000000000", email=BENCH_EMAIL,
+                               hashed_password=get_password_hash("bench"), is_brand=True))
+            db.commit()
+        return brand.id
+    finally:
+        db.close()
+
+
+def ndjson(brand_id, rows, days):
+    """The request body, CHUNK_ROWS lines per chunk so it streams like an upload."""
+    rng = random.Random(rows)
+    start = datetime.utcnow() - timedelta(days=days)
+    lines = []
+    for _ in range(rows):
+        created_at = start + timedelta(minutes=rng.randrange(days * 24 * 60))
+        row = {
+            "brand_id": brand_id,
+            "channel": rng.choice(CHANNELS),
+            "category": rng.choice(CATEGORIES),
+            "description": f"Order {rng.randrange(10 ** 6)}: {rng.choice(SUBJECTS)} {rng.choice(PROBLEMS)} "
+                           f"{rng.choice(DETAILS)}, reference {rng.randrange(10 ** 8):08d}",
+            "created_at": created_at.isoformat(),
+        }
+        if rng.random() < 0.4:
+            row.update(status="resolved", resolved_at=(created_at + timedelta(hours=rng.randrange(1, 96))).isoformat())
+        lines.append(json.dumps(row))
+        if len(lines) == CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def benchmark(rows=10000, runs=3, days=90):
+    brand_id = ensure_brand()
+    with TestClient(app) as client:
+        token = client.post("/api/v1/brands/login", data={"username": BENCH_EMAIL, "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}", "Content-Type": "application/x-ndjson"}
+        for run in range(1, runs + 1):
+            body = list(ndjson(brand_id, rows, days))
+            started = time.perf_counter()
+            response = client.post("/api/v1/tickets/bulk", content=iter(body), headers=headers)
+            elapsed = time.perf_counter() - started
+            result = response.json()
+            print(f"run {run}: {result['inserted']} inserted, {result['failed']} failed "
+                  f"in {elapsed:.2f}s = {result['inserted'] / elapsed:,.0f} rows/s")
+            started = time.perf_counter()
+            client.portal.call(duplicates.drain)
+            print(f"       duplicate index caught up {time.perf_counter() - started:.2f}s later")
+
+
+if __name__ == "__main__":
+    init_db()
+    benchmark(*(int(arg) for arg in sys.argv[1:4]))
@@ -1,11 +1,28 @@
-from app.database import engine
+from app.database import SessionLocal, engine, ensure_columns, ensure_indexes
 from app.db.base_class import Base
 from app.models import User, Brand, Ticket
+from app.services import rollups
+from app.services.search import ensure_search_index
 
 def init_db():
+    # Run once per deploy, before the app starts: these take table locks and
+    # would race if every worker applied them on import
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    ensure_search_index(engine)
     print("Database tables created successfully!")
 
+    # The dashboards read only the rollup; build it from existing tickets
+    # the first time (e.g. right after brand_daily_stats was added)
+    db = SessionLocal()
+    try:
+        written = rollups.backfill_if_empty(db)
+    finally:
+        db.close()
+    if written:
+        print(f"Rollup built from existing tickets: {written} buckets written")
+
 if __name__ == "__main__":
     init_db()
\ No newline at end of file
@@ -0,0 +1,151 @@
+# backend/tests/conftest.py
+import base64
+import hashlib
+import hmac
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Module-level settings are read at import time, so point the app at a
+# throwaway database and at the fake providers before anything under app/
+# is imported
+_tmp = tempfile.mkdtemp(prefix="complaint-hub-tests-")
+FAKE_CHANNELS_URL = f"http://127.0.0.1:{_free_port()}"
+FAKE_DEEPGRAM_URL = f"http://127.0.0.1:{_free_port()}"
+TWILIO_AUTH_TOKEN = "twilio-token"
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_tmp}/test.db",
+    DUPLICATE_INDEX_PATH=f"{_tmp}/duplicate_index.pickle",
+    VOICE_UPLOAD_DIR=f"{_tmp}/voice",
+    SENTIMENT_DEFAULT_SCORER="local",
+    TELEGRAM_API_URL=f"{FAKE_CHANNELS_URL}/telegram",
+    TELEGRAM_BOT_TOKEN="telegram-token",
+    TWILIO_API_URL=f"{FAKE_CHANNELS_URL}/twilio",
+    TWILIO_ACCOUNT_SID="AC123",
+    TWILIO_AUTH_TOKEN=TWILIO_AUTH_TOKEN,
+    TWILIO_PHONE_NUMBER="+18005550100",
+    WEBCHAT_API_URL=f"{FAKE_CHANNELS_URL}/webchat",
+    WHATSAPP_API_URL=f"{FAKE_CHANNELS_URL}/whatsapp",
+    WHATSAPP_PHONE_NUMBER_ID="100",
+    WHATSAPP_ACCESS_TOKEN="whatsapp-token",
+    DEEPGRAM_API_URL=FAKE_DEEPGRAM_URL,
+)
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.database import SessionLocal
+from app.main import app
+from app.utils import get_password_hash
+from init_db import init_db
+
+init_db()
+
+
+def _serve(module: str, base_url: str, **env):
+    """Run one of the fake provider apps in a subprocess until it answers /stats."""
+    port = base_url.rsplit(":", 1)[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--port", port, "--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            httpx.get(f"{base_url}/stats")
+            return process
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                process.kill()
+                raise
+            time.sleep(0.1)
+
+
+@pytest.fixture(scope="session")
+def fake_channels():
+    process = _serve("app.core.channels.fake_server", FAKE_CHANNELS_URL)
+    yield FAKE_CHANNELS_URL
+    process.terminate()
+    process.wait()
+
+
+@pytest.fixture(scope="session")
+def fake_channels_limited():
+    """A second fake provider server that answers 429 beyond two concurrent calls."""
+    base_url = f"http://127.0.0.1:{_free_port()}"
+    process = _serve("app.core.channels.fake_server", base_url, FAKE_CHANNEL_MAX_CONCURRENT="2")
+    yield base_url
+    process.terminate()
+    process.wait()
+
+
+@pytest.fixture(scope="session")
+def fake_deepgram():
+    process = _serve("app.services.speech.fake_deepgram", FAKE_DEEPGRAM_URL)
+    yield FAKE_DEEPGRAM_URL
+    process.terminate()
+    process.wait()
+
+
+def twilio_signature(url: str, params: dict) -> str:
+    payload = url + "".join(key + value for key, value in sorted(params.items()))
+    return base64.b64encode(hmac.new(TWILIO_AUTH_TOKEN.encode(), payload.encode(), hashlib.sha1).digest()).decode()
+
+
+def wait_for(condition, timeout: float = 5.0):
+    """Poll until condition() is truthy (background jobs, queues); returns its value."""
+    deadline = time.monotonic() + timeout
+    while not (result := condition()):
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for background work")
+        time.sleep(0.05)
+    return result
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def brand(client):
+    """A brand with its login; returns (brand_id, auth headers)."""
+    db = SessionLocal()
+    try:
+        brand = models.Brand(name="Acme", email="brand@acme.com", phone_number="+1-800-555-0100")
+        db.add(brand)
+        db.add(models.User(name="Acme", phone="18005550100", email="brand@acme.com",
+                           hashed_password=get_password_hash("pw"), is_brand=True))
+        db.commit()
+        brand_id = brand.id
+    finally:
+        db.close()
+    response = client.post("/api/v1/brands/login", data={"username": "brand@acme.com", "password": "pw"})
+    return brand_id, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def admin(client):
+    """Auth headers for an admin account."""
+    db = SessionLocal()
+    try:
+        db.add(models.User(name="Admin", phone="18005550199", email="admin@complainthub.com",
+                           hashed_password=get_password_hash("pw"), is_admin=True))
+        db.commit()
+    finally:
+        db.close()
+    response = client.post("/api/v1/auth/login", data={"username": "admin@complainthub.com", "password": "pw"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,39 @@
+# backend/tests/test_auth.py
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app import utils
+
+
+def test_hash_slot_is_held_until_the_work_finishes(monkeypatch):
+    monkeypatch.setattr(utils, "_hash_slots", threading.BoundedSemaphore(1))
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_hash(password):
+        started.set()
+        finish.wait(5)
+        return password[::-1]
+
+    async def scenario():
+        waiting = asyncio.create_task(utils._run_hash_job(slow_hash, "pw"))
+        await asyncio.to_thread(started.wait, 5)
+        # The caller gives up (e.g. the client disconnected), but the hash
+        # keeps running on the pool and still holds the only slot
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        with pytest.raises(HTTPException) as busy:
+            await utils._run_hash_job(str.upper, "pw")
+        assert busy.value.status_code == 503
+
+        finish.set()
+        for _ in range(100):
+            try:
+                return await utils._run_hash_job(str.upper, "pw")
+            except HTTPException:
+                await asyncio.sleep(0.01)
+
+    assert asyncio.run(scenario()) == "PW"
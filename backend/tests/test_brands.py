@@ -0,0 +1,83 @@
+# backend/tests/test_brands.py
+import asyncio
+
+from app import models
+from app.core.ai import sentiment
+from app.database import SessionLocal
+from app.services import voice_pipeline
+
+
+def test_dashboard(client, brand):
+    brand_id, headers = brand
+    db = SessionLocal()
+    db.add(models.Ticket(brand_id=brand_id, channel="sms", contact="+15550001",
+                         description="Refund never arrived", category="complaint", status="new"))
+    db.commit()
+    db.close()
+
+    response = client.get(f"/api/v1/brands/{brand_id}/dashboard", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["new_complaints"] >= 1
+
+    assert client.get(f"/api/v1/brands/{brand_id + 1}/dashboard", headers=headers).status_code == 403
+    assert client.get(f"/api/v1/brands/{brand_id}/dashboard").status_code == 401
+
+
+def test_analytics(client, brand):
+    brand_id, headers = brand
+    db = SessionLocal()
+    db.add(models.Ticket(brand_id=brand_id, channel="telegram", contact="77",
+                         description="App keeps crashing", category="complaint", status="new"))
+    db.commit()
+    db.close()
+
+    # Not whole days, so this range is answered from the tickets themselves
+    params = {"start_date": "2000-01-01T06:00:00", "end_date": "2100-01-01T06:00:00"}
+    response = client.get(f"/api/v1/brands/{brand_id}/analytics", params=params, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["channel_breakdown"]["telegram"] == 1
+
+    assert client.get(f"/api/v1/brands/{brand_id + 1}/analytics", headers=headers).status_code == 403
+
+
+def test_sentiment_scorer_setting(client, brand, monkeypatch):
+    brand_id, headers = brand
+    remote_calls = []
+
+    async def remote(text):
+        remote_calls.append(text)
+        return -0.9
+
+    monkeypatch.setattr(sentiment, "remote_score", remote)
+
+    def analyzed_sentiment(description):
+        db = SessionLocal()
+        ticket = models.Ticket(brand_id=brand_id, channel="voice", contact="+15550400",
+                               description=description, category="complaint", status="new")
+        db.add(ticket)
+        db.commit()
+        ticket_id = ticket.id
+        db.close()
+        assert asyncio.run(voice_pipeline.process_voice_ticket(ticket_id, None))
+        db = SessionLocal()
+        score = db.get(models.Ticket, ticket_id).sentiment_score
+        db.close()
+        return score
+
+    response = client.patch("/api/v1/brands/profile", json={"sentiment_scorer": "oracle"}, headers=headers)
+    assert response.status_code == 422
+
+    response = client.patch("/api/v1/brands/profile", json={"sentiment_scorer": "remote"}, headers=headers)
+    assert response.json()["sentiment_scorer"] == "remote"
+    assert analyzed_sentiment("The agent hung up on me twice") == -0.9
+    assert len(remote_calls) == 1
+
+    response = client.patch("/api/v1/brands/profile", json={"sentiment_scorer": "local"}, headers=headers)
+    assert response.json()["sentiment_scorer"] == "local"
+    assert analyzed_sentiment("The delivery was late and the box was broken") < 0
+    assert len(remote_calls) == 1
+
+    # null goes back to SENTIMENT_DEFAULT_SCORER
+    response = client.patch("/api/v1/brands/profile", json={"sentiment_scorer": None}, headers=headers)
+    assert response.json()["sentiment_scorer"] is None
+    assert client.patch("/api/v1/brands/profile", json={"sentiment_scorer": "local"}).status_code == 401
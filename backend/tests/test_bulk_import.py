@@ -0,0 +1,135 @@
+# backend/tests/test_bulk_import.py
+import json
+
+import pytest
+
+from app import models
+from app.core.ai import sentiment
+from app.database import SessionLocal
+from app.services import bulk_import
+
+
+def _ndjson(rows) -> str:
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+
+def test_imported_rows_are_scored_in_one_batch(client, brand, monkeypatch):
+    brand_id, headers = brand
+    batches = []
+    score_batch = sentiment.LexiconSentimentScorer.score_batch
+
+    def spy(self, texts):
+        texts = list(texts)
+        batches.append(texts)
+        return score_batch(self, texts)
+
+    monkeypatch.setattr(sentiment.LexiconSentimentScorer, "score_batch", spy)
+    descriptions = ["Terrible service, the parcel arrived broken", "Thanks, the refund was quick and helpful"]
+    rows = [{"brand_id": brand_id, "channel": "sms", "description": text, "category": "complaint"}
+            for text in descriptions]
+    response = client.post("/api/v1/tickets/bulk", content=_ndjson(rows),
+                           headers={**headers, "Content-Type": "application/x-ndjson"})
+    assert response.json()["inserted"] == 2
+    assert batches == [descriptions]
+
+    db = SessionLocal()
+    scores = [score for (score,) in db.query(models.Ticket.sentiment_score)
+              .filter(models.Ticket.description.in_(descriptions))
+              .order_by(models.Ticket.id)]
+    db.close()
+    assert scores[0] < 0 < scores[1]
+
+
+def _import(client, headers, body: str, content_type: str = "application/json"):
+    response = client.post("/api/v1/tickets/bulk", content=body,
+                           headers={**headers, "Content-Type": content_type})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _row(brand_id: int, description: str, **fields) -> dict:
+    return {"brand_id": brand_id, "channel": "webchat", "description": description,
+            "category": "complaint", **fields}
+
+
+def test_ndjson_and_array_bodies(client, brand):
+    brand_id, headers = brand
+    rows = [_row(brand_id, "Order arrived cold"),
+            _row(brand_id, "Charged twice", status="resolved",
+                 created_at="2024-03-01T10:00:00Z", resolved_at="2024-03-01T16:00:00Z")]
+
+    result = _import(client, headers, _ndjson(rows) + "\n\n", "application/x-ndjson")
+    assert (result["inserted"], result["failed"], result["brands"]) == (2, 0, [brand_id])
+    result = _import(client, headers, json.dumps(rows, indent=2))
+    assert (result["inserted"], result["failed"]) == (2, 0)
+
+    db = SessionLocal()
+    hours = (db.query(models.Ticket.resolution_time_hours)
+             .filter(models.Ticket.description == "Charged twice").all())
+    db.close()
+    assert hours == [(6.0,), (6.0,)]
+
+
+def test_bad_rows_are_reported_by_position(client, brand):
+    brand_id, headers = brand
+    rows = [
+        _row(brand_id, "Screen cracked on arrival"),
+        {"brand_id": brand_id, "channel": "webchat"},
+        _row(brand_id + 1000, "Wrong brand"),
+        _row(brand_id, "Resolved before it was filed", status="resolved",
+             created_at="2024-03-02T10:00:00Z", resolved_at="2024-03-01T10:00:00Z"),
+        ["not", "an", "object"],
+        _row(brand_id, "Warranty claim ignored"),
+    ]
+    result = _import(client, headers, json.dumps(rows))
+    assert (result["inserted"], result["failed"]) == (2, 4)
+    errors = {error["row"]: error["error"] for error in result["errors"]}
+    assert sorted(errors) == [1, 2, 3, 4]
+    assert "description" in errors[1]
+    assert errors[3] == "resolved_at is before created_at"
+
+    body = _ndjson(rows[:1]) + "{not json}\n" + _ndjson(rows[5:])
+    result = _import(client, headers, body, "application/x-ndjson")
+    assert (result["inserted"], result["failed"]) == (2, 1)
+    assert result["errors"][0]["row"] == 1
+
+
+@pytest.mark.parametrize("body, error", [
+    ('[{row}, {{"brand_id": 1,, "channel": "sms"}}, {row}]', "Invalid JSON"),
+    ("[{row},, {row}]", "Expected a row, not ','"),
+    ("[{row}, {row},]", "Expected a row, not ']'"),
+    ("[{row} {row}]", "Expected ',' or ']' after a row"),
+    ("[{row}, {row}", "Truncated JSON array"),
+])
+def test_malformed_array_stops_at_the_bad_row(client, brand, body, error):
+    brand_id, headers = brand
+    row = json.dumps(_row(brand_id, "Malformed body test"))
+    result = _import(client, headers, body.format(row=row))
+    # Rows before the bad one are kept; nothing after it is read
+    assert result["inserted"] in (1, 2)
+    assert result["errors"] == [{"row": result["inserted"], "error": result["errors"][0]["error"]}]
+    assert result["errors"][0]["error"].startswith(error)
+
+
+def test_oversized_row_is_not_buffered(client, brand, monkeypatch):
+    brand_id, headers = brand
+    monkeypatch.setattr(bulk_import, "BULK_MAX_ROW_BYTES", 1000)
+    body = "[" + json.dumps(_row(brand_id, "x" * 5000))
+    for complete in (False, True):
+        result = _import(client, headers, body + "]" * complete)
+        assert result["inserted"] == 0
+        assert result["errors"] == [{"row": 0, "error": "Row is longer than 1000 bytes"}]
+
+    rows = [_row(brand_id, "x" * 5000), _row(brand_id, "Short enough")]
+    result = _import(client, headers, _ndjson(rows), "application/x-ndjson")
+    assert result["inserted"] == 1
+    assert result["errors"] == [{"row": 0, "error": "Row is longer than 1000 bytes"}]
+
+
+def test_empty_bodies(client, brand):
+    _, headers = brand
+    assert _import(client, headers, "", "application/x-ndjson")["inserted"] == 0
+    assert _import(client, headers, "[]")["inserted"] == 0
+    result = _import(client, headers, "")
+    assert result["inserted"] == 0
+    assert result["errors"] == [{"row": 0, "error": "Body must be a JSON array"}]
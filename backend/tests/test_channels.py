@@ -0,0 +1,134 @@
+# backend/tests/test_channels.py
+import asyncio
+import time
+
+import httpx
+from conftest import FAKE_CHANNELS_URL, twilio_signature, wait_for
+
+from app import models
+from app.core.channels import base, registry, webchat
+from app.core.channels.telegram import TelegramAdapter
+from app.core.channels.twilio import TwilioAdapter
+from app.core.channels.webchat import WebchatAdapter
+from app.database import SessionLocal
+
+CHAT_WEBHOOK = "/api/v1/webhook/chat/twilio"
+
+
+def _stats() -> dict:
+    return httpx.get(f"{FAKE_CHANNELS_URL}/stats").json()
+
+
+def test_twilio_whatsapp_addresses():
+    _, kwargs = TwilioAdapter().build_send(registry.reply_address("twilio_whatsapp", "+15550200"), "Hi")
+    assert (kwargs["data"]["From"], kwargs["data"]["To"]) == ("whatsapp:+18005550100", "whatsapp:+15550200")
+    _, kwargs = TwilioAdapter().build_send(registry.reply_address("sms", "+15550200"), "Hi")
+    assert (kwargs["data"]["From"], kwargs["data"]["To"]) == ("+18005550100", "+15550200")
+
+
+def test_whatsapp_through_twilio_replies_through_twilio(client, brand, fake_channels):
+    _, headers = brand
+    form = {"MessageSid": "SM200", "From": "whatsapp:+15550200", "To": "whatsapp:+18005550100",
+            "Body": "My order arrived broken"}
+    signature = twilio_signature(f"http://testserver{CHAT_WEBHOOK}", form)
+    assert client.post(CHAT_WEBHOOK, data=form, headers={"X-Twilio-Signature": signature}).status_code == 200
+
+    def ticket():
+        db = SessionLocal()
+        try:
+            return db.query(models.Ticket).filter_by(contact="+15550200").one_or_none()
+        finally:
+            db.close()
+
+    assert wait_for(ticket).channel == "twilio_whatsapp"
+    before = _stats()
+    response = client.post(f"/api/v1/tickets/{ticket().id}/responses", params={"message": "Sorry!"}, headers=headers)
+    assert response.json() == {"success": True, "channel": "twilio_whatsapp"}
+
+    sent = lambda stats, provider: stats.get(provider, {}).get("messages", 0)
+    wait_for(lambda: sent(_stats(), "twilio") == sent(before, "twilio") + 1)
+    assert sent(_stats(), "whatsapp") == sent(before, "whatsapp")
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _send_many(adapter, count: int, contact: str = "77"):
+    try:
+        return await adapter.send_many((contact, f"Reply {i}") for i in range(count))
+    finally:
+        await adapter.close()
+
+
+def _telegram(base_url: str, **attributes) -> TelegramAdapter:
+    adapter_class = type("TestTelegramAdapter", (TelegramAdapter,), attributes)
+    adapter = adapter_class()
+    adapter.base_url = f"{base_url}/telegram"
+    return adapter
+
+
+def test_replies_share_pooled_connections(fake_channels):
+    httpx.post(f"{fake_channels}/stats/reset")
+    adapter = _telegram(fake_channels, rate_per_second=1000.0)
+    assert _run(_send_many(adapter, 200)) == [None] * 200
+
+    stats = _stats()["telegram"]
+    assert stats["messages"] == 200
+    assert stats["connections"] <= adapter.max_concurrency
+
+
+def test_token_bucket_paces_sends(fake_channels):
+    adapter = _telegram(fake_channels, rate_per_second=20.0)
+    started = time.monotonic()
+    # A full bucket covers the first 20; the other 20 wait for refills
+    assert _run(_send_many(adapter, 40)) == [None] * 40
+    assert time.monotonic() - started >= 0.9
+
+
+def test_rate_limited_sends_retry_after(fake_channels_limited, monkeypatch):
+    monkeypatch.setattr(base, "CHANNEL_MAX_RETRIES", 20)
+    adapter = _telegram(fake_channels_limited, rate_per_second=1000.0, max_concurrency=6)
+    started = time.monotonic()
+    assert _run(_send_many(adapter, 30)) == [None] * 30
+
+    stats = httpx.get(f"{fake_channels_limited}/stats").json()["telegram"]
+    assert stats["messages"] == 30
+    assert stats["rejected"] > 0
+    # Rejected calls waited the fake's Retry-After (0.1s) before trying again
+    assert time.monotonic() - started >= 0.1
+
+
+def _webchat(base_url: str) -> WebchatAdapter:
+    adapter = WebchatAdapter()
+    adapter.base_url = f"{base_url}/webchat"
+    return adapter
+
+
+def test_webchat_batches_replies(fake_channels):
+    httpx.post(f"{fake_channels}/stats/reset")
+    assert _run(_send_many(_webchat(fake_channels), 250, contact="s-1")) == [None] * 250
+
+    stats = _stats()["webchat"]
+    # Full windows of WEBCHAT_BATCH_MAX_SIZE (100), then the remainder
+    assert (stats["requests"], stats["messages"]) == (3, 250)
+
+
+def test_webchat_full_window_cancels_its_timer(fake_channels, monkeypatch):
+    monkeypatch.setattr(webchat, "WEBCHAT_BATCH_MAX_SIZE", 3)
+    monkeypatch.setattr(webchat, "WEBCHAT_BATCH_WINDOW_MS", 300)
+    adapter = _webchat(fake_channels)
+
+    async def scenario():
+        try:
+            await adapter.send_many(("s-2", f"Reply {i}") for i in range(3))
+            assert adapter._timer is None
+            await asyncio.sleep(0.1)
+            started = time.monotonic()
+            await adapter.send("s-2", "Late reply")
+            return time.monotonic() - started
+        finally:
+            await adapter.close()
+
+    # The late reply gets a window of its own instead of the first window's leftover timer
+    assert _run(scenario()) >= 0.28
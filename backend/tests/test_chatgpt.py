@@ -0,0 +1,167 @@
+# backend/tests/test_chatgpt.py
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.core.ai import chatgpt
+from app.core.ai.chatgpt import BATCH_FORMAT, ChatClient
+from app.core.ratelimit import TokenBucket
+
+
+class FakeLLM:
+    """httpx transport answering chat completions; records the items of each call."""
+
+    def __init__(self, batch_reply=None, failures: int = 0):
+        self.calls = []
+        self.batch_reply = batch_reply
+        self.failures = failures
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.failures:
+            self.failures -= 1
+            return httpx.Response(429, headers={"Retry-After": "0.1"})
+        system, user = json.loads(request.content)["messages"]
+        if BATCH_FORMAT in system["content"]:
+            items = json.loads(user["content"])["items"]
+            content = self.batch_reply or json.dumps([f"answer to {item}" for item in items])
+        else:
+            items = [user["content"]]
+            content = f"answer to {user['content']}"
+        self.calls.append(items)
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def _client(fake: FakeLLM, **options) -> ChatClient:
+    client = ChatClient(base_url="http://llm.test/v1", **options)
+    client._http = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(fake))
+    return client
+
+
+async def _batch_all(client: ChatClient, items):
+    try:
+        return await asyncio.gather(*(client.batch("Summarize", item) for item in items))
+    finally:
+        await client.close()
+
+
+def test_concurrent_requests_share_calls_up_to_max_size(monkeypatch):
+    monkeypatch.setattr(chatgpt, "LLM_BATCH_MAX_SIZE", 4)
+    fake = FakeLLM()
+    items = [f"ticket {i}" for i in range(10)]
+
+    answers = asyncio.run(_batch_all(_client(fake), items))
+    assert answers == [f"answer to {item}" for item in items]
+    assert sorted(len(call) for call in fake.calls) == [2, 4, 4]
+
+
+def test_identical_items_share_an_answer():
+    fake = FakeLLM()
+    answers = asyncio.run(_batch_all(_client(fake), ["late", "late", "broken"]))
+    assert answers == ["answer to late", "answer to late", "answer to broken"]
+    assert fake.calls == [["late", "broken"]]
+
+
+def test_unmatched_batch_reply_falls_back_to_single_calls():
+    fake = FakeLLM(batch_reply="Sorry, here are your summaries: ...")
+    answers = asyncio.run(_batch_all(_client(fake), ["late", "broken"]))
+    assert answers == ["answer to late", "answer to broken"]
+    assert sorted(fake.calls[1:]) == [["broken"], ["late"]]
+
+
+def test_window_flushes_after_its_timer(monkeypatch):
+    monkeypatch.setattr(chatgpt, "LLM_BATCH_WINDOW_MS", 100)
+    fake = FakeLLM()
+    started = time.monotonic()
+    assert asyncio.run(_batch_all(_client(fake), ["alone"])) == ["answer to alone"]
+    assert time.monotonic() - started >= 0.1
+    assert fake.calls == [["alone"]]
+
+
+def test_full_window_cancels_its_timer(monkeypatch):
+    monkeypatch.setattr(chatgpt, "LLM_BATCH_MAX_SIZE", 2)
+    monkeypatch.setattr(chatgpt, "LLM_BATCH_WINDOW_MS", 300)
+    fake = FakeLLM()
+    client = _client(fake)
+
+    async def scenario():
+        try:
+            await asyncio.gather(client.batch("Summarize", "first"), client.batch("Summarize", "second"))
+            await asyncio.sleep(0.1)
+            started = time.monotonic()
+            await client.batch("Summarize", "third")
+            return time.monotonic() - started
+        finally:
+            await client.close()
+
+    # "third" opens a window of its own instead of being flushed by the first window's timer
+    assert asyncio.run(scenario()) >= 0.28
+    assert fake.calls == [["first", "second"], ["third"]]
+
+
+def test_rate_limited_call_retries_after(monkeypatch):
+    fake = FakeLLM(failures=2)
+    client = _client(fake)
+
+    async def scenario():
+        try:
+            return await client.complete([{"role": "system", "content": "Summarize"},
+                                          {"role": "user", "content": "late"}])
+        finally:
+            await client.close()
+
+    started = time.monotonic()
+    assert asyncio.run(scenario()) == "answer to late"
+    assert time.monotonic() - started >= 0.2
+
+
+def test_requests_wait_for_the_bucket():
+    fake = FakeLLM()
+    # 600 requests a minute: a burst of 10, then one every 0.1s
+    client = _client(fake, requests_per_minute=600)
+    started = time.monotonic()
+    asyncio.run(_batch_all(client, [f"ticket {i}" for i in range(15)]))
+    # Batched into a single call, so no wait at all
+    assert time.monotonic() - started < 0.5
+
+    async def singles():
+        client = _client(fake, requests_per_minute=600)
+        try:
+            await asyncio.gather(*(client.complete([{"role": "system", "content": "Summarize"},
+                                                    {"role": "user", "content": f"ticket {i}"}])
+                                   for i in range(15)))
+        finally:
+            await client.close()
+
+    started = time.monotonic()
+    asyncio.run(singles())
+    assert time.monotonic() - started >= 0.45
+
+
+def test_token_bucket_burst_then_refill():
+    async def scenario():
+        bucket = TokenBucket(rate_per_second=10, capacity=5)
+        started = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        burst = time.monotonic() - started
+        for _ in range(5):
+            await bucket.acquire()
+        return burst, time.monotonic() - started
+
+    burst, total = asyncio.run(scenario())
+    assert burst < 0.05
+    assert 0.45 <= total < 1.0
+
+
+def test_token_bucket_caps_oversized_requests():
+    async def scenario():
+        bucket = TokenBucket(rate_per_second=100, capacity=10)
+        started = time.monotonic()
+        # More than the bucket holds is treated as a full bucket rather than waiting forever
+        await bucket.acquire(50)
+        await bucket.acquire(10)
+        return time.monotonic() - started
+
+    assert 0.09 <= asyncio.run(scenario()) < 0.5
@@ -0,0 +1,55 @@
+# backend/tests/test_classifier.py
+import json
+
+import pytest
+
+from app.core.ai import classifier
+
+
+@pytest.mark.parametrize("text, category, urgency", [
+    ("My parcel never arrived", "complaint", 1),
+    ("I suggested a better packaging", "suggestion", 1),
+    ("Just an idea: add tracking", "suggestion", 1),
+    ("Please HELP, the app logs me out", "support", 1),
+    ("How to reset my password?", "support", 1),
+    ("Leaving a review of the courier", "feedback", 1),
+    ("This is urgent", "complaint", 3),
+    ("Need help immediately", "support", 3),
+    # Earlier categories in the config win
+    ("Feedback and a suggestion", "suggestion", 1),
+    # Keywords are whole words, not prefixes of longer ones
+    ("The location was ideal but staff were unhelpful", "complaint", 1),
+    ("Staff were not helpful and the supporter club was rude", "complaint", 1),
+    ("An urgently needed refund, reviewed twice", "complaint", 3),
+    ("showhow topics", "complaint", 1),
+    ("", "complaint", 1),
+    (None, "complaint", 1),
+])
+def test_default_keywords(text, category, urgency):
+    result = classifier.classify(text)
+    assert (result["category"], result["urgency"]) == (category, urgency)
+
+
+def test_every_configured_keyword_matches_itself():
+    with open(classifier.DEFAULT_KEYWORDS_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    for name, terms in config["categories"].items():
+        for term in terms:
+            result = classifier.classify(f"About this: {term.upper()}.")
+            assert result["matched_terms"] == [term]
+            assert result["category"] == name
+
+
+def test_overlapping_keywords_match_the_longest_whole_word():
+    rules = classifier.KeywordClassifier(
+        categories={"a": ["pay", "payment"], "b": ["pay later"], "c": ["e-mail"]},
+        urgency={2: ["asap"]},
+    )
+    assert rules.classify("Payment failed")["matched_terms"] == ["payment"]
+    assert rules.classify("I chose pay later, asap")["matched_terms"] == ["pay later", "asap"]
+    assert rules.classify("payments page, payday")["matched_terms"] == []
+    assert rules.classify("Your e-mail bounced")["category"] == "c"
+    assert rules.classify_batch(["pay", None]) == [
+        {"category": "a", "urgency": 1, "matched_terms": ["pay"]},
+        {"category": "complaint", "urgency": 1, "matched_terms": []},
+    ]
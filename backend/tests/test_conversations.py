@@ -0,0 +1,152 @@
+# backend/tests/test_conversations.py
+import asyncio
+
+import pytest
+
+from app import models
+from app.core.conversation import context as conversation_context
+from app.core.conversation import manager as conversation_manager
+from app.core.conversation.manager import ConversationManager
+from app.database import SessionLocal
+
+
+def _stored(brand_id: int, contact: str):
+    db = SessionLocal()
+    try:
+        return db.query(models.Conversation).filter_by(brand_id=brand_id, channel="sms", contact=contact).first()
+    finally:
+        db.close()
+
+
+def test_writes_are_flushed_behind_and_read_back(brand):
+    brand_id = brand[0]
+
+    async def scenario():
+        store = ConversationManager()
+        context = await store.get(brand_id, "sms", "+15550801")
+        store.record(context, "customer", "My order is late")
+        store.record(context, "agent", "Sorry, checking now")
+        assert _stored(brand_id, "+15550801") is None
+
+        assert await store.flush() == 1
+        assert await store.flush() == 0
+        store.record(context, "customer", "Any news?")
+        assert await store.flush() == 1
+
+        # Another worker (or this one after a restart) picks up the flushed state
+        fresh = ConversationManager()
+        loaded = await fresh.get(brand_id, "sms", "+15550801")
+        return store, fresh, loaded
+
+    store, fresh, loaded = asyncio.run(scenario())
+    assert [(turn.role, turn.text) for turn in loaded.recent()] == [
+        ("customer", "My order is late"), ("agent", "Sorry, checking now"), ("customer", "Any news?"),
+    ]
+    assert loaded.turn_count == 3
+    assert _stored(brand_id, "+15550801").turn_count == 3
+    assert (store.stats["created"], store.stats["flushed"]) == (1, 2)
+    assert (fresh.stats["misses"], fresh.stats["loaded"]) == (1, 1)
+
+
+def test_resident_conversations_skip_the_database(brand, monkeypatch):
+    brand_id = brand[0]
+    store = ConversationManager()
+    loads = []
+    load = store._load
+
+    async def counting_load(keys):
+        loads.append(list(keys))
+        return await load(keys)
+
+    monkeypatch.setattr(store, "_load", counting_load)
+    keys = [(brand_id, "sms", f"+1555081{n}") for n in range(3)]
+
+    async def scenario():
+        first = await store.get_many(keys + keys[:1])
+        again = await store.get_many(keys)
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    # One query for the whole batch, none once they are resident
+    assert loads == [keys]
+    assert all(first[key] is again[key] for key in keys)
+    assert (store.stats["misses"], store.stats["hits"]) == (3, 3)
+
+
+def test_evicted_dirty_conversation_is_served_from_the_queue(brand):
+    brand_id = brand[0]
+
+    async def scenario():
+        store = ConversationManager(max_sessions=2)
+        a = await store.get(brand_id, "sms", "+15550821")
+        store.record(a, "customer", "Written before eviction")
+        await store.get(brand_id, "sms", "+15550822")
+        await store.get(brand_id, "sms", "+15550823")
+        assert store.peek(a.key) is a and a.key not in store._sessions
+
+        # A miss now must not read the (missing) row instead
+        again = await store.get(brand_id, "sms", "+15550821")
+        assert again is a
+        assert await store.flush() == 1
+        return store
+
+    store = asyncio.run(scenario())
+    assert store.stats["evicted_lru"] == 2
+    assert store.status()["resident"] == 2
+    assert _stored(brand_id, "+15550821").turn_count == 1
+
+
+def test_idle_conversations_are_swept(brand):
+    brand_id = brand[0]
+
+    async def scenario():
+        store = ConversationManager(idle_seconds=0)
+        for n in range(3):
+            await store.get(brand_id, "sms", f"+1555083{n}")
+        return store
+
+    store = asyncio.run(scenario())
+    assert store.status()["resident_bytes"] > 0
+    assert store.sweep() == 3
+    assert store.status()["resident"] == 0
+    assert store.status()["resident_bytes"] == 0
+
+
+def test_failed_flush_is_retried(brand, monkeypatch):
+    brand_id = brand[0]
+    upsert = conversation_manager._upsert
+
+    async def failing_upsert(db, rows):
+        raise ConnectionError("database unavailable")
+
+    async def scenario():
+        store = ConversationManager()
+        context = await store.get(brand_id, "sms", "+15550841")
+        store.record(context, "customer", "Hello?")
+        monkeypatch.setattr(conversation_manager, "_upsert", failing_upsert)
+        with pytest.raises(ConnectionError):
+            await store.flush()
+        assert store.status()["dirty"] == 1
+
+        monkeypatch.setattr(conversation_manager, "_upsert", upsert)
+        return store, await store.flush()
+
+    store, written = asyncio.run(scenario())
+    assert written == 1
+    assert store.stats["flush_failures"] == 1
+    assert _stored(brand_id, "+15550841").turn_count == 1
+
+
+def test_turns_are_capped_and_truncated(monkeypatch):
+    monkeypatch.setattr(conversation_context, "CONVERSATION_MAX_TURNS", 3)
+    monkeypatch.setattr(conversation_context, "CONVERSATION_MAX_TURN_CHARS", 10)
+    context = conversation_context.ConversationContext(1, "sms", "+15550851")
+    for n in range(5):
+        context.add_turn("customer", f"message number {n}")
+
+    assert [turn.text for turn in context.recent()] == ["message nu"] * 3
+    assert context.turn_count == 5
+    assert len(context.recent(2)) == 2
+    # nbytes is kept incrementally; it matches a fresh count of what is retained
+    rebuilt = conversation_context.ConversationContext(1, "sms", "+15550851", turns=context.turns)
+    assert context.nbytes == rebuilt.nbytes
@@ -0,0 +1,65 @@
+# backend/tests/test_duplicates.py
+import asyncio
+import threading
+
+from app import models
+from app.database import AsyncSessionLocal
+from app.services import duplicates
+from app.services.duplicates import BrandIndex, signature
+
+PARCEL = "My parcel from order 1234 never arrived and tracking has not moved for a week"
+PARCEL_AGAIN = "My parcel from order 1234 never arrived and tracking has not moved for a week!!"
+REFUND = "The refund for my cancelled subscription still has not reached my bank account"
+
+
+def test_changed_description_leaves_incident():
+    index = BrandIndex()
+    index.add(1, signature(PARCEL))
+    index.add(2, signature(PARCEL_AGAIN))
+    assert index.clusters() == {1: [1, 2]}
+
+    index.add(2, signature(REFUND))
+    assert index.clusters() == {}
+    assert index.incident_of(1) is None
+
+
+def test_incident_splits_when_its_bridge_changes():
+    index = BrandIndex()
+    index.add(1, signature(PARCEL))
+    index.add(2, signature(PARCEL_AGAIN))
+    index.add(3, signature(PARCEL + " again"))
+    index.add(4, signature(REFUND))
+    index.add(5, signature(REFUND + " please"))
+    assert index.clusters() == {1: [1, 2, 3], 4: [4, 5]}
+
+    # Ticket 1 was the incident's root; the rest of it stays together under a new one
+    index.add(1, None)
+    assert index.clusters() == {2: [2, 3], 4: [4, 5]}
+    index.add(4, signature(PARCEL))
+    assert index.clusters() == {2: [2, 3, 4]}
+
+
+def test_commit_indexes_off_the_event_loop(monkeypatch):
+    threads = set()
+    add = duplicates.index.add
+
+    def recording_add(*args):
+        threads.add(threading.current_thread().name)
+        add(*args)
+
+    monkeypatch.setattr(duplicates.index, "add", recording_add)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            brand = models.Brand(name="Dup Co", email="dup@dupco.com")
+            db.add(brand)
+            await db.flush()
+            tickets = [models.Ticket(brand_id=brand.id, description=text) for text in (PARCEL, PARCEL_AGAIN)]
+            db.add_all(tickets)
+            await db.commit()
+        await duplicates.drain()
+        return brand.id, [ticket.id for ticket in tickets]
+
+    brand_id, ticket_ids = asyncio.run(scenario())
+    assert duplicates.index.incident_of(brand_id, ticket_ids[0]) == ticket_ids
+    assert threads and all(name.startswith("duplicates") for name in threads)
@@ -0,0 +1,142 @@
+# backend/tests/test_export.py
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+from app import models
+from app.database import SessionLocal
+from app.services import export
+from app.utils import get_password_hash
+
+
+def _login(client, email: str, *, brand: bool):
+    """(brand id or user id, auth headers) for a new brand or customer account."""
+    db = SessionLocal()
+    try:
+        owner_id = None
+        if brand:
+            brand_row = models.Brand(name=email.split("@")[0], email=email)
+            db.add(brand_row)
+            db.flush()
+            owner_id = brand_row.id
+        user = models.User(name="Export", phone=email.split("@")[0], email=email,
+                           hashed_password=get_password_hash("pw"), is_brand=brand)
+        db.add(user)
+        db.commit()
+        owner_id = owner_id or user.id
+    finally:
+        db.close()
+    path = "/api/v1/brands/login" if brand else "/api/v1/auth/login"
+    token = client.post(path, data={"username": email, "password": "pw"}).json()["access_token"]
+    return owner_id, {"Authorization": f"Bearer {token}"}
+
+
+def _tickets(brand_id: int, count: int, user_id=None, status="new") -> list:
+    db = SessionLocal()
+    try:
+        tickets = [models.Ticket(brand_id=brand_id, user_id=user_id, channel="sms", contact="+15550700",
+                                 description=f'Export row {n}, with "quotes"\nand a newline',
+                                 category="complaint", status=status) for n in range(count)]
+        db.add_all(tickets)
+        db.commit()
+        return [ticket.id for ticket in tickets]
+    finally:
+        db.close()
+
+
+def _export(client, headers, path="/api/v1/tickets/export", **params):
+    response = client.get(path, params=params, headers=headers)
+    assert response.status_code == 200
+    return response
+
+
+def _csv_ids(body: str) -> list:
+    rows = list(csv.DictReader(io.StringIO(body)))
+    return [int(row["id"]) for row in rows]
+
+
+def test_csv_and_ndjson_exports(client, monkeypatch):
+    # Several cursor partitions per export, with the CSV header only once
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    brand_id, headers = _login(client, "export@example.com", brand=True)
+    ids = _tickets(brand_id, 5)
+    resolved = _tickets(brand_id, 1, status="resolved")
+
+    response = _export(client, headers)
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="tickets.csv"'
+    assert response.text.count("id,brand_id") == 1
+    assert _csv_ids(response.text) == ids + resolved
+    first = next(csv.DictReader(io.StringIO(response.text)))
+    assert first["description"] == 'Export row 0, with "quotes"\nand a newline'
+
+    response = _export(client, headers, format="ndjson", status="resolved")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == resolved
+    assert set(rows[0]) == set(export.TICKET_FIELDS)
+    datetime.fromisoformat(rows[0]["created_at"])
+
+    # Nothing matches: still a well-formed CSV with its header
+    response = _export(client, headers, channel="fax")
+    assert response.text.splitlines() == [",".join(export.TICKET_FIELDS)]
+    assert _export(client, headers, format="ndjson", channel="fax").text == ""
+
+
+def test_gzip_export(client):
+    brand_id, headers = _login(client, "export-gzip@example.com", brand=True)
+    _tickets(brand_id, 3)
+
+    for fmt in ("csv", "ndjson"):
+        plain = _export(client, headers, format=fmt)
+        zipped = _export(client, headers, format=fmt, gzip=True)
+        assert zipped.headers["content-type"] == "application/gzip"
+        assert zipped.headers["content-disposition"] == f'attachment; filename="tickets.{fmt}.gz"'
+        # The test client doesn't decode it: there's no Content-Encoding
+        assert "content-encoding" not in zipped.headers
+        assert gzip.decompress(zipped.content) == plain.content
+
+
+def test_export_scoping(client, admin):
+    brand_id, headers = _login(client, "export-scope@example.com", brand=True)
+    other_id, _ = _login(client, "export-other@example.com", brand=True)
+    customer_id, customer_headers = _login(client, "export-customer@example.com", brand=False)
+    own = _tickets(brand_id, 2)
+    customers = _tickets(brand_id, 1, user_id=customer_id)
+    other = _tickets(other_id, 2)
+
+    # A brand's own scope wins over a brand_id parameter
+    assert _csv_ids(_export(client, headers, brand_id=other_id).text) == own + customers
+    assert _csv_ids(_export(client, customer_headers).text) == customers
+    # Admins pick a brand, or get every brand
+    assert _csv_ids(_export(client, admin, brand_id=other_id).text) == other
+    everything = _csv_ids(_export(client, admin).text)
+    assert set(own + customers + other) <= set(everything)
+    assert everything == sorted(everything)
+
+    assert client.get("/api/v1/tickets/export").status_code == 401
+
+
+def test_daily_stats_export(client, admin):
+    brand_id, headers = _login(client, "export-stats@example.com", brand=True)
+    _, customer_headers = _login(client, "export-stats-customer@example.com", brand=False)
+    db = SessionLocal()
+    db.add(models.BrandDailyStat(brand_id=brand_id, day=datetime(2024, 5, 1).date(), channel="sms",
+                                 category="complaint", total=4, resolved=1, resolution_count=1,
+                                 resolution_hours=2.5, rating_count=0, rating_sum=0))
+    db.commit()
+    db.close()
+
+    expected = [{"brand_id": brand_id, "day": "2024-05-01", "channel": "sms", "category": "complaint",
+                 "total": 4, "resolved": 1, "resolution_count": 1, "resolution_hours": 2.5,
+                 "rating_count": 0, "rating_sum": 0}]
+    for caller, params in ((headers, {}), (admin, {"brand_id": brand_id})):
+        response = _export(client, caller, "/api/v1/analytics/export", format="ndjson", **params)
+        assert [json.loads(line) for line in response.text.splitlines()] == expected
+    response = _export(client, admin, "/api/v1/analytics/export", gzip=True, brand_id=brand_id)
+    assert response.headers["content-disposition"] == 'attachment; filename="daily_stats.csv.gz"'
+    assert gzip.decompress(response.content).decode().splitlines()[1].startswith(f"{brand_id},2024-05-01,sms")
+
+    assert client.get("/api/v1/analytics/export", headers=customer_headers).status_code == 403
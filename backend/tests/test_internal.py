@@ -0,0 +1,13 @@
+# backend/tests/test_internal.py
+import pytest
+
+STATUS_PATHS = ["/internal/db/pool", "/internal/ai/cache", "/internal/webhooks",
+                "/internal/ws", "/internal/conversations", "/internal/speech"]
+
+
+@pytest.mark.parametrize("path", STATUS_PATHS)
+def test_status_endpoints_are_admin_only(client, brand, admin, path):
+    _, brand_headers = brand
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers=brand_headers).status_code == 403
+    assert client.get(path, headers=admin).status_code == 200
@@ -0,0 +1,82 @@
+# backend/tests/test_jobs.py
+import asyncio
+
+import pytest
+
+from app import models
+from app.database import SessionLocal
+from app.services import jobs, notifications, ticket_jobs
+from app.utils import get_password_hash
+
+
+def _resolved_ticket(brand_id: int, email: str) -> int:
+    db = SessionLocal()
+    try:
+        customer = models.User(name="Cus", phone=email.split("@")[0], email=email,
+                               hashed_password=get_password_hash("pw"))
+        db.add(customer)
+        db.flush()
+        ticket = models.Ticket(brand_id=brand_id, user_id=customer.id, channel="sms",
+                               description="Refund never arrived", category="complaint", status="resolved")
+        db.add(ticket)
+        db.commit()
+        return ticket.id
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Follow-up emails, by recipient, instead of sending them."""
+    emails = []
+
+    async def send_email(to, subject, body):
+        emails.append(to)
+
+    monkeypatch.setattr(notifications, "send_email", send_email)
+    return emails
+
+
+def test_follow_up_is_sent_once(brand, sent):
+    ticket_id = _resolved_ticket(brand[0], "followup1@example.com")
+    # The second run stands in for the broker redelivering the job
+    for _ in range(2):
+        asyncio.run(ticket_jobs.follow_up(ticket_id))
+    assert sent == ["followup1@example.com"]
+
+
+def test_failed_follow_up_is_retried(brand, sent, monkeypatch):
+    ticket_id = _resolved_ticket(brand[0], "followup2@example.com")
+    attempts = []
+    send_email = notifications.send_email
+
+    async def flaky(to, subject, body):
+        attempts.append(to)
+        if len(attempts) == 1:
+            raise ConnectionError("SMTP unavailable")
+        await send_email(to, subject, body)
+
+    monkeypatch.setattr(notifications, "send_email", flaky)
+    with pytest.raises(ConnectionError):
+        asyncio.run(ticket_jobs.follow_up(ticket_id))
+    asyncio.run(ticket_jobs.follow_up(ticket_id))
+    asyncio.run(ticket_jobs.follow_up(ticket_id))
+    assert sent == ["followup2@example.com"]
+
+
+def test_reopened_ticket_is_followed_up_again(client, brand, sent):
+    brand_id, headers = brand
+    ticket_id = _resolved_ticket(brand_id, "followup3@example.com")
+    asyncio.run(ticket_jobs.follow_up(ticket_id))
+
+    for status in ("in_progress", "resolved"):
+        response = client.patch(f"/api/v1/tickets/{ticket_id}/status", params={"status": status}, headers=headers)
+        assert response.status_code == 200
+    asyncio.run(ticket_jobs.follow_up(ticket_id))
+    assert sent == ["followup3@example.com"] * 2
+
+
+def test_celery_visibility_timeout_outlasts_follow_up_delay():
+    backend = jobs.CeleryJobBackend("redis://localhost:6379")
+    timeout = backend.celery.conf.broker_transport_options["visibility_timeout"]
+    assert timeout > ticket_jobs.FOLLOW_UP_DELAY_HOURS * 3600
@@ -0,0 +1,78 @@
+# backend/tests/test_rollups.py
+import asyncio
+
+from app import crud, models, schemas
+from app.database import AsyncSessionLocal, SessionLocal
+from app.services import rollups, voice_pipeline
+
+COUNTERS = ("total", "resolved", "resolution_count", "resolution_hours", "rating_count", "rating_sum")
+
+
+def _new_brand(email: str) -> int:
+    db = SessionLocal()
+    try:
+        brand = models.Brand(name="Rollup Co", email=email)
+        db.add(brand)
+        db.commit()
+        return brand.id
+    finally:
+        db.close()
+
+
+def _create_ticket(brand_id: int, channel: str, category: str, description: str) -> int:
+    async def create():
+        async with AsyncSessionLocal() as db:
+            ticket = await crud.create_ticket(db, schemas.TicketCreate(
+                brand_id=brand_id, channel=channel, category=category, description=description))
+            return ticket.id
+    return asyncio.run(create())
+
+
+def _rollup(brand_id: int) -> dict:
+    """Non-empty buckets of a brand, as bucket -> counters."""
+    db = SessionLocal()
+    try:
+        rows = db.query(models.BrandDailyStat).filter_by(brand_id=brand_id).all()
+        return {
+            (row.day, row.channel, row.category): tuple(round(getattr(row, name), 6) for name in COUNTERS)
+            for row in rows if row.total
+        }
+    finally:
+        db.close()
+
+
+def test_incremental_rollup_matches_backfill(client, admin):
+    brand_id = _new_brand("rollups@example.com")
+    kept = _create_ticket(brand_id, "sms", "complaint", "Parcel never arrived")
+    reopened = _create_ticket(brand_id, "sms", "complaint", "Refund still pending")
+    recategorized = _create_ticket(brand_id, "voice", "complaint", "I have an idea for the app")
+
+    for ticket_id, status in ((kept, "resolved"), (reopened, "resolved"), (reopened, "in_progress")):
+        response = client.patch(f"/api/v1/tickets/{ticket_id}/status", params={"status": status}, headers=admin)
+        assert response.status_code == 200
+    asyncio.run(voice_pipeline.process_voice_ticket(recategorized, None))
+
+    incremental = _rollup(brand_id)
+    day = next(iter(incremental))[0]
+    assert incremental[(day, "sms", "complaint")][:3] == (2, 1, 1)
+    assert incremental[(day, "voice", "suggestion")][:2] == (1, 0)
+    assert (day, "voice", "complaint") not in incremental
+
+    db = SessionLocal()
+    rollups.backfill(db, brand_id=brand_id)
+    db.close()
+    assert _rollup(brand_id) == incremental
+
+
+def test_empty_rollup_is_backfilled(client):
+    brand_id = _new_brand("rollups-empty@example.com")
+    db = SessionLocal()
+    db.add(models.Ticket(brand_id=brand_id, channel="sms", contact="+15550500",
+                         description="Late delivery", category="complaint", status="new"))
+    db.query(models.BrandDailyStat).delete()
+    db.commit()
+
+    assert rollups.backfill_if_empty(db) > 0
+    assert rollups.backfill_if_empty(db) == 0
+    db.close()
+    assert list(_rollup(brand_id).values()) == [(1, 0, 0, 0, 0, 0)]
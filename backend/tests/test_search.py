@@ -0,0 +1,92 @@
+# backend/tests/test_search.py
+from sqlalchemy.dialects import postgresql
+
+from app import models
+from app.database import SessionLocal
+from app.services import search
+from app.utils import get_password_hash
+
+
+def _brand_login(client, email: str):
+    """(brand id, auth headers) for a new brand."""
+    db = SessionLocal()
+    try:
+        brand = models.Brand(name=email.split("@")[0], email=email)
+        db.add(brand)
+        db.add(models.User(name="Search", phone=email.split("@")[0], email=email,
+                           hashed_password=get_password_hash("pw"), is_brand=True))
+        db.commit()
+        brand_id = brand.id
+    finally:
+        db.close()
+    token = client.post("/api/v1/brands/login", data={"username": email, "password": "pw"}).json()["access_token"]
+    return brand_id, {"Authorization": f"Bearer {token}"}
+
+
+def _tickets(brand_id: int, *descriptions: str) -> list:
+    db = SessionLocal()
+    try:
+        tickets = [models.Ticket(brand_id=brand_id, channel="sms", contact="+15550600",
+                                 description=text, category="complaint", status="new") for text in descriptions]
+        db.add_all(tickets)
+        db.commit()
+        return [ticket.id for ticket in tickets]
+    finally:
+        db.close()
+
+
+def _search(client, headers, q: str, **params) -> list:
+    response = client.get("/api/v1/tickets/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200
+    return [hit["id"] for hit in response.json()]
+
+
+def test_search_words_and_prefixes(client):
+    brand_id, headers = _brand_login(client, "search@example.com")
+    parcel, parcels, late = _tickets(
+        brand_id,
+        "My parcel arrived damaged",
+        "Two parcels went missing, parcels never found",
+        "The courier was late again",
+    )
+
+    assert _search(client, headers, "parcel damaged") == [parcel]
+    assert _search(client, headers, "parc") == []
+    assert set(_search(client, headers, "parc*")) == {parcel, parcels}
+    assert _search(client, headers, "parc* damag*") == [parcel]
+    assert _search(client, headers, "LATE courier") == [late]
+    # FTS5 syntax in the query is treated as plain words
+    assert _search(client, headers, 'late" OR NEAR(parcel') == []
+    assert _search(client, headers, "*** --") == []
+
+
+def test_search_follows_edits_and_brand_scope(client):
+    brand_id, headers = _brand_login(client, "search-scope@example.com")
+    other_id, other_headers = _brand_login(client, "search-other@example.com")
+    (ticket,) = _tickets(brand_id, "Refund requested for a broken kettle")
+    (other,) = _tickets(other_id, "Refund requested for a broken toaster")
+
+    assert _search(client, headers, "refund") == [ticket]
+    # A brand's own scope wins over a brand_id parameter
+    assert _search(client, headers, "refund", brand_id=other_id) == [ticket]
+    assert _search(client, other_headers, "refund") == [other]
+
+    db = SessionLocal()
+    db.get(models.Ticket, ticket).description = "Replacement kettle also leaks"
+    db.commit()
+    db.close()
+    assert _search(client, headers, "refund") == []
+    assert _search(client, headers, "leak*") == [ticket]
+
+
+def test_postgres_prefix_query():
+    def compiled(query):
+        return str(search._pg_tsquery(query).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    assert compiled("parcel") == "websearch_to_tsquery('english'::regconfig, 'parcel')"
+    assert compiled("parc* dam*") == "to_tsquery('english'::regconfig, 'parc:* & dam:*')"
+    assert compiled('late parc* -"never came"') == (
+        "websearch_to_tsquery('english'::regconfig, 'late   -\"never came\"') "
+        "&& to_tsquery('english'::regconfig, 'parc:*')"
+    )
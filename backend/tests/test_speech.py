@@ -0,0 +1,156 @@
+# backend/tests/test_speech.py
+import asyncio
+
+import httpx
+from conftest import FAKE_DEEPGRAM_URL
+
+from app import models
+from app.database import SessionLocal
+from app.services import dashboard, duplicates, voice_pipeline
+from app.services.speech import deepgram
+from app.services.speech.deepgram import SpeechClient
+
+
+def _fake_stats() -> dict:
+    return httpx.get(f"{FAKE_DEEPGRAM_URL}/stats").json()
+
+
+async def _chunks(*chunks: bytes, pause: float = 0.02):
+    for chunk in chunks:
+        yield chunk
+        await asyncio.sleep(pause)
+
+
+async def _peak_active(client: SpeechClient, work):
+    """Run work while sampling how many slots the client holds; returns (result, peak)."""
+    peak = 0
+
+    async def sample():
+        nonlocal peak
+        while True:
+            peak = max(peak, client.stats["active"])
+            await asyncio.sleep(0.005)
+
+    sampler = asyncio.create_task(sample())
+    try:
+        return await work, peak
+    finally:
+        sampler.cancel()
+
+
+def test_transcribe_files_within_concurrency_limit(fake_deepgram, tmp_path):
+    httpx.post(f"{fake_deepgram}/stats/reset")
+    paths = []
+    for i in range(12):
+        path = tmp_path / f"complaint_{i}.webm"
+        path.write_bytes(f"complaint number {i}".encode())
+        paths.append(str(path))
+    client = SpeechClient(base_url=fake_deepgram, max_concurrency=4)
+
+    async def scenario():
+        try:
+            return await _peak_active(client, asyncio.gather(*(client.transcribe_file(path) for path in paths)))
+        finally:
+            await client.close()
+
+    transcripts, peak = asyncio.run(scenario())
+    assert transcripts == [f"complaint number {i}" for i in range(12)]
+    assert 1 < peak <= 4
+    assert client.stats["files"] == 12
+    stats = _fake_stats()
+    assert stats["prerecorded"] == 12
+    # Pooled keep-alive connections, not one per file
+    assert stats["connections"] <= 4
+
+
+def test_live_transcription(fake_deepgram):
+    client = SpeechClient(base_url=fake_deepgram)
+    updates = []
+
+    async def on_transcript(transcript, is_final):
+        updates.append((transcript, is_final))
+
+    async def scenario():
+        async with client.live("mulaw", 8000, on_transcript) as session:
+            async for chunk in _chunks(b"my parcel ", b"never arrived.", b"please ", b"call me"):
+                await session.send(chunk)
+            await asyncio.sleep(0.1)
+            return await session.finish()
+
+    assert asyncio.run(scenario()) == "my parcel never arrived. please call me"
+    assert ("my parcel", False) in updates
+    assert ("my parcel never arrived.", True) in updates
+    assert updates[-1] == ("my parcel never arrived. please call me", True)
+    assert client.stats["streams"] == 1
+    assert client.stats["interim_results"] >= 2
+
+
+def test_live_streams_wait_for_a_slot(fake_deepgram):
+    client = SpeechClient(base_url=fake_deepgram, max_concurrency=2)
+
+    async def call(words: bytes, release: asyncio.Event):
+        async with client.live("mulaw", 8000) as session:
+            await session.send(words)
+            await release.wait()
+            return await session.finish()
+
+    async def scenario():
+        release = asyncio.Event()
+        calls = [asyncio.create_task(call(f"caller {i}.".encode(), release)) for i in range(3)]
+        while client.stats["active"] + client.stats["waiting"] < 3:
+            await asyncio.sleep(0.01)
+        held = (client.stats["active"], client.stats["waiting"])
+        release.set()
+        return held, await asyncio.gather(*calls)
+
+    held, transcripts = asyncio.run(scenario())
+    assert held == (2, 1)
+    assert transcripts == ["caller 0.", "caller 1.", "caller 2."]
+
+
+def test_transcribe_call_keeps_interim_writes_quiet(fake_deepgram, brand, monkeypatch):
+    brand_id, _ = brand
+    db = SessionLocal()
+    ticket = models.Ticket(brand_id=brand_id, channel="voice", contact="+15550300", status="new",
+                           description="", category="complaint")
+    db.add(ticket)
+    db.commit()
+    ticket_id = ticket.id
+    db.close()
+
+    monkeypatch.setattr(deepgram, "_client", SpeechClient(base_url=fake_deepgram))
+    monkeypatch.setattr(voice_pipeline, "STT_INTERIM_WRITE_SECONDS", 0)
+    indexed, invalidated, descriptions = [], [], []
+    add = duplicates.index.add
+
+    def recording_add(brand_id, indexed_id, text):
+        indexed.append(indexed_id)
+        add(brand_id, indexed_id, text)
+
+    monkeypatch.setattr(duplicates.index, "add", recording_add)
+    monkeypatch.setattr(dashboard._cache, "invalidate", invalidated.append)
+
+    async def audio():
+        async for chunk in _chunks(b"the ", b"technician ", b"never ", b"came", pause=0.05):
+            yield chunk
+            db = SessionLocal()
+            descriptions.append(db.get(models.Ticket, ticket_id).description)
+            db.close()
+
+    async def scenario():
+        try:
+            transcript = await voice_pipeline.transcribe_call(ticket_id, audio(), "mulaw", 8000)
+            await duplicates.drain()
+            return transcript
+        finally:
+            await deepgram.close()
+
+    assert asyncio.run(scenario()) == "the technician never came"
+    # The description followed the call...
+    assert "the technician" in descriptions
+    db = SessionLocal()
+    assert db.get(models.Ticket, ticket_id).description == "the technician never came"
+    db.close()
+    # ...but only the final write reached the duplicate index and the dashboard cache
+    assert indexed == [ticket_id]
+    assert invalidated == [brand_id]
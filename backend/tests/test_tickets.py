@@ -0,0 +1,112 @@
+# backend/tests/test_tickets.py
+from datetime import datetime
+
+from sqlalchemy import func, update
+
+from app import models
+from app.database import SessionLocal
+from app.utils import get_password_hash
+
+
+def _ticket(brand_id: int, **fields) -> int:
+    db = SessionLocal()
+    try:
+        ticket = models.Ticket(brand_id=brand_id, channel="sms", contact="+15550001",
+                               description="Parcel never arrived", category="complaint", **fields)
+        db.add(ticket)
+        db.commit()
+        return ticket.id
+    finally:
+        db.close()
+
+
+def test_update_status(client, brand):
+    brand_id, headers = brand
+    ticket_id = _ticket(brand_id)
+
+    response = client.patch(f"/api/v1/tickets/{ticket_id}/status", params={"status": "resolved"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"success": True, "new_status": "resolved"}
+    db = SessionLocal()
+    assert db.get(models.Ticket, ticket_id).resolved_at is not None
+    db.close()
+
+    response = client.patch(f"/api/v1/tickets/{ticket_id}/status", params={"status": "in_progress"}, headers=headers)
+    assert response.status_code == 200
+    db = SessionLocal()
+    ticket = db.get(models.Ticket, ticket_id)
+    assert (ticket.status, ticket.resolved_at) == ("in_progress", None)
+    db.close()
+
+
+def test_rate(client, brand):
+    brand_id, _ = brand
+    db = SessionLocal()
+    customer = models.User(name="Cus", phone="15550002", email="customer@example.com",
+                           hashed_password=get_password_hash("pw"))
+    db.add(customer)
+    db.commit()
+    customer_id = customer.id
+    db.close()
+    ticket_id = _ticket(brand_id, user_id=customer_id, status="resolved")
+    token = client.post("/api/v1/auth/login", data={"username": "customer@example.com", "password": "pw"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    for rating in (2, 5):
+        response = client.post(f"/api/v1/tickets/{ticket_id}/rate", params={"rating": rating}, headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {"success": True, "rating": rating}
+
+    db = SessionLocal()
+    assert db.get(models.Ticket, ticket_id).rating == 5
+    rating_count, rating_sum = db.query(
+        func.sum(models.BrandDailyStat.rating_count), func.sum(models.BrandDailyStat.rating_sum)
+    ).filter(models.BrandDailyStat.brand_id == brand_id).one()
+    assert (rating_count, rating_sum) == (1, 5)
+    db.close()
+
+
+def _pages(client, brand_id: int, limit: int):
+    """Every page of a brand's listing, following next_cursor to the end."""
+    pages, cursor = [], None
+    while True:
+        params = {"brand_id": brand_id, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/tickets/page", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        pages.append([item["id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pagination(client):
+    db = SessionLocal()
+    brand = models.Brand(name="Pager", email="pager@example.com")
+    db.add(brand)
+    db.commit()
+    brand_id = brand.id
+    db.close()
+    # Two tickets share a timestamp, so the id breaks the tie
+    ids = [_ticket(brand_id, created_at=datetime(2024, 1, day)) for day in (1, 2, 2, 3, 4)]
+    # A legacy row without created_at (the ORM would fill in the default)
+    db = SessionLocal()
+    db.execute(update(models.Ticket).where(models.Ticket.id == _ticket(brand_id)).values(created_at=None))
+    db.commit()
+    db.close()
+
+    newest_first = ids[::-1]
+    assert _pages(client, brand_id, limit=2) == [newest_first[:2], newest_first[2:4], newest_first[4:]]
+    # A full last page still ends the listing without a cursor
+    assert _pages(client, brand_id, limit=5) == [newest_first]
+
+    first = client.get("/api/v1/tickets/page", params={"brand_id": brand_id, "limit": 2}).json()
+    _ticket(brand_id, created_at=datetime(2024, 2, 1))
+    rest = client.get("/api/v1/tickets/page",
+                      params={"brand_id": brand_id, "limit": 3, "cursor": first["next_cursor"]}).json()
+    # A newer insert doesn't shift the pages already handed out
+    assert [item["id"] for item in rest["items"]] == newest_first[2:]
+
+    for cursor in ("not-a-cursor", "W10", "WyJub3QgYSBkYXRlIiwgMV0"):
+        response = client.get("/api/v1/tickets/page", params={"brand_id": brand_id, "cursor": cursor})
+        assert response.status_code == 400
@@ -0,0 +1,53 @@
+# backend/tests/test_voice_pipeline.py
+import asyncio
+
+from app import models
+from app.core.ai import cache as ai_cache
+from app.core.ai import sentiment
+from app.database import SessionLocal
+from app.services import voice_pipeline
+
+
+def test_lexicon_fallback_is_not_cached_as_remote(monkeypatch):
+    calls = []
+
+    async def failing_remote(text):
+        calls.append(text)
+        raise asyncio.TimeoutError()
+
+    async def remote(text):
+        calls.append(text)
+        return -0.9
+
+    text = "The courier was rude and my parcel is damaged"
+    monkeypatch.setattr(sentiment, "remote_score", failing_remote)
+    for _ in range(2):
+        analysis = asyncio.run(voice_pipeline.analyze_complaint_text(text, "remote"))
+        assert analysis["scorer"] == "local"
+    # Each request retried the remote scorer rather than reusing the fallback
+    assert len(calls) == 2
+    assert asyncio.run(ai_cache.results.get(ai_cache.text_key("analysis:remote", text))) is None
+    assert asyncio.run(ai_cache.results.get(ai_cache.text_key("analysis:local", text)))["scorer"] == "local"
+
+    monkeypatch.setattr(sentiment, "remote_score", remote)
+    for _ in range(2):
+        analysis = asyncio.run(voice_pipeline.analyze_complaint_text(text, "remote"))
+        assert (analysis["scorer"], analysis["sentiment"]) == ("remote", -0.9)
+    assert len(calls) == 3
+
+
+def test_ticket_without_transcript_or_recording_is_skipped(brand):
+    brand_id, _ = brand
+    db = SessionLocal()
+    ticket = models.Ticket(brand_id=brand_id, channel="voice", contact="+15550301", status="new",
+                           description="", category="complaint")
+    db.add(ticket)
+    db.commit()
+    ticket_id = ticket.id
+    db.close()
+
+    assert asyncio.run(voice_pipeline.process_voice_ticket(ticket_id, None)) is False
+    db = SessionLocal()
+    ticket = db.get(models.Ticket, ticket_id)
+    assert (ticket.description, ticket.category) == ("", "complaint")
+    db.close()
@@ -0,0 +1,140 @@
+# backend/tests/test_webhooks.py
+import base64
+import json
+
+import pytest
+from conftest import FAKE_CHANNELS_URL, twilio_signature, wait_for
+
+from app import models
+from app.database import SessionLocal
+from app.services import ticket_jobs, voice_pipeline
+
+VOICE_WEBHOOK = "/api/v1/webhook/voice/twilio"
+MEDIA_STREAM = "/api/v1/webhook/voice/twilio/stream"
+
+
+def _post_twilio(client, path: str, form: dict):
+    signature = twilio_signature(f"http://testserver{path}", form)
+    return client.post(path, data=form, headers={"X-Twilio-Signature": signature})
+
+
+def _media_stream(client, call_sid: str, caller: str, *chunks: bytes):
+    """Play one call through the Media Streams WebSocket: start, audio chunks, stop."""
+    headers = {"X-Twilio-Signature": twilio_signature(f"ws://testserver{MEDIA_STREAM}", {})}
+    with client.websocket_connect(MEDIA_STREAM, headers=headers) as websocket:
+        websocket.send_text(json.dumps({"event": "start", "start": {
+            "callSid": call_sid, "customParameters": {"From": caller, "To": "+18005550100"},
+        }}))
+        for chunk in chunks:
+            websocket.send_text(json.dumps({"event": "media", "media": {"payload": base64.b64encode(chunk).decode()}}))
+        websocket.send_text(json.dumps({"event": "stop"}))
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Records analysis jobs queued for calls and which calls' transcription has ended."""
+    queued, ended = [], []
+
+    async def enqueue(ticket_id, file_path):
+        queued.append(ticket_id)
+
+    transcribe_call = voice_pipeline.transcribe_call
+
+    async def tracked(ticket_id, *args):
+        try:
+            return await transcribe_call(ticket_id, *args)
+        finally:
+            ended.append(ticket_id)
+
+    monkeypatch.setattr(ticket_jobs.process_voice_ticket, "enqueue", enqueue)
+    monkeypatch.setattr(voice_pipeline, "transcribe_call", tracked)
+    return queued, ended
+
+
+def _voice_ticket(contact: str):
+    db = SessionLocal()
+    try:
+        return db.query(models.Ticket).filter_by(channel="voice", contact=contact).one_or_none()
+    finally:
+        db.close()
+
+
+def test_recording_is_transcribed(client, brand, fake_channels, fake_deepgram):
+    form = {
+        "RecordingSid": "RE100",
+        "From": "+15550100",
+        "To": "+18005550100",
+        "RecordingUrl": f"{FAKE_CHANNELS_URL}/twilio/2010-04-01/Accounts/AC123/Recordings/RE100",
+    }
+    assert _post_twilio(client, VOICE_WEBHOOK, form).status_code == 200
+
+    ticket = wait_for(lambda: (t := _voice_ticket("+15550100")) and t.description and t)
+    assert ticket.description == "Recorded complaint RE100."
+    assert ticket.audio_file_path == form["RecordingUrl"]
+
+
+def test_provider_transcription_is_kept(client, brand, fake_channels):
+    form = {
+        "RecordingSid": "RE101",
+        "From": "+15550101",
+        "To": "+18005550100",
+        "RecordingUrl": f"{FAKE_CHANNELS_URL}/twilio/2010-04-01/Accounts/AC123/Recordings/RE101",
+        "TranscriptionText": "The technician never showed up",
+    }
+    assert _post_twilio(client, VOICE_WEBHOOK, form).status_code == 200
+
+    ticket = wait_for(lambda: _voice_ticket("+15550101"))
+    assert ticket.description == "The technician never showed up"
+
+
+def test_pending_recording_is_listed(client, brand, calls):
+    brand_id, _ = brand
+    form = {
+        "RecordingSid": "RE102",
+        "From": "+15550102",
+        "To": "+18005550100",
+        "RecordingUrl": f"{FAKE_CHANNELS_URL}/twilio/2010-04-01/Accounts/AC123/Recordings/RE102",
+    }
+    assert _post_twilio(client, VOICE_WEBHOOK, form).status_code == 200
+    queued, _ = calls
+    ticket_id = wait_for(lambda: queued and queued[0])
+
+    # Not transcribed yet (the job is held back), but the ticket still serializes
+    response = client.get("/api/v1/tickets/page", params={"brand_id": brand_id, "channel": "voice"})
+    assert response.status_code == 200
+    assert {"id": ticket_id, "description": ""}.items() <= next(
+        item for item in response.json()["items"] if item["id"] == ticket_id
+    ).items()
+
+
+def test_spoken_call_is_analyzed(client, brand, fake_deepgram, calls):
+    queued, ended = calls
+    _media_stream(client, "CA200", "+15550200", b"my parcel ", b"never arrived.")
+
+    ticket_id = wait_for(lambda: ended and ended[0])
+    assert _voice_ticket("+15550200").description == "my parcel never arrived."
+    assert queued == [ticket_id]
+
+
+def test_silent_call_is_not_analyzed(client, brand, fake_deepgram, calls):
+    queued, ended = calls
+    _media_stream(client, "CA201", "+15550201")
+
+    wait_for(lambda: ended)
+    assert not _voice_ticket("+15550201").description
+    assert queued == []
+
+
+def test_failed_call_is_not_analyzed(client, brand, calls, monkeypatch):
+    queued, ended = calls
+
+    async def unavailable(ticket_id, *args):
+        ended.append(ticket_id)
+        raise ConnectionError("speech service unavailable")
+
+    monkeypatch.setattr(voice_pipeline, "transcribe_call", unavailable)
+    _media_stream(client, "CA202", "+15550202", b"hello")
+
+    wait_for(lambda: ended)
+    assert _voice_ticket("+15550202") is not None
+    assert queued == []
@@ -0,0 +1,164 @@
+# backend/tests/test_websocket.py
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app import models, websocket
+from app.database import SessionLocal
+from app.utils import get_password_hash
+
+from conftest import wait_for
+
+
+def _login(client, email: str, *, brand: bool):
+    """(token, brand id) for a new brand login, or (token, user id) for a customer."""
+    db = SessionLocal()
+    try:
+        brand_id = None
+        if brand:
+            brand_row = models.Brand(name=email.split("@")[0], email=email)
+            db.add(brand_row)
+            db.flush()
+            brand_id = brand_row.id
+        user = models.User(name="Live", phone=email.split("@")[0], email=email,
+                           hashed_password=get_password_hash("pw"), is_brand=brand)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    finally:
+        db.close()
+    path = "/api/v1/brands/login" if brand else "/api/v1/auth/login"
+    token = client.post(path, data={"username": email, "password": "pw"}).json()["access_token"]
+    return token, brand_id if brand else user_id
+
+
+def _ticket(brand_id: int, user_id=None, description="Live update test") -> int:
+    db = SessionLocal()
+    try:
+        ticket = models.Ticket(brand_id=brand_id, user_id=user_id, channel="webchat", contact="live",
+                               description=description, category="complaint", status="new")
+        db.add(ticket)
+        db.commit()
+        return ticket.id
+    finally:
+        db.close()
+
+
+def _set_status(ticket_id: int, status: str):
+    db = SessionLocal()
+    db.get(models.Ticket, ticket_id).status = status
+    db.commit()
+    db.close()
+
+
+def _events(ws):
+    return [(event["type"], event["ticket"]["id"]) for event in ws.receive_json()]
+
+
+def test_socket_needs_an_auth_message_first(client):
+    token, _ = _login(client, "live-auth@example.com", brand=True)
+    for first in ({"action": "subscribe", "ticket_id": 1}, {"action": "auth", "token": "forged"}, "hello"):
+        with client.websocket_connect("/api/v1/ws") as ws:
+            ws.send_json(first) if isinstance(first, dict) else ws.send_text(first)
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == websocket.CLOSE_POLICY_VIOLATION
+
+    # The token is only accepted in the message, not the URL
+    with client.websocket_connect(f"/api/v1/ws?token={token}") as ws:
+        ws.send_text("{}")
+        with pytest.raises(WebSocketDisconnect):
+            ws.receive_json()
+
+
+def test_brand_channel_only_carries_that_brands_tickets(client):
+    token_a, brand_a = _login(client, "live-a@example.com", brand=True)
+    token_b, brand_b = _login(client, "live-b@example.com", brand=True)
+    with client.websocket_connect("/api/v1/ws") as ws_a, client.websocket_connect("/api/v1/ws") as ws_b:
+        ws_a.send_json({"action": "auth", "token": token_a})
+        ws_b.send_json({"action": "auth", "token": token_b})
+        wait_for(lambda: {websocket.brand_channel(brand_a), websocket.brand_channel(brand_b)}
+                 <= set(websocket.hub.channels))
+
+        ticket_a = _ticket(brand_a)
+        ticket_b = _ticket(brand_b)
+        # Each socket's first frame is its own brand's ticket; the other brand's never arrived
+        assert _events(ws_a) == [("ticket.created", ticket_a)]
+        assert _events(ws_b) == [("ticket.created", ticket_b)]
+
+
+def test_customers_follow_only_their_own_tickets(client):
+    brand_token, brand_id = _login(client, "live-brand@example.com", brand=True)
+    token, user_id = _login(client, "live-customer@example.com", brand=False)
+    own = _ticket(brand_id, user_id=user_id)
+    other = _ticket(brand_id)
+
+    with client.websocket_connect("/api/v1/ws") as ws:
+        ws.send_json({"action": "auth", "token": token})
+        ws.send_json({"action": "subscribe", "ticket_id": other})
+        ws.send_json({"action": "subscribe", "ticket_id": own})
+        wait_for(lambda: websocket.ticket_channel(own) in websocket.hub.channels)
+        assert websocket.ticket_channel(other) not in websocket.hub.channels
+
+        _set_status(other, "in_progress")
+        _set_status(own, "in_progress")
+        assert _events(ws) == [("ticket.updated", own)]
+
+        ws.send_json({"action": "unsubscribe", "ticket_id": own})
+        wait_for(lambda: websocket.ticket_channel(own) not in websocket.hub.channels)
+
+
+class _StalledSocket:
+    """A client that never finishes reading a frame."""
+
+    async def send_text(self, text):
+        await asyncio.Event().wait()
+
+
+class _ReadingSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text):
+        self.frames.append(text)
+
+
+def test_slow_consumer_is_dropped(monkeypatch):
+    monkeypatch.setattr(websocket, "WS_SEND_QUEUE_SIZE", 3)
+
+    async def scenario():
+        hub = websocket.Hub()
+        slow, fast = websocket.Connection(_StalledSocket()), websocket.Connection(_ReadingSocket())
+        senders = [slow.start(), fast.start()]
+        for connection in (slow, fast):
+            hub.subscribe(connection, "brand:1")
+
+        # The slow client's first event is stuck in its send, the next three
+        # fill its queue and the fifth has nowhere to go
+        for n in range(5):
+            hub.deliver("brand:1", f'{{"n": {n}}}')
+            await asyncio.sleep(0)
+        with pytest.raises(asyncio.CancelledError):
+            await senders[0]
+        senders[1].cancel()
+        return hub, slow, fast
+
+    hub, slow, fast = asyncio.run(scenario())
+    assert slow.dropped and not fast.dropped
+    assert hub.channels["brand:1"] == {fast}
+    assert hub.dropped == 1
+    assert "".join(fast.websocket.frames).count('"n"') == 5
+
+
+def test_stalled_send_times_out(monkeypatch):
+    monkeypatch.setattr(websocket, "WS_SEND_TIMEOUT_SECONDS", 0.05)
+
+    async def scenario():
+        connection = websocket.Connection(_StalledSocket())
+        sender = connection.start()
+        connection.offer('{"n": 1}')
+        with pytest.raises(asyncio.TimeoutError):
+            await sender
+
+    asyncio.run(scenario())
@@ -225,6 +225,7 @@ function getChannelIcon(channel) {
   const icons = {
     voice: '📞',
     whatsapp: '💬',
+    twilio_whatsapp: '💬',
     web: '🌐'
   };
   return icons[channel] || '📧';
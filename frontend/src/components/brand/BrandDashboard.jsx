@@ -1,7 +1,11 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import brandService from '../../services/brandService';
-import ticketService from '../../services/ticketService';
 import authService from '../../services/authService';
+import liveService from '../../services/liveService';
+
+// Event batches only patch the urgent list; the counters are refetched at
+// most this often, however busy the brand's tickets are
+const STATS_REFRESH_DELAY_MS = 5000;
 
 export default function BrandDashboard() {
   const [activeTab, setActiveTab] = useState('dashboard');
@@ -14,24 +18,37 @@ export default function BrandDashboard() {
   const [urgentTickets, setUrgentTickets] = useState([]);
   const [loading, setLoading] = useState(true);
   const [generatedNumber, setGeneratedNumber] = useState('+1-800-HELP-234');
+  const brandIdRef = useRef(null);
+  const refreshTimerRef = useRef(null);
 
   useEffect(() => {
     loadDashboardData();
+    // Follow the brand's tickets live instead of polling
+    const unsubscribe = liveService.subscribe({
+      onEvents: applyEvents,
+      onReconnect: loadDashboardData,
+    });
+    return () => {
+      unsubscribe();
+      clearTimeout(refreshTimerRef.current);
+    };
   }, []);
 
   const loadDashboardData = async () => {
+    clearTimeout(refreshTimerRef.current);
+    refreshTimerRef.current = null;
     try {
-      // For now, we'll use mock data since backend endpoints need to be implemented
+      if (brandIdRef.current === null) {
+        brandIdRef.current = (await authService.getCurrentBrand()).id;
+      }
+      const data = await brandService.getDashboardData(brandIdRef.current);
       setDashboardData({
-        newComplaints: 24,
-        totalActive: 156,
-        avgRating: 4.2,
-        avgResolutionTime: '18h',
+        newComplaints: data.new_complaints,
+        totalActive: data.total_active,
+        avgRating: data.avg_rating,
+        avgResolutionTime: data.avg_resolution_time,
       });
-      
-      // Load urgent tickets
-      const tickets = await ticketService.listTickets(0, 5);
-      setUrgentTickets(tickets.filter(t => t.urgency > 0 || t.status === 'new'));
+      setUrgentTickets(data.urgent_tickets);
     } catch (error) {
       console.error('Failed to load dashboard data:', error);
     } finally {
@@ -39,6 +56,19 @@ export default function BrandDashboard() {
     }
   };
 
+  const applyEvents = (events) => {
+    // Tickets already on the urgent list change in place (and leave it once
+    // resolved); new tickets only become urgent with age, so they wait for
+    // the next counter refresh
+    const latest = new Map(events.map((e) => [e.ticket.id, e.ticket]));
+    setUrgentTickets((current) => current
+      .map((ticket) => (latest.has(ticket.id) ? { ...ticket, ...latest.get(ticket.id) } : ticket))
+      .filter((ticket) => ticket.status !== 'resolved'));
+    if (refreshTimerRef.current === null) {
+      refreshTimerRef.current = setTimeout(loadDashboardData, STATS_REFRESH_DELAY_MS);
+    }
+  };
+
   const generateNumber = () => {
     const numbers = ['+1-800-HELP-567', '+1-888-CARE-123', '+1-877-HELP-890'];
     const randomNumber = numbers[Math.floor(Math.random() * numbers.length)];
@@ -280,6 +310,7 @@ export default function BrandDashboard() {
     const icons = {
       voice: '📞',
       whatsapp: '💬',
+      twilio_whatsapp: '💬',
       'web chat': '🌐',
       web: '🌐',
     };
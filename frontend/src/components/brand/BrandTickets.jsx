@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import ticketService from '../../services/ticketService';
 import brandService from '../../services/brandService';
+import liveService from '../../services/liveService';
 
 export default function BrandTicketDetail() {
   const { id } = useParams();
@@ -14,6 +15,15 @@ export default function BrandTicketDetail() {
 
   useEffect(() => {
     loadTicket();
+    // Pick up changes made by other agents or background processing
+    return liveService.subscribe({
+      ticketIds: [Number(id)],
+      onEvents: (events) => {
+        const latest = events.filter((e) => e.ticket.id === Number(id)).pop();
+        if (latest) setTicket((current) => ({ ...current, ...latest.ticket }));
+      },
+      onReconnect: loadTicket,
+    });
   }, [id]);
 
   const loadTicket = async () => {
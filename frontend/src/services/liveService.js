@@ -0,0 +1,55 @@
+// src/services/liveService.js
+// Live ticket events over the backend WebSocket hub (/api/v1/ws).
+// The first message sent authenticates the socket; the token is kept out of
+// the URL so it doesn't end up in access logs.
+// Events arrive in batches: each message is a JSON array of
+// { type: 'ticket.created' | 'ticket.updated', ticket } objects.
+
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
+const RECONNECT_DELAY_MS = 2000;
+// Close code the server uses for a missing or rejected token
+const CLOSE_POLICY_VIOLATION = 1008;
+
+const wsUrl = () => {
+  const url = new URL(`${API_BASE_URL}/ws`, window.location.href);
+  url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:';
+  return url.toString();
+};
+
+const liveService = {
+  // Calls onEvents(events) for every batch; brand users get their brand's
+  // tickets, ticketIds adds individual tickets. Returns an unsubscribe function.
+  // After a reconnect, onReconnect() should refetch whatever may have been missed.
+  subscribe: ({ ticketIds = [], onEvents, onReconnect }) => {
+    let socket = null;
+    let closed = false;
+    let connectedBefore = false;
+
+    const connect = () => {
+      const token = localStorage.getItem('token');
+      if (!token || closed) return;
+      socket = new WebSocket(wsUrl());
+      socket.onopen = () => {
+        socket.send(JSON.stringify({ action: 'auth', token }));
+        ticketIds.forEach((ticketId) =>
+          socket.send(JSON.stringify({ action: 'subscribe', ticket_id: ticketId }))
+        );
+        if (connectedBefore && onReconnect) onReconnect();
+        connectedBefore = true;
+      };
+      socket.onmessage = (message) => onEvents(JSON.parse(message.data));
+      socket.onclose = (event) => {
+        // A rejected token won't get better by retrying it
+        if (!closed && event.code !== CLOSE_POLICY_VIOLATION) setTimeout(connect, RECONNECT_DELAY_MS);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (socket) socket.close();
+    };
+  },
+};
+
+export default liveService;